@@ -0,0 +1,37 @@
+"""add_data_version
+
+Revision ID: 0b6f4c8e2a51
+Revises: a7c3e9d1f024
+Create Date: 2026-10-19 16:37:52.140966
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b6f4c8e2a51'
+down_revision = 'a7c3e9d1f024'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('data_version',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO data_version (id, version, updated_at) VALUES (1, 1, now())")
+
+    # Stored match scores now track the global data version instead of the corpus
+    # statistics version, which does not move when only non-text fields change
+    op.alter_column('company_match_states', 'corpus_version', new_column_name='data_version')
+    op.execute("DELETE FROM company_match_states")
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM company_match_states")
+    op.alter_column('company_match_states', 'data_version', new_column_name='corpus_version')
+    op.drop_table('data_version')
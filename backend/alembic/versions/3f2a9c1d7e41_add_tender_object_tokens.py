@@ -0,0 +1,83 @@
+"""add_tender_object_tokens
+
+Revision ID: 3f2a9c1d7e41
+Revises: 924de1696ecd
+Create Date: 2026-10-19 09:12:03.418220
+
+"""
+import re
+import unicodedata
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7e41'
+down_revision = '924de1696ecd'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Tokenization as of this revision (app.services.tokenization.compute_token_hashes),
+# frozen here so the backfill does not change when the application code does
+STOP_WORDS = frozenset({
+    "a", "al", "ante", "con", "de", "del", "el", "en", "entre", "es", "la", "las",
+    "lo", "los", "o", "para", "por", "que", "se", "sin", "su", "sus", "un", "una",
+    "uno", "y",
+})
+MIN_TOKEN_LENGTH = 2
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _token_hash(token):
+    value = zlib.crc32(token.encode("utf-8"))
+    return value - (1 << 32) if value >= (1 << 31) else value
+
+
+def _token_hashes(text):
+    decomposed = unicodedata.normalize("NFKD", (text or "").lower())
+    folded = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return sorted({
+        _token_hash(token) for token in _TOKEN_RE.findall(folded)
+        if len(token) >= MIN_TOKEN_LENGTH and token not in STOP_WORDS
+    })
+
+
+def upgrade() -> None:
+    op.add_column('tenders', sa.Column('object_tokens', postgresql.ARRAY(sa.Integer()), nullable=True))
+    op.create_index('ix_tenders_object_tokens', 'tenders', ['object_tokens'], unique=False, postgresql_using='gin')
+
+    # Backfill tokens for existing tenders, one UPDATE ... FROM (VALUES ...) per batch
+    conn = op.get_bind()
+    last_id = None
+    while True:
+        query = "SELECT id, object_text FROM tenders"
+        params = {"limit": BACKFILL_BATCH_SIZE}
+        if last_id is not None:
+            query += " WHERE id > :last_id"
+            params["last_id"] = last_id
+        rows = conn.execute(sa.text(query + " ORDER BY id LIMIT :limit"), params).fetchall()
+        if not rows:
+            break
+        values = ", ".join(f"(CAST(:id_{i} AS uuid), CAST(:tokens_{i} AS integer[]))" for i in range(len(rows)))
+        params = {}
+        for i, row in enumerate(rows):
+            params[f"id_{i}"] = str(row.id)
+            params[f"tokens_{i}"] = _token_hashes(row.object_text)
+        conn.execute(
+            sa.text(
+                f"UPDATE tenders SET object_tokens = v.tokens FROM (VALUES {values}) AS v(id, tokens) "
+                "WHERE tenders.id = v.id"
+            ),
+            params,
+        )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tenders_object_tokens', table_name='tenders', postgresql_using='gin')
+    op.drop_column('tenders', 'object_tokens')
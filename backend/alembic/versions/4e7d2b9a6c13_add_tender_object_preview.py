@@ -0,0 +1,24 @@
+"""add_tender_object_preview
+
+Revision ID: 4e7d2b9a6c13
+Revises: 0b6f4c8e2a51
+Create Date: 2026-10-19 18:05:26.418203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e7d2b9a6c13'
+down_revision = '0b6f4c8e2a51'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('tenders', sa.Column('object_preview', sa.String(length=280), sa.Computed('left(object_text, 280)', persisted=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tenders', 'object_preview')
@@ -0,0 +1,63 @@
+"""add_normalized_filter_columns
+
+Revision ID: 5d9b2e7f4a18
+Revises: e8a3f61c2d97
+Create Date: 2026-10-19 15:08:31.904417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d9b2e7f4a18'
+down_revision = 'e8a3f61c2d97'
+branch_labels = None
+depends_on = None
+
+TENDER_COLUMNS = [
+    ('department', 100),
+    ('municipality', 100),
+    ('contract_type', 200),
+    ('contract_modality', 200),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # unaccent() is only STABLE (it depends on search_path); pinning the dictionary
+    # makes an IMMUTABLE wrapper usable in generated columns and indexes
+    op.execute("""
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+    """)
+
+    for column, length in TENDER_COLUMNS:
+        op.add_column('tenders', sa.Column(
+            f'{column}_norm', sa.String(length=length),
+            sa.Computed(f'lower(f_unaccent({column}))', persisted=True), nullable=True,
+        ))
+        op.create_index(
+            f'ix_tenders_{column}_norm_trgm', 'tenders', [f'{column}_norm'], unique=False,
+            postgresql_using='gin', postgresql_ops={f'{column}_norm': 'gin_trgm_ops'},
+        )
+
+    op.add_column('company_experiences', sa.Column(
+        'company_name_norm', sa.String(length=255),
+        sa.Computed('lower(f_unaccent(company_name))', persisted=True), nullable=True,
+    ))
+    op.create_index(
+        'ix_company_experiences_company_name_norm_trgm', 'company_experiences', ['company_name_norm'], unique=False,
+        postgresql_using='gin', postgresql_ops={'company_name_norm': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_company_experiences_company_name_norm_trgm', table_name='company_experiences')
+    op.drop_column('company_experiences', 'company_name_norm')
+    for column, _ in reversed(TENDER_COLUMNS):
+        op.drop_index(f'ix_tenders_{column}_norm_trgm', table_name='tenders')
+        op.drop_column('tenders', f'{column}_norm')
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
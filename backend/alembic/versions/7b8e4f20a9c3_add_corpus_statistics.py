@@ -0,0 +1,51 @@
+"""add_corpus_statistics
+
+Revision ID: 7b8e4f20a9c3
+Revises: 3f2a9c1d7e41
+Create Date: 2026-10-19 11:40:27.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b8e4f20a9c3'
+down_revision = '3f2a9c1d7e41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('term_document_frequencies',
+    sa.Column('token_hash', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('doc_freq', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('token_hash')
+    )
+    op.create_table('corpus_statistics',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('document_count', sa.Integer(), nullable=False),
+    sa.Column('total_tokens', sa.BigInteger(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    # Seed statistics from the tokens already stored on tenders
+    op.execute("""
+        INSERT INTO term_document_frequencies (token_hash, doc_freq)
+        SELECT token, count(*)
+        FROM tenders, unnest(object_tokens) AS token
+        GROUP BY token
+    """)
+    op.execute("""
+        INSERT INTO corpus_statistics (id, document_count, total_tokens, version, updated_at)
+        SELECT 1, count(*), coalesce(sum(cardinality(object_tokens)), 0), 1, now()
+        FROM tenders
+        WHERE object_tokens IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('corpus_statistics')
+    op.drop_table('term_document_frequencies')
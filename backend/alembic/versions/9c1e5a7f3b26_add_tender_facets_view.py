@@ -0,0 +1,52 @@
+"""add_tender_facets_view
+
+Revision ID: 9c1e5a7f3b26
+Revises: 4e7d2b9a6c13
+Create Date: 2026-10-19 18:41:09.735112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c1e5a7f3b26'
+down_revision = '4e7d2b9a6c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Tender counts per facet value, one grouping set per facet, refreshed at the
+    # end of ingestion. Blank and NULL values form one group, stored as '' so
+    # (facet, value) is unique, which REFRESH MATERIALIZED VIEW CONCURRENTLY requires.
+    op.execute("""
+        CREATE MATERIALIZED VIEW tender_facets AS
+        SELECT
+            CASE
+                WHEN GROUPING(department) = 0 THEN 'department'
+                WHEN GROUPING(municipality) = 0 THEN 'municipality'
+                WHEN GROUPING(contract_type) = 0 THEN 'contract_type'
+                WHEN GROUPING(contract_modality) = 0 THEN 'contract_modality'
+                WHEN GROUPING(state) = 0 THEN 'state'
+                ELSE 'month'
+            END AS facet,
+            COALESCE(department, municipality, contract_type, contract_modality, state, month, '') AS value,
+            count(*) AS tender_count
+        FROM (
+            SELECT
+                NULLIF(department, '') AS department,
+                NULLIF(municipality, '') AS municipality,
+                NULLIF(contract_type, '') AS contract_type,
+                NULLIF(contract_modality, '') AS contract_modality,
+                NULLIF(state, '') AS state,
+                to_char(publication_date, 'YYYY-MM') AS month
+            FROM tenders
+        ) AS t
+        GROUP BY GROUPING SETS ((department), (municipality), (contract_type), (contract_modality), (state), (month))
+    """)
+    op.create_index('ix_tender_facets_facet_value', 'tender_facets', ['facet', 'value'], unique=True)
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS tender_facets")
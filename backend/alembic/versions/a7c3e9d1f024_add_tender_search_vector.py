@@ -0,0 +1,37 @@
+"""add_tender_search_vector
+
+Revision ID: a7c3e9d1f024
+Revises: 5d9b2e7f4a18
+Create Date: 2026-10-19 15:51:06.318842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e9d1f024'
+down_revision = '5d9b2e7f4a18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Stored (generated) vector: Postgres keeps it current on every insert/update.
+    # f_unaccent comes from the add_normalized_filter_columns migration.
+    op.add_column('tenders', sa.Column(
+        'search_vector', postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('spanish'::regconfig, f_unaccent(coalesce(object_text, ''))), 'A') || "
+            "setweight(to_tsvector('spanish'::regconfig, f_unaccent(coalesce(entity_name, ''))), 'B')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.create_index('ix_tenders_search_vector', 'tenders', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tenders_search_vector', table_name='tenders')
+    op.drop_column('tenders', 'search_vector')
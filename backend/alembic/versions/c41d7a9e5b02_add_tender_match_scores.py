@@ -0,0 +1,45 @@
+"""add_tender_match_scores
+
+Revision ID: c41d7a9e5b02
+Revises: 7b8e4f20a9c3
+Create Date: 2026-10-19 13:05:44.218730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d7a9e5b02'
+down_revision = '7b8e4f20a9c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('tender_match_scores',
+    sa.Column('tender_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('company_key', sa.String(length=255), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('matching_experiences', sa.JSON(), nullable=True),
+    sa.Column('computed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['tender_id'], ['tenders.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('tender_id', 'company_key')
+    )
+    op.create_index('ix_tender_match_scores_company_score', 'tender_match_scores', ['company_key', 'score'], unique=False)
+    op.create_table('company_match_states',
+    sa.Column('company_key', sa.String(length=255), nullable=False),
+    sa.Column('experience_fingerprint', sa.String(length=100), nullable=False),
+    sa.Column('corpus_version', sa.BigInteger(), nullable=False),
+    sa.Column('synced_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('company_key')
+    )
+    op.create_index(op.f('ix_tenders_updated_at'), 'tenders', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tenders_updated_at'), table_name='tenders')
+    op.drop_table('company_match_states')
+    op.drop_index('ix_tender_match_scores_company_score', table_name='tender_match_scores')
+    op.drop_table('tender_match_scores')
@@ -0,0 +1,39 @@
+"""company_experience_keywords_array
+
+Revision ID: d3b8f1a64e70
+Revises: 9c1e5a7f3b26
+Create Date: 2026-10-19 19:12:44.205817
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3b8f1a64e70'
+down_revision = '9c1e5a7f3b26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # keywords: JSON array in a Text column -> text[] (ALTER ... USING cannot
+    # contain a subquery, so the values go through a new column)
+    op.add_column('company_experiences', sa.Column('keywords_array', postgresql.ARRAY(sa.Text()), nullable=True))
+    op.execute("""
+        UPDATE company_experiences
+        SET keywords_array = ARRAY(SELECT json_array_elements_text(keywords::json))
+        WHERE keywords IS NOT NULL AND keywords <> ''
+    """)
+    op.drop_column('company_experiences', 'keywords')
+    op.alter_column('company_experiences', 'keywords_array', new_column_name='keywords')
+    op.create_index('ix_company_experiences_keywords', 'company_experiences', ['keywords'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_company_experiences_keywords', table_name='company_experiences', postgresql_using='gin')
+    op.add_column('company_experiences', sa.Column('keywords_json', sa.Text(), nullable=True))
+    op.execute("UPDATE company_experiences SET keywords_json = to_json(keywords)::text WHERE keywords IS NOT NULL")
+    op.drop_column('company_experiences', 'keywords')
+    op.alter_column('company_experiences', 'keywords_json', new_column_name='keywords')
@@ -0,0 +1,33 @@
+"""add_listing_keyset_indexes
+
+Revision ID: e8a3f61c2d97
+Revises: c41d7a9e5b02
+Create Date: 2026-10-19 14:22:10.557301
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8a3f61c2d97'
+down_revision = 'c41d7a9e5b02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Expression indexes matching the keyset sort keys (NULL dates mapped to -infinity)
+    op.create_index('ix_tenders_publication_keyset', 'tenders', [
+        sa.text("coalesce(publication_date, CAST('-infinity' AS TIMESTAMP WITHOUT TIME ZONE)) DESC"),
+        sa.text('id DESC'),
+    ], unique=False)
+    op.create_index('ix_company_experiences_completion_keyset', 'company_experiences', [
+        sa.text("coalesce(completion_date, CAST('-infinity' AS DATE)) DESC"),
+        sa.text('id DESC'),
+    ], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_company_experiences_completion_keyset', table_name='company_experiences')
+    op.drop_index('ix_tenders_publication_keyset', table_name='tenders')
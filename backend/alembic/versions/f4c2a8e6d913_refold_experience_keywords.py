@@ -0,0 +1,101 @@
+"""refold_experience_keywords
+
+Revision ID: f4c2a8e6d913
+Revises: 6a2f9d4c8b15
+Create Date: 2026-10-19 21:05:17.382614
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4c2a8e6d913'
+down_revision = '6a2f9d4c8b15'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Keyword extraction as of this revision (app.services.keywords.extract_keywords),
+# frozen here so the backfill does not change when the application code does
+INTERVENTORIA_KEYWORDS = (
+    "interventoría", "supervisión",
+    "vial", "vías", "carretera",
+    "obra", "obras", "construcción",
+    "mantenimiento", "mejoramiento", "rehabilitación",
+    "diseño", "estudio", "estudios",
+    "técnica", "administrativa", "ambiental",
+    "puente", "puentes", "infraestructura",
+)
+STOP_WORDS = frozenset({
+    "a", "al", "ante", "con", "de", "del", "el", "en", "entre", "es", "la", "las",
+    "lo", "los", "o", "para", "por", "que", "se", "sin", "su", "sus", "un", "una",
+    "uno", "y",
+})
+MIN_SIGNIFICANT_LENGTH = 6
+MAX_SIGNIFICANT = 10
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _fold_accents(text):
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+KEYWORDS = frozenset(_fold_accents(keyword) for keyword in INTERVENTORIA_KEYWORDS)
+
+
+def _extract_keywords(text):
+    keywords = []
+    significant = []
+    seen = set()
+    for word in _TOKEN_RE.findall(_fold_accents(unicodedata.normalize("NFC", text or ""))):
+        if word in seen:
+            continue
+        if word in KEYWORDS:
+            keywords.append(word)
+            seen.add(word)
+        elif len(significant) < MAX_SIGNIFICANT and len(word) >= MIN_SIGNIFICANT_LENGTH and word not in STOP_WORDS:
+            significant.append(word)
+            seen.add(word)
+    return keywords + significant
+
+
+def upgrade() -> None:
+    # Keywords are now stored accent-folded ("interventoria"); re-extract the
+    # ones written before, so keyword filters see old and new rows alike.
+    # One UPDATE ... FROM (VALUES ...) per batch
+    conn = op.get_bind()
+    last_id = None
+    while True:
+        query = "SELECT id, project_description FROM company_experiences"
+        params = {"limit": BACKFILL_BATCH_SIZE}
+        if last_id is not None:
+            query += " WHERE id > :last_id"
+            params["last_id"] = last_id
+        rows = conn.execute(sa.text(query + " ORDER BY id LIMIT :limit"), params).fetchall()
+        if not rows:
+            break
+        values = ", ".join(f"(CAST(:id_{i} AS uuid), CAST(:keywords_{i} AS text[]))" for i in range(len(rows)))
+        params = {}
+        for i, row in enumerate(rows):
+            params[f"id_{i}"] = str(row.id)
+            params[f"keywords_{i}"] = _extract_keywords(row.project_description) or None
+        conn.execute(
+            sa.text(
+                f"UPDATE company_experiences SET keywords = v.keywords FROM (VALUES {values}) AS v(id, keywords) "
+                "WHERE company_experiences.id = v.id"
+            ),
+            params,
+        )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    # Folded keywords match accented and unaccented filters alike; the
+    # original accents cannot be restored
+    pass
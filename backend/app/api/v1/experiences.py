@@ -3,18 +3,31 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
-import tempfile
+from datetime import date
+import asyncio
 import os
 
-from app.core.db import get_db
+from app.core.db import Database, get_db
+from app.core.pagination import keyset_after, next_cursor, nulls_last_key, parse_cursor
 from app.models.company_experience import CompanyExperience
+from app.models.import_job import ImportJob
+from app.models.tender import Tender
+from app.schemas.tender import TenderResponse
 from app.schemas.company_experience import (
     CompanyExperienceCreate,
     CompanyExperienceResponse,
     CompanyExperienceListResponse,
-    ExcelImportResponse
+    ExcelImportResponse,
+    ExperienceSyncRequest,
+    ExperienceSyncResponse,
+    ImportJobResponse,
 )
-from app.services.excel_import import import_experiences_from_excel
+from app.services.experience_sync import sync_company_experiences
+from app.services.import_jobs import import_message, spool_import_job, submit_import_job
+from app.services.experience_matching import match_tender_against_experiences
+from app.services.similarity_index import get_similarity_index
+from app.services.data_version import bump_data_version
+from app.services.tokenization import contains_pattern, fold_accents
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -24,116 +37,191 @@ router = APIRouter()
 @router.post("/experiences", response_model=CompanyExperienceResponse, status_code=201)
 async def create_experience(
     experience: CompanyExperienceCreate,
-    db: Session = Depends(get_db),
+    db: Database = Depends(get_db),
 ):
     """Create a new company experience."""
-    from app.services.experience_matching import extract_keywords
-    import json
+    return await db.run(_create_experience, experience=experience)
+
+
+def _create_experience(db: Session, experience: CompanyExperienceCreate):
+    from app.services.keywords import extract_keywords
     
     # Extract keywords
     keywords = extract_keywords(experience.project_description)
-    keywords_json = json.dumps(keywords) if keywords else None
     
     db_experience = CompanyExperience(
         **experience.model_dump(),
-        keywords=keywords_json
+        keywords=keywords or None
     )
     db.add(db_experience)
+    bump_data_version(db, experiences=True)
     db.commit()
     db.refresh(db_experience)
     
-    # Parse keywords for response
-    response_data = CompanyExperienceResponse.model_validate(db_experience)
-    if db_experience.keywords:
-        response_data.keywords = json.loads(db_experience.keywords)
+    return CompanyExperienceResponse.model_validate(db_experience)
+
+
+@router.put("/experiences/sync", response_model=ExperienceSyncResponse)
+async def sync_experiences(
+    request: ExperienceSyncRequest,
+    db: Database = Depends(get_db),
+):
+    """
+    Replace a company's experiences with its complete list (e.g. an ERP export).
     
-    return response_data
+    The list is diffed against the stored experiences, matched by contract
+    number, or by content for experiences without one. Only new, changed and
+    missing rows are written, in one transaction, and only the stored match
+    scores they can affect are recomputed.
+    """
+    return await db.run(_sync_experiences, request=request)
+
+
+def _sync_experiences(db: Session, request: ExperienceSyncRequest):
+    result = sync_company_experiences(
+        db,
+        request.company_name,
+        [item.model_dump() for item in request.experiences],
+        delete_missing=request.delete_missing,
+    )
+    return ExperienceSyncResponse(**result._asdict())
 
 
 @router.get("/experiences", response_model=CompanyExperienceListResponse)
 async def list_experiences(
     company_name: Optional[str] = Query(None, description="Filter by company name"),
+    keyword: Optional[str] = Query(None, description="Only experiences with this extracted keyword"),
     limit: int = Query(100, ge=1, le=1000, description="Number of results"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (keyset pagination, offset is ignored)"),
+    db: Database = Depends(get_db),
+):
+    """List company experiences (most recently completed first, undated last)."""
+    return await db.run(
+        _list_experiences,
+        company_name=company_name,
+        keyword=keyword,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+    )
+
+
+def _list_experiences(
+    db: Session,
+    company_name: Optional[str],
+    keyword: Optional[str],
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
 ):
-    """List company experiences."""
     query = db.query(CompanyExperience)
     
     if company_name:
-        query = query.filter(CompanyExperience.company_name.ilike(f"%{company_name}%"))
+        query = query.filter(CompanyExperience.company_name_norm.like(contains_pattern(company_name)))
+    
+    if keyword and keyword.strip():
+        # Array containment, served by the GIN index on keywords (stored accent-folded)
+        query = query.filter(CompanyExperience.keywords.contains([fold_accents(keyword.strip())]))
     
     total = query.count()
-    # Handle None completion_date for ordering
-    from sqlalchemy import case
-    experiences = query.order_by(
-        case((CompanyExperience.completion_date.is_(None), 1), else_=0),
-        CompanyExperience.completion_date.desc()
-    ).offset(offset).limit(limit).all()
-    
-    # Parse keywords for response
-    import json
-    items = []
-    for exp in experiences:
-        # Create a dict from the model, parse keywords, then validate
-        exp_dict = {
-            "id": exp.id,
-            "company_name": exp.company_name,
-            "contract_number": exp.contract_number,
-            "project_description": exp.project_description,
-            "contracting_entity": exp.contracting_entity,
-            "completion_date": exp.completion_date,
-            "amount": float(exp.amount) if exp.amount else None,
-            "category": exp.category,
-            "engineering_area": exp.engineering_area,
-            "keywords": json.loads(exp.keywords) if exp.keywords else None,
-            "created_at": exp.created_at,
-            "updated_at": exp.updated_at,
-        }
-        exp_data = CompanyExperienceResponse.model_validate(exp_dict)
-        items.append(exp_data)
-    
-    return CompanyExperienceListResponse(items=items, total=total)
+    sort_keys = [nulls_last_key(CompanyExperience.completion_date), CompanyExperience.id]
+    cursor_values = parse_cursor(cursor, date.fromisoformat, UUID)
+    if cursor_values:
+        query = query.filter(keyset_after(sort_keys, cursor_values))
+        offset = 0
+    experiences = query.order_by(*[key.desc() for key in sort_keys]).offset(offset).limit(limit).all()
+    
+    items = [CompanyExperienceResponse.model_validate(exp) for exp in experiences]
+    
+    return CompanyExperienceListResponse(
+        items=items,
+        total=total,
+        next_cursor=next_cursor(items, limit, lambda x: (x.completion_date, x.id)),
+    )
 
 
 @router.get("/experiences/{experience_id}", response_model=CompanyExperienceResponse)
 async def get_experience(
     experience_id: UUID,
-    db: Session = Depends(get_db),
+    db: Database = Depends(get_db),
 ):
     """Get a single experience by ID."""
+    return await db.run(_get_experience, experience_id=experience_id)
+
+
+def _get_experience(db: Session, experience_id: UUID):
     experience = db.query(CompanyExperience).filter(CompanyExperience.id == experience_id).first()
     if not experience:
         raise HTTPException(status_code=404, detail="Experience not found")
     
-    import json
-    # Create a dict from the model, parse keywords, then validate
-    exp_dict = {
-        "id": experience.id,
-        "company_name": experience.company_name,
-        "contract_number": experience.contract_number,
-        "project_description": experience.project_description,
-        "contracting_entity": experience.contracting_entity,
-        "completion_date": experience.completion_date,
-        "amount": float(experience.amount) if experience.amount else None,
-        "category": experience.category,
-        "engineering_area": experience.engineering_area,
-        "keywords": json.loads(experience.keywords) if experience.keywords else None,
-        "created_at": experience.created_at,
-        "updated_at": experience.updated_at,
-    }
-    response_data = CompanyExperienceResponse.model_validate(exp_dict)
-    return response_data
+    return CompanyExperienceResponse.model_validate(experience)
+
+
+@router.get("/experiences/{experience_id}/similar-tenders", response_model=List[TenderResponse])
+async def similar_tenders(
+    experience_id: UUID,
+    limit: int = Query(20, ge=1, le=200, description="Number of tenders to return"),
+    candidates: int = Query(200, ge=1, le=2000, description="Candidates retrieved from the similarity index"),
+    db: Database = Depends(get_db),
+):
+    """
+    Tenders nearest to an experience.
+    
+    Candidates come from the MinHash LSH index over character n-grams (catches
+    differently worded descriptions), then are ranked with the detailed scorer.
+    """
+    return await db.run(
+        _similar_tenders,
+        experience_id=experience_id,
+        limit=limit,
+        candidates=candidates,
+    )
+
+
+def _similar_tenders(db: Session, experience_id: UUID, limit: int, candidates: int):
+    experience = db.query(CompanyExperience).filter(CompanyExperience.id == experience_id).first()
+    if not experience:
+        raise HTTPException(status_code=404, detail="Experience not found")
+    
+    index = get_similarity_index(db)
+    if index is None:
+        raise HTTPException(status_code=503, detail="Similarity index is still being built, retry shortly")
+    nearest = index.nearest(experience.project_description, limit=max(candidates, limit))
+    if not nearest:
+        return []
+    similarity = dict(nearest)
+    tenders = db.query(Tender).filter(Tender.id.in_([UUID(tender_id) for tender_id in similarity])).all()
+    
+    items = []
+    for tender in tenders:
+        match_score, matching_experiences = match_tender_against_experiences(tender, [experience], min_score=0.0)
+        tender_response = TenderResponse.model_validate(tender)
+        tender_response.experience_match_score = match_score
+        tender_response.matching_experiences = matching_experiences or None
+        items.append(tender_response)
+    
+    # Detailed score first, text similarity as tie-breaker
+    items.sort(key=lambda x: (x.experience_match_score or 0.0, similarity[str(x.id)]), reverse=True)
+    return items[:limit]
+
+
+def _upload_suffix(file: UploadFile) -> str:
+    """Suffix of an accepted upload, HTTP 400 for other file types."""
+    # Validate file type (the importer detects the actual format from the content)
+    if not file.filename or not file.filename.lower().endswith(('.xlsx', '.xls', '.csv', '.parquet')):
+        raise HTTPException(status_code=400, detail="File must be an Excel (.xlsx or .xls), CSV or Parquet file")
+    return os.path.splitext(file.filename)[1]
 
 
 @router.post("/experiences/import", response_model=ExcelImportResponse)
 async def import_experiences(
-    file: UploadFile = File(..., description="Excel file with company experiences"),
+    file: UploadFile = File(..., description="Excel, CSV or Parquet file with company experiences"),
     company_name: str = Query("BEC", description="Company name (defaults to BEC)"),
-    db: Session = Depends(get_db),
+    db: Database = Depends(get_db),
 ):
     """
-    Import company experiences from Excel file.
+    Import company experiences from an Excel, CSV or Parquet file.
     
     Expected columns:
     - EMPRESA
@@ -144,50 +232,73 @@ async def import_experiences(
     - VALOR ACTUAL
     - CATEGORÍA
     - ÁREA DE LA INGENIERÍA CIVIL
+    
+    Runs as an import job (see POST /experiences/import-jobs) and waits for
+    it; the upload is streamed to disk and the import runs on the worker
+    pool, so the event loop keeps serving other requests meanwhile.
+    """
+    suffix = _upload_suffix(file)
+    job, tmp_file_path = await spool_import_job(db, file, suffix, company_name)
+    imported, errors = await asyncio.wrap_future(submit_import_job(job.id, tmp_file_path, company_name))
+    
+    return ExcelImportResponse(
+        imported=imported,
+        errors=errors,
+        message=import_message(imported, errors),
+    )
+
+
+@router.post("/experiences/import-jobs", response_model=ImportJobResponse, status_code=202)
+async def start_import_job(
+    file: UploadFile = File(..., description="Excel, CSV or Parquet file with company experiences"),
+    company_name: str = Query("BEC", description="Company name (defaults to BEC)"),
+    db: Database = Depends(get_db),
+):
+    """
+    Start a background import of an Excel, CSV or Parquet file (same columns as /experiences/import).
+    
+    Returns the pending job at once; poll GET /experiences/import-jobs/{job_id}
+    for progress, per-row errors and the outcome. When the rows are written,
+    stored match scores of subscribed companies are refreshed.
     """
-    # Validate file type
-    if not file.filename.endswith(('.xlsx', '.xls')):
-        raise HTTPException(status_code=400, detail="File must be an Excel file (.xlsx or .xls)")
-    
-    # Save uploaded file to temporary location
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-        try:
-            # Read file content
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
-            
-            # Import experiences
-            imported, errors = import_experiences_from_excel(tmp_file_path, company_name)
-            
-            if errors:
-                message = f"Imported {imported} experiences with {len(errors)} errors"
-            else:
-                message = f"Successfully imported {imported} experiences"
-            
-            return ExcelImportResponse(
-                imported=imported,
-                errors=errors,
-                message=message
-            )
-        
-        finally:
-            # Clean up temporary file
-            if os.path.exists(tmp_file_path):
-                os.unlink(tmp_file_path)
+    suffix = _upload_suffix(file)
+    job, tmp_file_path = await spool_import_job(db, file, suffix, company_name)
+    submit_import_job(job.id, tmp_file_path, company_name)
+    return ImportJobResponse.model_validate(job)
+
+
+@router.get("/experiences/import-jobs/{job_id}", response_model=ImportJobResponse)
+async def get_import_job(
+    job_id: UUID,
+    db: Database = Depends(get_db),
+):
+    """Status, progress and errors of an import job."""
+    return await db.run(_get_import_job, job_id=job_id)
+
+
+def _get_import_job(db: Session, job_id: UUID):
+    job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return ImportJobResponse.model_validate(job)
 
 
 @router.delete("/experiences/{experience_id}", status_code=204)
 async def delete_experience(
     experience_id: UUID,
-    db: Session = Depends(get_db),
+    db: Database = Depends(get_db),
 ):
     """Delete an experience."""
+    return await db.run(_delete_experience, experience_id=experience_id)
+
+
+def _delete_experience(db: Session, experience_id: UUID):
     experience = db.query(CompanyExperience).filter(CompanyExperience.id == experience_id).first()
     if not experience:
         raise HTTPException(status_code=404, detail="Experience not found")
     
     db.delete(experience)
+    bump_data_version(db, experiences=True)
     db.commit()
     return None
 
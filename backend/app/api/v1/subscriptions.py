@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
 
-from app.core.db import get_db
+from app.core.db import Database, get_db
 from app.models.subscription import Subscription
 from app.schemas.subscription import SubscriptionCreate, SubscriptionUpdate, SubscriptionResponse
 
@@ -14,9 +14,13 @@ router = APIRouter()
 @router.post("/subscriptions", response_model=SubscriptionResponse, status_code=201)
 async def create_subscription(
     subscription: SubscriptionCreate,
-    db: Session = Depends(get_db),
+    db: Database = Depends(get_db),
 ):
     """Create a new subscription."""
+    return await db.run(_create_subscription, subscription=subscription)
+
+
+def _create_subscription(db: Session, subscription: SubscriptionCreate):
     db_subscription = Subscription(**subscription.model_dump())
     db.add(db_subscription)
     db.commit()
@@ -26,9 +30,13 @@ async def create_subscription(
 
 @router.get("/subscriptions", response_model=List[SubscriptionResponse])
 async def list_subscriptions(
-    db: Session = Depends(get_db),
+    db: Database = Depends(get_db),
 ):
     """List all subscriptions."""
+    return await db.run(_list_subscriptions)
+
+
+def _list_subscriptions(db: Session):
     subscriptions = db.query(Subscription).order_by(Subscription.created_at.desc()).all()
     return [SubscriptionResponse.model_validate(s) for s in subscriptions]
 
@@ -36,9 +44,13 @@ async def list_subscriptions(
 @router.get("/subscriptions/{subscription_id}", response_model=SubscriptionResponse)
 async def get_subscription(
     subscription_id: UUID,
-    db: Session = Depends(get_db),
+    db: Database = Depends(get_db),
 ):
     """Get a single subscription by ID."""
+    return await db.run(_get_subscription, subscription_id=subscription_id)
+
+
+def _get_subscription(db: Session, subscription_id: UUID):
     subscription = db.query(Subscription).filter(Subscription.id == subscription_id).first()
     if not subscription:
         raise HTTPException(status_code=404, detail="Subscription not found")
@@ -49,9 +61,13 @@ async def get_subscription(
 async def update_subscription(
     subscription_id: UUID,
     subscription_update: SubscriptionUpdate,
-    db: Session = Depends(get_db),
+    db: Database = Depends(get_db),
 ):
     """Update a subscription."""
+    return await db.run(_update_subscription, subscription_id=subscription_id, subscription_update=subscription_update)
+
+
+def _update_subscription(db: Session, subscription_id: UUID, subscription_update: SubscriptionUpdate):
     subscription = db.query(Subscription).filter(Subscription.id == subscription_id).first()
     if not subscription:
         raise HTTPException(status_code=404, detail="Subscription not found")
@@ -1,21 +1,59 @@
 """Tender API endpoints."""
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import false
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import date, datetime
 from uuid import UUID
 
-from app.core.db import get_db
+from app.config import settings
+from app.core.db import Database, get_db
+from app.core.response_cache import cached_response
+from app.core.pagination import keyset_after, next_cursor, nulls_last_key, parse_cursor
 from app.models.tender import Tender
-from app.models.company_experience import CompanyExperience
-from app.schemas.tender import TenderResponse, TenderListResponse
-from app.services.experience_matching import match_tender_against_experiences, MIN_MATCH_THRESHOLD
+from app.models.tender_match import TenderMatchScore
+from app.schemas.tender import TenderFacetsResponse, TenderResponse, TenderListResponse
+from app.services.experience_cache import get_company_profiles
+from app.services.experience_matching import MIN_MATCH_THRESHOLD, match_tender_against_profiles
+from app.services.corpus_scoring import ScoringMode, get_corpus_index
+from app.services.match_scores import (
+    STORED_SCORE_FLOOR,
+    can_use_stored_scores,
+    company_key,
+    filter_matching_experiences,
+    stored_company_key,
+)
+from app.services.text_search import search_filter, search_rank
+from app.services.tender_events import event_stream
+from app.services.tender_facets import get_tender_facets
+from app.services.tender_export import (
+    SCORE_FIELDS,
+    ExportFormat,
+    export_fields,
+    export_response,
+    stream_export,
+)
+from app.services.tender_rows import parse_fields, row_fields, tender_item, tender_page_response, tender_row_columns
+from app.services.data_version import get_data_version
+from app.services.listing_counts import (
+    count_key,
+    estimate_broad_count,
+    get_cached_count,
+    page_total,
+    store_count,
+    total_count_column,
+)
+from app.services.tokenization import contains_pattern
 
 router = APIRouter()
 
 
 @router.get("/tenders", response_model=TenderListResponse)
+@cached_response
 async def list_tenders(
+    request: Request,
+    q: Optional[str] = Query(None, description="Full-text search over object text and entity (Spanish, accent-insensitive)"),
     department: Optional[str] = Query(None, description="Filter by department"),
     contract_type: Optional[str] = Query(None, description="Filter by contract type (Tipo de contrato)"),
     contract_modality: Optional[str] = Query(None, description="Filter by contract modality (Modalidad de contratación)"),
@@ -24,134 +62,463 @@ async def list_tenders(
     match_experience: bool = Query(False, description="Only show tenders matching company experiences"),
     min_match_score: float = Query(MIN_MATCH_THRESHOLD, ge=0.0, le=1.0, description="Minimum match score (0-1)"),
     company_name: Optional[str] = Query(None, description="Company name for experience matching"),
+    scoring: ScoringMode = Query(ScoringMode.CLASSIC, description="Keyword scoring mode: classic, bm25 or tfidf"),
     limit: int = Query(50, ge=1, le=1000, description="Number of results (higher limit allowed for experience matching)"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (keyset pagination, offset is ignored)"),
+    fields: Optional[str] = Query(None, description="Comma-separated item fields to return, e.g. id,entity_name,object_preview,amount (default: all)"),
+    db: Database = Depends(get_db),
 ):
-    """List tenders with optional filters and experience matching."""
-    query = db.query(Tender)
+    """
+    List tenders with optional filters and experience matching.
     
-    # Apply filters (relevance filter removed - experience matching is the main feature)
-    
-    if department:
-        # Search in both department and municipality fields
-        # This allows users to search for cities (municipios) as well as departments
-        query = query.filter(
-            (Tender.department.ilike(f"%{department}%")) |
-            (Tender.municipality.ilike(f"%{department}%"))
-        )
+    Results are ordered by publication date (newest first, undated last). Pass
+    next_cursor back as `cursor` to page without re-reading earlier rows; the
+    cursor carries the sort values of the last row (date, match score when
+    matching, ID). With q and no experience matching, results are ordered by
+    search rank first.
     
-    if contract_type:
-        query = query.filter(Tender.contract_type.ilike(f"%{contract_type}%"))
+    Totals are cached per filter set and data version, computed with
+    count(*) OVER () in the page query itself, and replaced by the planner's
+    estimate (total_estimated=true) for very broad unfiltered listings.
     
-    if contract_modality:
-        query = query.filter(Tender.contract_modality.ilike(f"%{contract_modality}%"))
+    With `fields`, items carry only the requested fields and only the columns
+    they need are read. Table views can ask for object_preview (first
+    characters of the object text) instead of object_text; the full text
+    stays available from /tenders/{tender_id}.
+    """
+    return await db.run(
+        _list_tenders,
+        q=q,
+        department=department,
+        contract_type=contract_type,
+        contract_modality=contract_modality,
+        date_from=date_from,
+        date_to=date_to,
+        match_experience=match_experience,
+        min_match_score=min_match_score,
+        company_name=company_name,
+        scoring=scoring,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        fields=fields,
+    )
+
+
+def _list_tenders(
+    db: Session,
+    q: Optional[str],
+    department: Optional[str],
+    contract_type: Optional[str],
+    contract_modality: Optional[str],
+    date_from: Optional[date],
+    date_to: Optional[date],
+    match_experience: bool,
+    min_match_score: float,
+    company_name: Optional[str],
+    scoring: ScoringMode,
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+    fields: Optional[str],
+):
+    # Plain column tuples, not ORM objects, limited to the requested fields (plus
+    # sort and matcher columns); stored tokens only when tenders get scored here
+    fields = parse_fields(fields)
+    scored = bool(match_experience or company_name)
+    names = row_fields(fields, matching=scored)
+    query = db.query(*tender_row_columns(names, with_tokens=scored))
+    query, search = _filter_tenders(query, q, department, contract_type, contract_modality, date_from, date_to)
+    publication_key = nulls_last_key(Tender.publication_date)
+    if cursor:
+        offset = 0
     
-    if date_from:
-        query = query.filter(Tender.publication_date >= date_from)
+    data_version = get_data_version(db, max_age=settings.RESPONSE_CACHE_VERSION_MAX_AGE)
+    filter_set = dict(
+        q=search,
+        department=department,
+        contract_type=contract_type,
+        contract_modality=contract_modality,
+        date_from=date_from,
+        date_to=date_to,
+    )
     
-    if date_to:
-        query = query.filter(Tender.publication_date <= date_to)
+    # Matched listing of a subscribed company answered by the database: join on its
+    # stored scores and page in SQL. Exact for thresholds above the score reachable
+    # without keyword overlap; other companies are scored live below.
+    if match_experience and scoring == ScoringMode.CLASSIC and can_use_stored_scores(min_match_score):
+        key = stored_company_key(db, company_name)
+        if key is not None:
+            matched_query = query.join(
+                TenderMatchScore,
+                (TenderMatchScore.tender_id == Tender.id) & (TenderMatchScore.company_key == key),
+            ).filter(TenderMatchScore.score >= min_match_score)
+            
+            total_key = count_key(data_version, company=key, min_match_score=min_match_score, **filter_set)
+            cached_total = get_cached_count(total_key)
+            sort_keys = [publication_key, TenderMatchScore.score, Tender.id]
+            cursor_values = parse_cursor(cursor, datetime.fromisoformat, float, UUID)
+            page_query = matched_query
+            if cursor_values:
+                page_query = page_query.filter(keyset_after(sort_keys, cursor_values))
+            columns = [TenderMatchScore.score]
+            with_detail = fields is None or "matching_experiences" in fields
+            if with_detail:
+                columns.append(TenderMatchScore.matching_experiences)
+            counted = cached_total is None and not cursor_values
+            if counted:
+                columns.append(total_count_column())
+            rows = page_query.add_columns(*columns).order_by(
+                *[key.desc() for key in sort_keys]
+            ).offset(offset).limit(limit).all()
+            total, total_estimated = page_total(total_key, cached_total, rows, counted, matched_query, offset)
+            
+            items = [
+                tender_item(
+                    row,
+                    names,
+                    experience_match_score=row.score,
+                    matching_experiences=(
+                        filter_matching_experiences(row.matching_experiences, min_match_score)
+                        if with_detail else None
+                    ),
+                )
+                for row in rows
+            ]
+            
+            return tender_page_response(
+                items,
+                fields,
+                total=total,
+                total_estimated=total_estimated,
+                limit=limit,
+                offset=offset,
+                next_cursor=next_cursor(items, limit, _matched_sort_values),
+            )
     
-    # Experience matching setup
-    experiences = []
+    # Experience matching setup (compiled profiles cached per company)
+    profiles = ()
     if match_experience or company_name:
-        exp_query = db.query(CompanyExperience)
-        if company_name:
-            exp_query = exp_query.filter(CompanyExperience.company_name.ilike(f"%{company_name}%"))
-        experiences = exp_query.all()
+        profiles = get_company_profiles(db, company_name).profiles
+    
+    # Corpus-level keyword scores (BM25/TF-IDF) for all tenders in one sparse product
+    keyword_scores = None
+    if profiles and scoring != ScoringMode.CLASSIC:
+        keyword_scores = get_corpus_index(db).keyword_scores(profiles, scoring)
     
     # If matching is required, we need to match ALL tenders first, then paginate
-    if match_experience and experiences:
+    if match_experience and profiles:
         # Get ALL tenders (no pagination yet) for matching
         # Order by publication_date DESC, with NULL values last
-        all_tenders = query.order_by(
-            Tender.publication_date.desc().nulls_last()
-        ).all()
+        all_tenders = query.order_by(publication_key.desc(), Tender.id.desc()).all()
         
         # Match and filter all tenders
         matched_items = []
         for tender in all_tenders:
-            match_score, matching_experiences = match_tender_against_experiences(
-                tender, experiences, min_score=min_match_score
+            match_score, matching_experiences = match_tender_against_profiles(
+                tender, profiles, min_score=min_match_score,
+                keyword_scores=keyword_scores.for_tender(tender.id) if keyword_scores else None,
             )
             
             # Only include if matches threshold
             if match_score >= min_match_score:
-                tender_response = TenderResponse.model_validate(tender)
-                tender_response.experience_match_score = match_score
-                tender_response.matching_experiences = matching_experiences if matching_experiences else None
-                matched_items.append(tender_response)
+                matched_items.append(tender_item(
+                    tender,
+                    names,
+                    experience_match_score=match_score,
+                    matching_experiences=matching_experiences if matching_experiences else None,
+                ))
         
-        # Sort by publication date (most recent first), then by match score as secondary criteria
-        # Handle None dates by putting them at the end
-        # Use a tuple where first element is 0 for None dates (so they sort last when reverse=True)
-        # and 1 for dates (so they sort first)
-        matched_items.sort(
-            key=lambda x: (
-                0 if x.publication_date is None else 1,  # Put None dates last
-                x.publication_date if x.publication_date is not None else datetime.min,
-                x.experience_match_score or 0.0
-            ),
-            reverse=True
-        )
+        # Sort by publication date (most recent first, None dates last), then by
+        # match score, then by ID - the same order as the stored-score path
+        matched_items.sort(key=lambda x: _matched_sort_key(*_matched_sort_values(x)), reverse=True)
         
         # Now apply pagination to matched results
-        total = len(matched_items)
+        total, total_estimated = len(matched_items), False
+        cursor_values = parse_cursor(cursor, datetime.fromisoformat, float, UUID)
+        if cursor_values:
+            cursor_key = _matched_sort_key(*cursor_values)
+            matched_items = [x for x in matched_items if _matched_sort_key(*_matched_sort_values(x)) < cursor_key]
         items = matched_items[offset:offset + limit]
+        page_cursor = next_cursor(items, limit, _matched_sort_values)
         
     else:
         # Normal flow: paginate first, then match (for display purposes only)
         # Order by publication_date DESC, with NULL values last
-        total = query.count()
-        tenders = query.order_by(
-            Tender.publication_date.desc().nulls_last()
+        total_key = count_key(data_version, **filter_set)
+        cached_total = get_cached_count(total_key)
+        if cached_total is None and not (search or department or contract_type or contract_modality):
+            # Broad listing (date range at most): the planner's estimate is good enough
+            estimate = estimate_broad_count(db, query)
+            if estimate is not None:
+                cached_total = (estimate, True)
+                store_count(total_key, estimate, estimated=True)
+        
+        columns = []
+        if search:
+            # Relevance first; the rank is selected so it can go into the cursor
+            rank = search_rank(search)
+            sort_keys = [rank, publication_key, Tender.id]
+            cursor_values = parse_cursor(cursor, float, datetime.fromisoformat, UUID)
+            columns.append(rank.label("search_rank"))
+        else:
+            sort_keys = [publication_key, Tender.id]
+            cursor_values = parse_cursor(cursor, datetime.fromisoformat, UUID)
+        page_query = query
+        if cursor_values:
+            page_query = page_query.filter(keyset_after(sort_keys, cursor_values))
+        counted = cached_total is None and not cursor_values
+        if counted:
+            columns.append(total_count_column())
+        rows = page_query.add_columns(*columns).order_by(
+            *[key.desc() for key in sort_keys]
         ).offset(offset).limit(limit).all()
+        total, total_estimated = page_total(total_key, cached_total, rows, counted, query, offset)
         
         # Build response with match scores (optional, for display)
         items = []
-        for tender in tenders:
-            tender_response = TenderResponse.model_validate(tender)
+        for row in rows:
+            extra = {"search_rank": row.search_rank} if search else {}
             
-            if experiences:
-                match_score, matching_experiences = match_tender_against_experiences(
-                    tender, experiences, min_score=min_match_score
+            if profiles:
+                match_score, matching_experiences = match_tender_against_profiles(
+                    row, profiles, min_score=min_match_score,
+                    keyword_scores=keyword_scores.for_tender(row.id) if keyword_scores else None,
                 )
-                tender_response.experience_match_score = match_score if match_score > 0 else None
-                tender_response.matching_experiences = matching_experiences if matching_experiences else None
+                extra["experience_match_score"] = match_score if match_score > 0 else None
+                extra["matching_experiences"] = matching_experiences if matching_experiences else None
             
-            items.append(tender_response)
+            items.append(tender_item(row, names, **extra))
+        if search:
+            page_cursor = next_cursor(items, limit, lambda x: (x["search_rank"], x["publication_date"], x["id"]))
+        else:
+            page_cursor = next_cursor(items, limit, lambda x: (x["publication_date"], x["id"]))
     
-    return TenderListResponse(
-        items=items,
+    return tender_page_response(
+        items,
+        fields,
         total=total,
+        total_estimated=total_estimated,
         limit=limit,
         offset=offset,
+        next_cursor=page_cursor,
+    )
+
+
+def _filter_tenders(
+    query,
+    q: Optional[str],
+    department: Optional[str],
+    contract_type: Optional[str],
+    contract_modality: Optional[str],
+    date_from: Optional[date],
+    date_to: Optional[date],
+):
+    """Apply the listing filters to a tenders query; returns (query, stripped search text or None)."""
+    # Apply filters (relevance filter removed - experience matching is the main feature)
+    # Text filters match accent-insensitively on the *_norm columns (trigram GIN indexes)
+    
+    if department:
+        # Search in both department and municipality fields
+        # This allows users to search for cities (municipios) as well as departments
+        pattern = contains_pattern(department)
+        query = query.filter(
+            (Tender.department_norm.like(pattern)) |
+            (Tender.municipality_norm.like(pattern))
+        )
+    
+    if contract_type:
+        query = query.filter(Tender.contract_type_norm.like(contains_pattern(contract_type)))
+    
+    if contract_modality:
+        query = query.filter(Tender.contract_modality_norm.like(contains_pattern(contract_modality)))
+    
+    if date_from:
+        query = query.filter(Tender.publication_date >= date_from)
+    
+    if date_to:
+        query = query.filter(Tender.publication_date <= date_to)
+    
+    search = q.strip() if q else None
+    if search:
+        query = query.filter(search_filter(search))
+    return query, search
+
+
+def _matched_sort_values(item: dict):
+    """Cursor values of a matched listing item: publication date, match score, ID."""
+    return item["publication_date"], item["experience_match_score"] or 0.0, item["id"]
+
+
+def _matched_sort_key(publication_date, score, tender_id):
+    """Python sort key equivalent to the SQL order (date DESC NULLS LAST, score DESC, ID DESC)."""
+    return (
+        publication_date is not None,
+        publication_date if publication_date is not None else datetime.min,
+        score,
+        tender_id,
+    )
+
+
+@router.get("/tenders/export")
+async def export_tenders(
+    q: Optional[str] = Query(None, description="Full-text search over object text and entity (Spanish, accent-insensitive)"),
+    department: Optional[str] = Query(None, description="Filter by department"),
+    contract_type: Optional[str] = Query(None, description="Filter by contract type (Tipo de contrato)"),
+    contract_modality: Optional[str] = Query(None, description="Filter by contract modality (Modalidad de contratación)"),
+    date_from: Optional[date] = Query(None, description="Filter by publication date from"),
+    date_to: Optional[date] = Query(None, description="Filter by publication date to"),
+    match_experience: bool = Query(False, description="Only export tenders matching company experiences"),
+    min_match_score: float = Query(MIN_MATCH_THRESHOLD, ge=0.0, le=1.0, description="Minimum match score (0-1)"),
+    company_name: Optional[str] = Query(None, description="Company name: adds its stored match scores to every row"),
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format", description="ndjson (one JSON object per line) or csv"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to export (default: all)"),
+    db: Database = Depends(get_db),
+):
+    """
+    Export every tender matching the filters as a single streamed NDJSON or CSV file.
+    
+    Rows are read through a server-side cursor in batches and written out as
+    they arrive, so memory stays constant whatever the export size. There is
+    no count and no pagination; rows come in listing order (newest first).
+    
+    Match scores are classic scores: with company_name,
+    experience_match_score and matching_experiences are filled where the
+    tender scores above the storage floor; with match_experience only tenders
+    scoring at least min_match_score are exported. Subscribed companies are
+    read from their stored scores; other companies are scored as rows stream.
+    """
+    fields = parse_fields(fields)
+    if match_experience and not can_use_stored_scores(min_match_score):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Matched exports need min_match_score above {STORED_SCORE_FLOOR:.2f}",
+        )
+    
+    # Resolve the scoring source up front, so errors surface before the stream starts
+    key, profiles = None, ()
+    if match_experience or company_name:
+        key, profiles = await db.run(_export_scoring, company_name=company_name)
+    with_scores = key is not None or bool(profiles)
+    names = row_fields(fields, matching=bool(profiles))
+    
+    def build_query(session: Session):
+        query = session.query(*tender_row_columns(names, with_tokens=bool(profiles)))
+        query, _ = _filter_tenders(query, q, department, contract_type, contract_modality, date_from, date_to)
+        if match_experience and not with_scores:
+            query = query.filter(false())  # No experiences, nothing matches
+        elif key is not None:
+            on_key = (TenderMatchScore.tender_id == Tender.id) & (TenderMatchScore.company_key == key)
+            if match_experience:
+                query = query.join(TenderMatchScore, on_key).filter(TenderMatchScore.score >= min_match_score)
+            else:
+                query = query.outerjoin(TenderMatchScore, on_key)
+            query = query.add_columns(
+                TenderMatchScore.score.label("experience_match_score"),
+                TenderMatchScore.matching_experiences,
+            )
+        publication_key = nulls_last_key(Tender.publication_date)
+        return query.order_by(publication_key.desc(), Tender.id.desc())
+    
+    row_names = names + (SCORE_FIELDS if key is not None else ())
+    return export_response(
+        stream_export(
+            build_query, row_names, export_fields(fields, with_scores), export_format, min_match_score,
+            profiles=profiles, matched_only=match_experience,
+        ),
+        export_format,
+    )
+
+
+def _export_scoring(db: Session, company_name: Optional[str]):
+    """Stored-score key of a subscribed company, or else the profiles to score rows live with."""
+    key = stored_company_key(db, company_name)
+    if key is not None:
+        return key, ()
+    return None, get_company_profiles(db, company_name).profiles
+
+
+@router.get("/tenders/facets", response_model=TenderFacetsResponse)
+@cached_response
+async def tender_facets(
+    request: Request,
+    limit: int = Query(200, ge=1, le=5000, description="Values returned per facet (most frequent first)"),
+    db: Database = Depends(get_db),
+):
+    """
+    Tender counts by department, municipality, contract type, modality, state and publication month.
+    
+    Served from the tender_facets materialized view (one indexed read),
+    refreshed at the end of each ingestion run, so counts cover the whole
+    table and ignore listing filters.
+    """
+    return await db.run(_tender_facets, limit=limit)
+
+
+def _tender_facets(db: Session, limit: int):
+    return TenderFacetsResponse.model_validate(get_tender_facets(db, limit))
+
+
+@router.get("/tenders/events")
+async def tender_events(
+    request: Request,
+    company_name: Optional[str] = Query(None, description="Also receive new matches of this company"),
+):
+    """
+    Server-Sent Events feed of tender changes, so clients need not poll the listing.
+    
+    - `tenders` events: tenders inserted or updated by ingestion (action, ids
+      and listing items), sent as each ingestion batch commits.
+    - `matches` events (with company_name): tenders newly scored for the
+      company when its stored scores are refreshed (tender_id, score).
+    
+    Writers publish through Postgres NOTIFY, so events reach clients of every
+    API worker.
+    """
+    key = company_key(company_name) if company_name else None
+    return StreamingResponse(
+        event_stream(request, key),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @router.get("/tenders/{tender_id}", response_model=TenderResponse)
+@cached_response
 async def get_tender(
+    request: Request,
     tender_id: UUID,
     company_name: Optional[str] = Query(None, description="Company name for experience matching"),
-    db: Session = Depends(get_db),
+    scoring: ScoringMode = Query(ScoringMode.CLASSIC, description="Keyword scoring mode: classic, bm25 or tfidf"),
+    db: Database = Depends(get_db),
 ):
     """Get a single tender by ID with optional experience matching."""
+    return await db.run(
+        _get_tender,
+        tender_id=tender_id,
+        company_name=company_name,
+        scoring=scoring,
+    )
+
+
+def _get_tender(db: Session, tender_id: UUID, company_name: Optional[str], scoring: ScoringMode):
     tender = db.query(Tender).filter(Tender.id == tender_id).first()
     if not tender:
         raise HTTPException(status_code=404, detail="Tender not found")
     
     tender_response = TenderResponse.model_validate(tender)
     
-    # Add experience matching if company_name provided
+    # Add experience matching if company_name provided: cached profiles, scored in memory
     if company_name:
-        experiences = db.query(CompanyExperience).filter(
-            CompanyExperience.company_name.ilike(f"%{company_name}%")
-        ).all()
+        profiles = get_company_profiles(db, company_name).profiles
         
-        if experiences:
-            match_score, matching_experiences = match_tender_against_experiences(
-                tender, experiences, min_score=MIN_MATCH_THRESHOLD
+        if profiles:
+            keyword_scores = None
+            if scoring != ScoringMode.CLASSIC:
+                keyword_scores = get_corpus_index(db).keyword_scores(profiles, scoring).for_tender(tender.id)
+            match_score, matching_experiences = match_tender_against_profiles(
+                tender, profiles, min_score=MIN_MATCH_THRESHOLD, keyword_scores=keyword_scores
             )
             tender_response.experience_match_score = match_score if match_score > 0 else None
             tender_response.matching_experiences = matching_experiences if matching_experiences else None
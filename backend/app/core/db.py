@@ -1,13 +1,18 @@
 """Database configuration and session management."""
+from typing import Any, Callable
+
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.config import settings
 
 # Create engine
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
     echo=False,  # Set to True for SQL debugging
 )
 
@@ -18,11 +23,28 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency for FastAPI to get database session."""
+class Database:
+    """
+    Per-request database handle for the async endpoints.
+    
+    Endpoint logic stays synchronous (ORM queries, services taking a Session)
+    and is run with `await db.run(fn, *args, **kwargs)`, which calls
+    fn(session, *args, **kwargs) in the thread pool: the event loop is never
+    blocked, and concurrent requests of a worker overlap up to the connection
+    pool (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+    """
+    
+    def __init__(self, session: Session):
+        self.session = session
+    
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+
+async def get_db():
+    """Dependency for FastAPI to get a database handle (see Database)."""
     db = SessionLocal()
     try:
-        yield db
+        yield Database(db)
     finally:
         db.close()
-
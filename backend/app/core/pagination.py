@@ -0,0 +1,94 @@
+"""Keyset (cursor) pagination helpers."""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import cast, func, literal_column, tuple_
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def nulls_last_key(column):
+    """
+    Sort key equivalent to `column DESC NULLS LAST` for a date/timestamp column.
+
+    NULLs are mapped to '-infinity', so descending order on the key puts them
+    last and the key can be compared in a single row comparison against an
+    expression index, which a `NULLS LAST` ordering cannot.
+    """
+    return func.coalesce(column, cast(literal_column("'-infinity'"), column.type))
+
+
+def keyset_after(keys: Sequence, values: Sequence[Any]):
+    """
+    Filter selecting the rows after a cursor position, for an ORDER BY of `keys` all DESC.
+
+    Args:
+        keys: Sort expressions, the last one unique (usually the primary key)
+        values: Sort values of the last row of the previous page (None = NULL date)
+    """
+    bounds = [
+        cast(literal_column("'-infinity'"), key.type) if value is None else value
+        for key, value in zip(keys, values)
+    ]
+    return tuple_(*keys) < tuple_(*bounds)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque, URL-safe cursor from the sort values of the last returned row."""
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[Any], Any]) -> list:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string from a previous response
+        parsers: One parser per sort value (e.g. datetime.fromisoformat, UUID); None values are kept
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or does not match the parsers
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise InvalidCursorError("Cursor does not match this listing")
+        return [None if value is None else parse(value) for parse, value in zip(parsers, values)]
+    except InvalidCursorError:
+        raise
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}") from e
+
+
+def next_cursor(items: Sequence, limit: int, sort_values: Callable[[Any], Sequence[Any]]) -> Optional[str]:
+    """Cursor of the page following `items`, or None when the page was not full."""
+    if len(items) < limit or not items:
+        return None
+    return encode_cursor(*sort_values(items[-1]))
+
+
+def parse_cursor(cursor: Optional[str], *parsers: Callable[[Any], Any]) -> Optional[list]:
+    """decode_cursor for API endpoints: None when no cursor is given, HTTP 400 when it is invalid."""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, *parsers)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,165 @@
+"""Response cache with ETag / If-None-Match support for read-only endpoints."""
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.services.data_version import cached_data_version, get_data_version
+
+logger = get_logger(__name__)
+
+CACHE_CONTROL = "private, no-cache"  # Clients may store responses but must revalidate (ETag)
+
+
+class MemoryResponseCache:
+    """In-process LRU of serialized responses: key -> (etag, body), bounded by entries and body bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._bytes = 0  # Sum of len(body) over the entries
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, etag: str, body: bytes) -> None:
+        if self.max_bytes is not None and len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[1])
+            self._entries[key] = (etag, body)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class RedisResponseCache:
+    """Response cache shared by all workers through Redis (optional dependency)."""
+
+    def __init__(self, url: str, ttl_seconds: int):
+        import redis  # Only needed when RESPONSE_CACHE_REDIS_URL is set
+
+        self._client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        value = self._client.get(f"response:{key}")
+        if value is None:
+            return None
+        etag, _, body = value.partition(b"\n")
+        return etag.decode("ascii"), body
+
+    def set(self, key: str, etag: str, body: bytes) -> None:
+        self._client.set(f"response:{key}", etag.encode("ascii") + b"\n" + body, ex=self.ttl_seconds)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter("response:*"):
+            self._client.delete(key)
+
+
+def _create_cache():
+    if settings.RESPONSE_CACHE_REDIS_URL:
+        try:
+            return RedisResponseCache(settings.RESPONSE_CACHE_REDIS_URL, settings.RESPONSE_CACHE_TTL_SECONDS)
+        except ImportError:
+            logger.warning("RESPONSE_CACHE_REDIS_URL is set but redis is not installed, using in-process cache")
+    return MemoryResponseCache(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_MAX_BYTES)
+
+
+response_cache = _create_cache()
+
+
+def cache_key(request: Request, data_version: int) -> str:
+    """Key of a request: path, normalized query parameters (sorted, blanks dropped) and data version."""
+    params = sorted(
+        (name, value.strip())
+        for name, value in request.query_params.multi_items()
+        if value.strip()
+    )
+    query = "&".join(f"{name}={value}" for name, value in params)
+    return f"{data_version}:{request.url.path}?{query}"
+
+
+def make_etag(key: str) -> str:
+    """Weak ETag derived from the cache key (same parameters + same data version = same body)."""
+    return 'W/"' + hashlib.sha1(key.encode("utf-8")).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def _json_response(result: Union[BaseModel, Response]) -> Response:
+    """Serialize an endpoint result once (pre-rendered responses are kept as they are)."""
+    if isinstance(result, Response):
+        return result
+    return Response(content=result.model_dump_json(), media_type="application/json")
+
+
+def cached_response(endpoint):
+    """
+    Cache the JSON response of a read-only endpoint keyed by its query and the data version.
+
+    The endpoint must take `request: Request` and `db: Database` parameters and
+    return a Pydantic model or an already rendered JSON Response. Repeat
+    requests are answered from the cache, or with 304 Not Modified when
+    If-None-Match carries the current ETag, without running the endpoint or
+    serializing again. Results are serialized once, never re-validated
+    against response_model.
+    """
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return _json_response(await endpoint(*args, **kwargs))
+
+        request: Request = kwargs["request"]
+        max_age = settings.RESPONSE_CACHE_VERSION_MAX_AGE
+        version = cached_data_version(max_age)
+        if version is None:
+            version = await kwargs["db"].run(get_data_version, max_age=max_age)
+        key = cache_key(request, version)
+        etag = make_etag(key)
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        cached = response_cache.get(key)
+        if cached is not None:
+            return Response(content=cached[1], media_type="application/json", headers=headers)
+
+        response = _json_response(await endpoint(*args, **kwargs))
+        if response.status_code == 200:
+            # Very large pages (e.g. limit=1000) are served but not kept
+            if len(response.body) <= settings.RESPONSE_CACHE_MAX_BODY_BYTES:
+                response_cache.set(key, etag, response.body)
+            response.headers.update(headers)
+        return response
+
+    return wrapper
@@ -5,6 +5,10 @@ from app.core.scheduler import start_scheduler, shutdown_scheduler
 from app.core.logging import setup_logging
 from app.api.v1 import health, tenders, subscriptions, experiences
 from app.services.tender_ingestion import fetch_and_store_new_tenders
+from app.services.tender_events import tender_event_broker
+from app.services.import_jobs import fail_interrupted_import_jobs, shutdown_import_workers
+from app.services.similarity_index import start_similarity_sync
+from app.services.entity_dictionary import start_entity_dictionary_reload
 from app.config import settings
 
 # Setup logging
@@ -38,6 +42,13 @@ async def startup_event():
     """Initialize services on startup."""
     start_scheduler()
     
+    # Imports a previous process left unfinished will never complete
+    fail_interrupted_import_jobs()
+    
+    # Build the similar-tenders index and the entity dictionary in the background (not in the first request)
+    start_similarity_sync()
+    start_entity_dictionary_reload()
+    
     # Schedule the tender fetching job
     from apscheduler.triggers.interval import IntervalTrigger
     from app.core.scheduler import scheduler
@@ -55,6 +66,8 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown."""
     shutdown_scheduler()
+    shutdown_import_workers()
+    await tender_event_broker.stop()
 
 
 if __name__ == "__main__":
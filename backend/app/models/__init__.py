@@ -2,6 +2,20 @@
 from app.models.tender import Tender
 from app.models.subscription import Subscription
 from app.models.company_experience import CompanyExperience
+from app.models.corpus_stats import TermDocumentFrequency, CorpusStatistics
+from app.models.data_version import DataVersion
+from app.models.tender_match import TenderMatchScore, CompanyMatchState
+from app.models.import_job import ImportJob
 
-__all__ = ["Tender", "Subscription", "CompanyExperience"]
+__all__ = [
+    "Tender",
+    "Subscription",
+    "CompanyExperience",
+    "TermDocumentFrequency",
+    "CorpusStatistics",
+    "DataVersion",
+    "TenderMatchScore",
+    "CompanyMatchState",
+    "ImportJob",
+]
 
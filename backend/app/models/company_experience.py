@@ -1,18 +1,25 @@
 """Company Experience model."""
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Numeric, DateTime, Date
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, Numeric, DateTime, Date, Index, Computed
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from app.core.db import Base
+from app.core.pagination import nulls_last_key
 
 
 class CompanyExperience(Base):
     """Company Experience model representing past projects/contracts."""
     
     __tablename__ = "company_experiences"
+    __table_args__ = (
+        Index("ix_company_experiences_company_name_norm_trgm", "company_name_norm", postgresql_using="gin", postgresql_ops={"company_name_norm": "gin_trgm_ops"}),
+        Index("ix_company_experiences_keywords", "keywords", postgresql_using="gin"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     company_name = Column(String(255), nullable=False, index=True)
+    # Accent-folded lowercase copy for substring filters (pg_trgm GIN index), maintained by Postgres
+    company_name_norm = Column(String(255), Computed("lower(f_unaccent(company_name))", persisted=True))
     contract_number = Column(String(100), nullable=True)
     project_description = Column(Text, nullable=False)  # OBRA
     contracting_entity = Column(String(500), nullable=True)  # ENTIDAD CONTRATANTE
@@ -22,7 +29,7 @@ class CompanyExperience(Base):
     engineering_area = Column(String(200), nullable=True)  # ÁREA DE LA INGENIERÍA CIVIL
     
     # Extracted keywords for matching (computed from project_description)
-    keywords = Column(Text, nullable=True)  # JSON array of extracted keywords
+    keywords = Column(ARRAY(Text), nullable=True)  # GIN index: keyword containment/overlap in SQL
     
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -30,3 +37,6 @@ class CompanyExperience(Base):
     def __repr__(self):
         return f"<CompanyExperience(id={self.id}, company={self.company_name}, project={self.project_description[:50]}...)>"
 
+
+# Matches the listing order (completion date DESC NULLS LAST, ID DESC) so keyset pages are index range scans
+Index("ix_company_experiences_completion_keyset", nulls_last_key(CompanyExperience.completion_date).desc(), CompanyExperience.id.desc())
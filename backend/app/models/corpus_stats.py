@@ -0,0 +1,31 @@
+"""Corpus statistics models used by BM25/TF-IDF scoring."""
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, DateTime
+from app.core.db import Base
+
+
+class TermDocumentFrequency(Base):
+    """Number of tenders whose object_tokens contain a given token hash."""
+
+    __tablename__ = "term_document_frequencies"
+
+    token_hash = Column(Integer, primary_key=True, autoincrement=False)
+    doc_freq = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TermDocumentFrequency(token_hash={self.token_hash}, doc_freq={self.doc_freq})>"
+
+
+class CorpusStatistics(Base):
+    """Single-row table with corpus-wide counters over tenders.object_tokens."""
+
+    __tablename__ = "corpus_statistics"
+
+    id = Column(Integer, primary_key=True, autoincrement=False, default=1)
+    document_count = Column(Integer, nullable=False, default=0)
+    total_tokens = Column(BigInteger, nullable=False, default=0)  # Sum of document lengths
+    version = Column(BigInteger, nullable=False, default=0)  # Bumped on every update
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<CorpusStatistics(documents={self.document_count}, version={self.version})>"
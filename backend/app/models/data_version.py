@@ -0,0 +1,17 @@
+"""Global data version used to invalidate cached API responses."""
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, DateTime
+from app.core.db import Base
+
+
+class DataVersion(Base):
+    """Version counters: row 1 is bumped by every write that changes API-visible data, row 2 by experience writes."""
+
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True, autoincrement=False, default=1)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<DataVersion(version={self.version})>"
@@ -0,0 +1,38 @@
+"""Background experience import jobs."""
+import enum
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime, JSON
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.db import Base
+
+
+class ImportJobStatus(str, enum.Enum):
+    """Import job lifecycle."""
+    PENDING = "pending"
+    RUNNING = "running"
+    RESCORING = "rescoring"  # Rows written, stored match scores being refreshed
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ImportJob(Base):
+    """Experience file import run by the import worker pool, with its progress."""
+    
+    __tablename__ = "import_jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    company_name = Column(String(255), nullable=False)
+    filename = Column(String(500), nullable=True)
+    status = Column(String(20), nullable=False, default=ImportJobStatus.PENDING.value)
+    total_rows = Column(Integer, nullable=True)  # Known once the file is read
+    processed_rows = Column(Integer, nullable=False, default=0)
+    imported = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, nullable=True)  # Per-row error messages
+    message = Column(String(500), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<ImportJob(id={self.id}, status={self.status}, processed={self.processed_rows}/{self.total_rows})>"
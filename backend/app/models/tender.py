@@ -1,11 +1,15 @@
 """Tender model."""
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Text, Numeric, DateTime, Float, Boolean, Enum as SQLEnum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, Numeric, DateTime, Float, Boolean, Integer, Index, Computed, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred
 from app.core.db import Base
+from app.core.pagination import nulls_last_key
 import enum
 
+OBJECT_PREVIEW_LENGTH = 280  # Characters of object_text kept in object_preview (listing tables)
+
 
 class TenderSource(str, enum.Enum):
     """Tender source enumeration."""
@@ -18,12 +22,22 @@ class Tender(Base):
     """Tender model representing a public tender from SECOP."""
     
     __tablename__ = "tenders"
+    __table_args__ = (
+        Index("ix_tenders_object_tokens", "object_tokens", postgresql_using="gin"),
+        Index("ix_tenders_department_norm_trgm", "department_norm", postgresql_using="gin", postgresql_ops={"department_norm": "gin_trgm_ops"}),
+        Index("ix_tenders_municipality_norm_trgm", "municipality_norm", postgresql_using="gin", postgresql_ops={"municipality_norm": "gin_trgm_ops"}),
+        Index("ix_tenders_contract_type_norm_trgm", "contract_type_norm", postgresql_using="gin", postgresql_ops={"contract_type_norm": "gin_trgm_ops"}),
+        Index("ix_tenders_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_tenders_contract_modality_norm_trgm", "contract_modality_norm", postgresql_using="gin", postgresql_ops={"contract_modality_norm": "gin_trgm_ops"}),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     external_id = Column(String(255), unique=True, nullable=False, index=True)
     source = Column(SQLEnum(TenderSource), nullable=False)
     entity_name = Column(String(500), nullable=False)
     object_text = Column(Text, nullable=False)
+    # Normalized token set of object_text (accent-folded, stop words removed, CRC32-hashed)
+    object_tokens = Column(ARRAY(Integer), nullable=True)
     department = Column(String(100), nullable=True)
     municipality = Column(String(100), nullable=True)
     amount = Column(Numeric(18, 2), nullable=True)
@@ -34,11 +48,27 @@ class Tender(Base):
     process_url = Column(String(1000), nullable=False)
     contract_type = Column(String(200), nullable=True)  # Tipo de contrato
     contract_modality = Column(String(200), nullable=True)  # Modalidad de contratación
+    # Accent-folded lowercase copies for substring filters (pg_trgm GIN indexes), maintained by Postgres
+    department_norm = Column(String(100), Computed("lower(f_unaccent(department))", persisted=True))
+    municipality_norm = Column(String(100), Computed("lower(f_unaccent(municipality))", persisted=True))
+    contract_type_norm = Column(String(200), Computed("lower(f_unaccent(contract_type))", persisted=True))
+    contract_modality_norm = Column(String(200), Computed("lower(f_unaccent(contract_modality))", persisted=True))
+    # Short object text for listings (fields=object_preview), so pages need not read the full text
+    object_preview = Column(String(OBJECT_PREVIEW_LENGTH), Computed(f"left(object_text, {OBJECT_PREVIEW_LENGTH})", persisted=True))
+    # Spanish full-text vector of object_text (weight A) + entity_name (weight B), accent-folded
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('spanish'::regconfig, f_unaccent(coalesce(object_text, ''))), 'A') || "
+        "setweight(to_tsvector('spanish'::regconfig, f_unaccent(coalesce(entity_name, ''))), 'B')",
+        persisted=True,
+    )))
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
     relevance_score = Column(Float, nullable=True)
     is_relevant_interventoria_vial = Column(Boolean, default=False, nullable=False, index=True)
     
     def __repr__(self):
         return f"<Tender(id={self.id}, external_id={self.external_id}, entity={self.entity_name})>"
 
+
+# Matches the listing order (publication date DESC NULLS LAST, ID DESC) so keyset pages are index range scans
+Index("ix_tenders_publication_keyset", nulls_last_key(Tender.publication_date).desc(), Tender.id.desc())
@@ -0,0 +1,37 @@
+"""Stored experience-match scores per (tender, company)."""
+from datetime import datetime
+from sqlalchemy import Column, String, Float, DateTime, BigInteger, JSON, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.db import Base
+
+
+class TenderMatchScore(Base):
+    """Best experience-match score of a tender for a company, with its top matching experiences."""
+    
+    __tablename__ = "tender_match_scores"
+    __table_args__ = (
+        Index("ix_tender_match_scores_company_score", "company_key", "score"),
+    )
+    
+    tender_id = Column(UUID(as_uuid=True), ForeignKey("tenders.id", ondelete="CASCADE"), primary_key=True)
+    company_key = Column(String(255), primary_key=True)  # Normalized company_name filter (lowercase)
+    score = Column(Float, nullable=False)
+    matching_experiences = Column(JSON, nullable=True)  # Top matches as returned by the matcher
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<TenderMatchScore(tender_id={self.tender_id}, company={self.company_key}, score={self.score})>"
+
+
+class CompanyMatchState(Base):
+    """Freshness marker of the stored scores of a company."""
+    
+    __tablename__ = "company_match_states"
+    
+    company_key = Column(String(255), primary_key=True)
+    experience_fingerprint = Column(String(100), nullable=False)  # Count + last update of the experiences
+    data_version = Column(BigInteger, nullable=False)  # DataVersion.version when last synced
+    synced_at = Column(DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f"<CompanyMatchState(company={self.company_key}, synced_at={self.synced_at})>"
@@ -37,6 +37,26 @@ class CompanyExperienceListResponse(BaseModel):
     """Paginated experience list response."""
     items: List[CompanyExperienceResponse]
     total: int
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page (None on the last page)")
+
+
+class ImportJobResponse(BaseModel):
+    """Status and progress of a background import job."""
+    id: UUID
+    company_name: str
+    filename: Optional[str] = None
+    status: str = Field(..., description="pending, running, rescoring, completed or failed")
+    total_rows: Optional[int] = Field(None, description="Rows in the file (known once it is read)")
+    processed_rows: int = Field(0, description="Rows written so far")
+    imported: int = Field(0, description="New experiences")
+    errors: List[str] = []
+    message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
 
 
 class ExcelImportResponse(BaseModel):
@@ -45,3 +65,30 @@ class ExcelImportResponse(BaseModel):
     errors: List[str] = []
     message: str
 
+
+
+class ExperienceSyncItem(BaseModel):
+    """One experience of a company's complete list (company given once in the request)."""
+    contract_number: Optional[str] = Field(None, description="Identifies the experience between syncs when present")
+    project_description: str = Field(..., description="Project/work description (OBRA)")
+    contracting_entity: Optional[str] = None
+    completion_date: Optional[date] = None
+    amount: Optional[float] = None
+    category: Optional[str] = None
+    engineering_area: Optional[str] = None
+
+
+class ExperienceSyncRequest(BaseModel):
+    """Complete experience list of a company."""
+    company_name: str = Field(..., min_length=1, description="Company name")
+    experiences: List[ExperienceSyncItem]
+    delete_missing: bool = Field(True, description="Delete stored experiences of the company missing from the list")
+
+
+class ExperienceSyncResponse(BaseModel):
+    """Outcome of an experience sync."""
+    inserted: int
+    updated: int
+    deleted: int
+    unchanged: int
+    refreshed_scores: int = Field(..., description="Stored tender match scores recomputed for the changed experiences")
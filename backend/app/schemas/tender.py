@@ -12,6 +12,7 @@ class TenderResponse(BaseModel):
     source: str
     entity_name: str
     object_text: str
+    object_preview: Optional[str] = Field(None, description="First characters of object_text (listing tables)")
     department: Optional[str] = None
     municipality: Optional[str] = None
     amount: Optional[float] = None
@@ -27,6 +28,8 @@ class TenderResponse(BaseModel):
     # Experience matching
     experience_match_score: Optional[float] = Field(None, description="Match score against company experiences (0-1)")
     matching_experiences: Optional[List[dict]] = Field(None, description="List of matching experiences")
+    # Full-text search
+    search_rank: Optional[float] = Field(None, description="Full-text search rank (ts_rank) when q is given")
     created_at: datetime
     updated_at: datetime
     
@@ -34,9 +37,27 @@ class TenderResponse(BaseModel):
         from_attributes = True
 
 
+class FacetCount(BaseModel):
+    """Number of tenders with a facet value."""
+    value: Optional[str] = Field(None, description="Facet value (None = not set)")
+    count: int
+
+
+class TenderFacetsResponse(BaseModel):
+    """Tender counts per facet value, most frequent first."""
+    department: List[FacetCount]
+    municipality: List[FacetCount]
+    contract_type: List[FacetCount]
+    contract_modality: List[FacetCount]
+    state: List[FacetCount]
+    month: List[FacetCount] = Field(..., description="Publication month (YYYY-MM)")
+
+
 class TenderListResponse(BaseModel):
     """Paginated tender list response."""
     items: List[TenderResponse]
     total: int
+    total_estimated: bool = Field(False, description="total is a planner estimate (very broad listings)")
     limit: int
     offset: int
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page (None on the last page)")
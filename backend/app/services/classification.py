@@ -1,9 +1,11 @@
 """OpenAI-based relevance classification for tenders."""
 import json
-from typing import Dict, Optional
+from typing import AbstractSet, Dict, Optional
 from openai import OpenAI
 from app.config import settings
 from app.core.logging import get_logger
+from app.services.keywords import ROAD_SUPERVISION_TOKENS, count_phrase_matches
+from app.services.tokenization import compute_token_hashes
 
 logger = get_logger(__name__)
 
@@ -13,13 +15,18 @@ if settings.OPENAI_API_KEY:
     openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
 
-def classify_tender_relevance(object_text: str, entity_name: Optional[str] = None) -> Dict[str, any]:
+def classify_tender_relevance(
+    object_text: str,
+    entity_name: Optional[str] = None,
+    tokens: Optional[AbstractSet[int]] = None,
+) -> Dict[str, any]:
     """
     Classify if a tender is relevant for road supervision (interventoría vial).
     
     Args:
         object_text: The tender object description
         entity_name: Optional entity name for context
+        tokens: Optional precomputed token hashes (Tender.object_tokens) for the fallback
         
     Returns:
         Dict with 'is_relevant' (bool) and 'relevance_score' (float 0-1)
@@ -33,7 +40,7 @@ def classify_tender_relevance(object_text: str, entity_name: Optional[str] = Non
     # If OpenAI is not configured, use keyword fallback
     if not openai_client:
         logger.warning("OpenAI client not configured, using keyword fallback")
-        return _keyword_fallback(object_text, entity_name)
+        return _keyword_fallback(object_text, entity_name, tokens)
     
     try:
         # Build prompt
@@ -80,7 +87,7 @@ Solo considera relevante si se trata específicamente de supervisión, intervent
         # Validate result structure
         if "is_relevant" not in result or "relevance_score" not in result:
             logger.warning("OpenAI response missing required fields, using fallback")
-            return _keyword_fallback(object_text, entity_name)
+            return _keyword_fallback(object_text, entity_name, tokens)
         
         # Ensure types are correct
         result["is_relevant"] = bool(result["is_relevant"])
@@ -91,40 +98,34 @@ Solo considera relevante si se trata específicamente de supervisión, intervent
     
     except json.JSONDecodeError as e:
         logger.warning(f"Failed to parse OpenAI JSON response: {e}, using fallback")
-        return _keyword_fallback(object_text, entity_name)
+        return _keyword_fallback(object_text, entity_name, tokens)
     except Exception as e:
         logger.error(f"Error calling OpenAI API: {e}, using fallback")
-        return _keyword_fallback(object_text, entity_name)
+        return _keyword_fallback(object_text, entity_name, tokens)
 
 
-def _keyword_fallback(object_text: str, entity_name: Optional[str] = None) -> Dict[str, any]:
+def _keyword_fallback(
+    object_text: str,
+    entity_name: Optional[str] = None,
+    tokens: Optional[AbstractSet[int]] = None,
+) -> Dict[str, any]:
     """
     Fallback keyword-based classification.
     
+    Args:
+        object_text: The tender object description
+        entity_name: Optional entity name for context
+        tokens: Optional precomputed token hashes of object_text (Tender.object_tokens)
+    
     Returns:
         Dict with 'is_relevant' and 'relevance_score'
     """
-    text_lower = (object_text or "").lower()
+    text_tokens = set(tokens) if tokens is not None else set(compute_token_hashes(object_text or ""))
     if entity_name:
-        text_lower += " " + entity_name.lower()
-    
-    # Keywords that indicate road supervision
-    relevant_keywords = [
-        "interventoría",
-        "interventoria",
-        "vial",
-        "vías",
-        "vias",
-        "carretera",
-        "malla vial",
-        "supervisión de vías",
-        "supervision de vias",
-        "obra vial",
-        "infraestructura vial",
-    ]
+        text_tokens.update(compute_token_hashes(entity_name))
     
     # Check for keyword matches
-    matches = sum(1 for keyword in relevant_keywords if keyword in text_lower)
+    matches = count_phrase_matches(ROAD_SUPERVISION_TOKENS, text_tokens)
     
     if matches > 0:
         # Score based on number of matches (capped at 0.8 for fallback)
@@ -138,4 +139,3 @@ def _keyword_fallback(object_text: str, entity_name: Optional[str] = None) -> Di
         "is_relevant": False,
         "relevance_score": 0.0,
     }
-
@@ -0,0 +1,336 @@
+"""Corpus-level keyword scoring (BM25 / TF-IDF cosine) over tender token sets."""
+import enum
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal
+from app.models.tender import Tender
+from app.models.company_experience import CompanyExperience
+from app.models.corpus_stats import TermDocumentFrequency, CorpusStatistics
+from app.services.tokenization import compute_token_hashes, keyword_hash
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# BM25 parameters (standard defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Rows fetched per round trip when building the index
+INDEX_FETCH_SIZE = 10000
+
+
+class ScoringMode(str, enum.Enum):
+    """Keyword scoring mode used by the experience matcher."""
+    CLASSIC = "classic"  # Keyword overlap ratio (default)
+    BM25 = "bm25"
+    TFIDF = "tfidf"
+
+
+def update_corpus_statistics(
+    db: Session,
+    added: Iterable[Sequence[int]] = (),
+    removed: Iterable[Sequence[int]] = (),
+) -> None:
+    """
+    Incrementally update document frequencies for added/removed tender token sets.
+
+    Runs inside the caller's transaction so statistics commit (or roll back)
+    together with the tenders that produced them.
+
+    Args:
+        db: Database session
+        added: Token hash lists of tenders inserted (or new versions of updated tenders)
+        removed: Token hash lists of tenders deleted (or old versions of updated tenders)
+    """
+    deltas: Counter = Counter()
+    doc_delta = 0
+    length_delta = 0
+    for tokens in added:
+        deltas.update(set(tokens))
+        doc_delta += 1
+        length_delta += len(tokens)
+    for tokens in removed:
+        deltas.subtract(set(tokens))
+        doc_delta -= 1
+        length_delta -= len(tokens)
+
+    changes = [{"token_hash": token, "doc_freq": delta} for token, delta in deltas.items() if delta]
+    if changes:
+        stmt = insert(TermDocumentFrequency).values(changes)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TermDocumentFrequency.token_hash],
+            set_={"doc_freq": TermDocumentFrequency.doc_freq + stmt.excluded.doc_freq},
+        )
+        db.execute(stmt)
+
+    if changes or doc_delta:
+        stmt = insert(CorpusStatistics).values(
+            id=1, document_count=doc_delta, total_tokens=length_delta, version=1
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CorpusStatistics.id],
+            set_={
+                "document_count": CorpusStatistics.document_count + doc_delta,
+                "total_tokens": CorpusStatistics.total_tokens + length_delta,
+                "version": CorpusStatistics.version + 1,
+                "updated_at": func.now(),
+            },
+        )
+        db.execute(stmt)
+
+
+def experience_query_tokens(experience: CompanyExperience) -> List[int]:
+    """
+    Query terms for an experience: its full description tokens plus extracted keywords.
+
+    Accepts compiled profiles (ExperienceProfile) too, whose keywords are already hashed.
+    """
+    tokens = set(compute_token_hashes(experience.project_description or ""))
+    keyword_hashes = getattr(experience, "keyword_hashes", None)
+    if keyword_hashes is not None:
+        tokens.update(keyword_hashes)
+    elif experience.keywords:
+        tokens.update(keyword_hash(keyword) for keyword in experience.keywords)
+    return sorted(tokens)
+
+
+class KeywordScores:
+    """Sparse tender x experience keyword score matrix produced by CorpusIndex."""
+
+    def __init__(self, matrix: sparse.csr_matrix, row_of: Dict[str, int], experience_ids: List[str]):
+        self._matrix = matrix
+        self._row_of = row_of
+        self._experience_ids = experience_ids
+
+    def for_tender(self, tender_id) -> Optional[Dict[str, float]]:
+        """
+        Keyword scores of one tender against every experience (missing = 0.0).
+
+        Returns None when the tender is not in the index yet, so the caller can
+        fall back to classic scoring.
+        """
+        row = self._row_of.get(str(tender_id))
+        if row is None:
+            return None
+        start, end = self._matrix.indptr[row], self._matrix.indptr[row + 1]
+        return {
+            self._experience_ids[col]: float(value)
+            for col, value in zip(self._matrix.indices[start:end], self._matrix.data[start:end])
+        }
+
+    def best_per_tender(self) -> np.ndarray:
+        """Best keyword score of each indexed tender over all experiences."""
+        if self._matrix.shape[1] == 0:
+            return np.zeros(self._matrix.shape[0])
+        return self._matrix.max(axis=1).toarray().ravel()
+
+
+class CorpusIndex:
+    """
+    In-memory sparse matrices of BM25 and TF-IDF weights for all indexed tenders.
+
+    Tender token sets are binary (each token counted once), so BM25 reduces to
+    idf(t) * (k1 + 1) / (1 + k1 * (1 - b + b * dl / avgdl)) per (tender, term).
+    """
+
+    def __init__(
+        self,
+        tender_ids: List[str],
+        vocabulary: np.ndarray,
+        bm25_idf: np.ndarray,
+        tfidf_idf: np.ndarray,
+        bm25: sparse.csr_matrix,
+        tfidf: sparse.csr_matrix,
+        version: int,
+    ):
+        self.tender_ids = tender_ids
+        self.row_of = {tender_id: row for row, tender_id in enumerate(tender_ids)}
+        self.vocabulary = vocabulary  # Sorted token hashes, column order
+        self.bm25_idf = bm25_idf
+        self.tfidf_idf = tfidf_idf
+        self.bm25 = bm25
+        self.tfidf = tfidf
+        self.version = version
+
+    @classmethod
+    def build(cls, db: Session) -> "CorpusIndex":
+        """Build the index from persisted corpus statistics and tender token sets."""
+        stats = db.query(CorpusStatistics).filter(CorpusStatistics.id == 1).first()
+        document_count = stats.document_count if stats else 0
+        avgdl = (stats.total_tokens / stats.document_count) if stats and stats.document_count else 1.0
+        version = stats.version if stats else 0
+
+        term_rows = (
+            db.query(TermDocumentFrequency.token_hash, TermDocumentFrequency.doc_freq)
+            .filter(TermDocumentFrequency.doc_freq > 0)
+            .order_by(TermDocumentFrequency.token_hash)
+            .all()
+        )
+        vocabulary = np.array([row[0] for row in term_rows], dtype=np.int64)
+        doc_freqs = np.array([row[1] for row in term_rows], dtype=np.float64)
+
+        rows = (
+            db.query(Tender.id, Tender.object_tokens)
+            .filter(Tender.object_tokens.isnot(None))
+            .execution_options(stream_results=True)
+            .yield_per(INDEX_FETCH_SIZE)
+        )
+        return cls.from_documents(
+            ((str(tender_id), tokens) for tender_id, tokens in rows),
+            vocabulary, doc_freqs, document_count, avgdl, version,
+        )
+
+    @classmethod
+    def from_documents(
+        cls,
+        documents: Iterable[Tuple[str, Sequence[int]]],
+        vocabulary: np.ndarray,
+        doc_freqs: np.ndarray,
+        document_count: int,
+        avgdl: float,
+        version: int = 0,
+    ) -> "CorpusIndex":
+        """Build the weight matrices from (tender_id, token hashes) pairs and corpus statistics."""
+        tender_ids: List[str] = []
+        lengths: List[int] = []
+        token_chunks = []
+        for tender_id, tokens in documents:
+            tender_ids.append(tender_id)
+            lengths.append(len(tokens))
+            token_chunks.append(np.asarray(tokens, dtype=np.int64))
+
+        # Map every token to its vocabulary column in one vectorized pass,
+        # dropping tokens the (possibly lagging) statistics do not know yet
+        all_tokens = np.concatenate(token_chunks) if token_chunks else np.zeros(0, dtype=np.int64)
+        rows = np.repeat(np.arange(len(tender_ids)), lengths)
+        cols = np.searchsorted(vocabulary, all_tokens)
+        known = cols < len(vocabulary)
+        known[known] = vocabulary[cols[known]] == all_tokens[known]
+        indices = cols[known]
+        indptr_arr = np.concatenate(([0], np.cumsum(np.bincount(rows[known], minlength=len(tender_ids)))))
+        shape = (len(tender_ids), len(vocabulary))
+
+        n = max(document_count, 1)
+        bm25_idf = np.log1p((n - doc_freqs + 0.5) / (doc_freqs + 0.5))
+        tfidf_idf = np.log((1 + n) / (1 + doc_freqs)) + 1.0
+        doc_lengths = np.diff(indptr_arr)
+
+        # BM25 weights: idf(t) scaled by per-document length normalization
+        length_norm = (BM25_K1 + 1) / (1 + BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / avgdl))
+        bm25_data = bm25_idf[indices] * np.repeat(length_norm, doc_lengths)
+        bm25 = sparse.csr_matrix((bm25_data, indices, indptr_arr), shape=shape)
+
+        # TF-IDF weights, L2-normalized per document (cosine similarity = dot product)
+        tfidf = sparse.csr_matrix((tfidf_idf[indices], indices, indptr_arr), shape=shape)
+        norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+        tfidf = (sparse.diags(1.0 / np.where(norms > 0, norms, 1.0)) @ tfidf).tocsr()
+
+        logger.info(f"Built corpus index: {shape[0]} tenders x {shape[1]} terms (version {version})")
+        return cls(tender_ids, vocabulary, bm25_idf, tfidf_idf, bm25, tfidf, version)
+
+    def _query_matrix(self, experiences: List[CompanyExperience], mode: ScoringMode) -> sparse.csc_matrix:
+        """Build the term x experience query matrix, normalized so scores fall in [0, 1]."""
+        rows, cols, data = [], [], []
+        for col, experience in enumerate(experiences):
+            term_cols = _known_columns(self.vocabulary, experience_query_tokens(experience))
+            if len(term_cols) == 0:
+                continue
+            if mode == ScoringMode.BM25:
+                # Normalize by the score of an average-length document containing every query term
+                weights = np.ones(len(term_cols)) / self.bm25_idf[term_cols].sum()
+            else:
+                weights = self.tfidf_idf[term_cols]
+                weights = weights / np.sqrt((weights ** 2).sum())
+            rows.extend(term_cols.tolist())
+            cols.extend([col] * len(term_cols))
+            data.extend(weights.tolist())
+        return sparse.csc_matrix((data, (rows, cols)), shape=(len(self.vocabulary), len(experiences)))
+
+    def keyword_scores(self, experiences: List[CompanyExperience], mode: ScoringMode) -> KeywordScores:
+        """Score every indexed tender against every experience in one sparse product."""
+        documents = self.bm25 if mode == ScoringMode.BM25 else self.tfidf
+        matrix = (documents @ self._query_matrix(experiences, mode)).tocsr()
+        if mode == ScoringMode.BM25:
+            matrix.data = np.minimum(matrix.data, 1.0)
+        return KeywordScores(matrix, self.row_of, [str(experience.id) for experience in experiences])
+
+    def rank_tenders(
+        self,
+        experiences: List[CompanyExperience],
+        mode: ScoringMode,
+        limit: int = 100,
+    ) -> List[Tuple[str, float]]:
+        """Top tenders of the whole corpus by best keyword score against a company's experiences."""
+        best = self.keyword_scores(experiences, mode).best_per_tender()
+        if len(best) == 0:
+            return []
+        limit = min(limit, len(best))
+        top = np.argpartition(-best, limit - 1)[:limit]
+        top = top[np.argsort(-best[top], kind="stable")]
+        return [(self.tender_ids[row], float(best[row])) for row in top if best[row] > 0]
+
+
+def _known_columns(vocabulary: np.ndarray, tokens: Sequence[int]) -> np.ndarray:
+    """Column indices of the tokens present in the (sorted) vocabulary."""
+    if len(vocabulary) == 0 or len(tokens) == 0:
+        return np.zeros(0, dtype=np.int64)
+    tokens_arr = np.asarray(tokens, dtype=np.int64)
+    cols = np.searchsorted(vocabulary, tokens_arr)
+    in_range = cols < len(vocabulary)
+    cols, tokens_arr = cols[in_range], tokens_arr[in_range]
+    return cols[vocabulary[cols] == tokens_arr]
+
+
+_index: Optional[CorpusIndex] = None
+_index_lock = threading.Lock()
+_rebuilding = False  # A background rebuild is running (guarded by _index_lock)
+
+
+def _rebuild_index() -> None:
+    """Build a fresh index on its own session and swap it in (background thread)."""
+    global _index, _rebuilding
+    db = SessionLocal()
+    try:
+        _index = CorpusIndex.build(db)
+    except Exception as e:
+        logger.error(f"Corpus index rebuild failed, still serving version {_index.version}: {e}", exc_info=True)
+    finally:
+        db.close()
+        with _index_lock:
+            _rebuilding = False
+
+
+def get_corpus_index(db: Session) -> CorpusIndex:
+    """
+    Return the process-wide corpus index.
+
+    Only the first call builds it in the request. When the statistics
+    version moves (every ingestion batch), the current index keeps being
+    served while a new one is built in a background thread and swapped in;
+    tenders it does not contain yet fall back to classic scoring
+    (KeywordScores.for_tender).
+    """
+    global _index, _rebuilding
+    index = _index
+    if index is None:
+        with _index_lock:
+            if _index is None:
+                _index = CorpusIndex.build(db)
+            return _index
+
+    version = db.query(CorpusStatistics.version).filter(CorpusStatistics.id == 1).scalar() or 0
+    if index.version != version:
+        with _index_lock:
+            start = not _rebuilding
+            _rebuilding = True
+        if start:
+            threading.Thread(target=_rebuild_index, name="corpus-index", daemon=True).start()
+    return index
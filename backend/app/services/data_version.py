@@ -0,0 +1,92 @@
+"""Global data version: bumped by tender and experience writes, read by response caching."""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.data_version import DataVersion
+
+# Rows of the data_version table
+DATA_VERSION_ID = 1  # Every API-visible write (tenders, experiences)
+EXPERIENCE_VERSION_ID = 2  # Writes to company_experiences only (experience profile cache)
+
+# Row ID -> (last version read from the database, when), shared by the requests of this process
+_cached: Dict[int, Tuple[int, float]] = {}
+_lock = threading.Lock()
+
+
+def _bump(db: Session, row_id: int) -> None:
+    stmt = insert(DataVersion).values(id=row_id, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataVersion.id],
+        set_={"version": DataVersion.version + 1, "updated_at": func.now()},
+    )
+    db.execute(stmt)
+
+
+def bump_data_version(db: Session, experiences: bool = False) -> None:
+    """
+    Increment the data version inside the caller's transaction.
+    
+    The bump commits (or rolls back) together with the data it describes, and
+    this process forgets its cached version once the transaction commits.
+    
+    Args:
+        db: Database session
+        experiences: The transaction writes company_experiences; also bumps
+            the experience version
+    """
+    _bump(db, DATA_VERSION_ID)
+    if experiences:
+        _bump(db, EXPERIENCE_VERSION_ID)
+    event.listen(db, "after_commit", _forget_cached_version, once=True)
+
+
+def _forget_cached_version(session=None) -> None:
+    with _lock:
+        _cached.clear()
+
+
+def _cached_version(row_id: int, max_age: float) -> Optional[int]:
+    with _lock:
+        entry = _cached.get(row_id)
+        if entry is not None and time.monotonic() - entry[1] < max_age:
+            return entry[0]
+        return None
+
+
+def _get_version(db: Session, row_id: int, max_age: float) -> int:
+    version = _cached_version(row_id, max_age)
+    if version is not None:
+        return version
+    now = time.monotonic()
+    version = db.query(DataVersion.version).filter(DataVersion.id == row_id).scalar() or 0
+    with _lock:
+        _cached[row_id] = (version, now)
+    return version
+
+
+def cached_data_version(max_age: float) -> Optional[int]:
+    """Version read by this process less than max_age seconds ago, without a query (None if stale)."""
+    return _cached_version(DATA_VERSION_ID, max_age)
+
+
+def get_data_version(db: Session, max_age: float = 0.0) -> int:
+    """
+    Current data version.
+    
+    Args:
+        db: Database session
+        max_age: Seconds a previously read version may be reused without a query.
+            Writes made by this process are seen immediately; writes made by other
+            processes (e.g. another API worker) within this many seconds.
+    """
+    return _get_version(db, DATA_VERSION_ID, max_age)
+
+
+def get_experience_version(db: Session, max_age: float = 0.0) -> int:
+    """Current experience version (moves only when company_experiences change); max_age as in get_data_version."""
+    return _get_version(db, EXPERIENCE_VERSION_ID, max_age)
@@ -0,0 +1,349 @@
+"""Entity-name canonicalization: maps contracting entity names to integer IDs."""
+import hashlib
+import re
+import threading
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.db import SessionLocal
+from app.models.tender import Tender
+from app.models.company_experience import CompanyExperience
+from app.services.data_version import get_data_version
+from app.services.tokenization import STOP_WORDS, tokenize
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Well-known Colombian public entities: acronym -> full name
+KNOWN_ALIASES = {
+    "INVIAS": "Instituto Nacional de Vías",
+    "ANI": "Agencia Nacional de Infraestructura",
+    "IDU": "Instituto de Desarrollo Urbano",
+    "UMV": "Unidad de Mantenimiento Vial",
+    "UAERMV": "Unidad de Mantenimiento Vial",
+    "FINDETER": "Financiera de Desarrollo Territorial",
+    "ENTERRITORIO": "Empresa Nacional Promotora del Desarrollo Territorial",
+    "FONADE": "Empresa Nacional Promotora del Desarrollo Territorial",
+    "AEROCIVIL": "Unidad Administrativa Especial de Aeronáutica Civil",
+    "UNGRD": "Unidad Nacional para la Gestión del Riesgo de Desastres",
+    "EAAB": "Empresa de Acueducto y Alcantarillado de Bogotá",
+    "EPM": "Empresas Públicas de Medellín",
+    "FONTUR": "Fondo Nacional de Turismo",
+}
+
+# Acronyms written next to the full name: "Instituto Nacional de Vías (INVIAS)", "... - INVIAS".
+# Uppercase only: "(Antioquia)" is a department, not an acronym.
+_ACRONYM_RE = re.compile(r"\(\s*([A-Z]{2,12})\s*\)|\s[-–]\s*([A-Z]{2,12})\s*$")
+
+# Bounds of the per-name and per-pair lookup caches (cleared when exceeded)
+MAX_CACHED_NAMES = 100000
+MAX_CACHED_PAIRS = 200000
+
+# Scores returned by EntityDictionary.score (same scale as the original string heuristics)
+SAME_ENTITY_SCORE = 1.0
+CONTAINED_SCORE = 0.7
+TOKEN_OVERLAP_SCORE = 0.4
+
+
+def canonical_key(name: str) -> str:
+    """Accent-folded, punctuation-free, stop-word filtered form of an entity name."""
+    return " ".join(token for token in tokenize(name or "") if token not in STOP_WORDS)
+
+
+def acronym_matches(acronym: str, name: str) -> bool:
+    """
+    Whether an acronym is built from the significant words of a name, in order.
+    
+    Each piece of the acronym is a prefix of a word, starting with the first
+    word; words may be skipped: INVIAS = IN(stituto) (nacional) VIAS,
+    CORMACARENA = COR(poración) MACARENA, EPM = E(mpresas) P(úblicas) M(edellín).
+    """
+    letters = canonical_key(acronym).replace(" ", "")
+    words = canonical_key(name).split()
+    if not letters or not words or words[0][0] != letters[0]:
+        return False
+    
+    failed = set()
+    
+    def match(position: int, word: int, first: bool) -> bool:
+        if position == len(letters):
+            return True
+        if (position, word) in failed:
+            return False
+        for index in range(word, word + 1 if first else len(words)):
+            candidate = words[index]
+            length = 0
+            while length < len(candidate) and position + length < len(letters) and candidate[length] == letters[position + length]:
+                length += 1
+                if match(position + length, index + 1, False):
+                    return True
+        failed.add((position, word))
+        return False
+    
+    return match(0, 0, True)
+
+
+def entity_id_of(key: str) -> int:
+    """
+    ID of a canonical key: a stable 64-bit hash.
+
+    IDs depend on the key alone, not on registration order, so they mean the
+    same thing in every process and in every dictionary snapshot.
+    """
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+def _key_similarity(key: str, tokens: FrozenSet[str], other_key: str, other_tokens: FrozenSet[str]) -> float:
+    if key == other_key:
+        return SAME_ENTITY_SCORE
+    if key in other_key or other_key in key:
+        return CONTAINED_SCORE
+    if not tokens.isdisjoint(other_tokens):
+        return TOKEN_OVERLAP_SCORE
+    return 0.0
+
+
+class EntityDictionary:
+    """
+    Maps entity names to canonical integer IDs (entity_id_of) with precomputed token sets.
+
+    Names with the same canonical key, and acronyms registered as aliases
+    (known ones plus those learned from names like "Instituto Nacional de Vías
+    (INVIAS)"), share an ID. Entity scoring then becomes an integer comparison
+    plus a cached token-overlap lookup.
+
+    Names are only registered while the dictionary is built (add_names, see
+    load_entity_dictionary), in an order that depends on nothing but the set
+    of names, so every process building from the same data learns the same
+    aliases. Lookups never register anything; names the dictionary does not
+    know yet are scored from their keys (score_names).
+    """
+
+    def __init__(self, version: Optional[int] = None):
+        self._id_of_key: Dict[str, int] = {}  # Canonical keys and alias keys -> ID
+        self._id_of_name: Dict[str, int] = {}
+        self._keys: Dict[int, str] = {}  # ID -> canonical key of registered entities
+        self._tokens: Dict[int, FrozenSet[str]] = {}
+        self._pair_scores: Dict[Tuple[int, int], float] = {}
+        self._lock = threading.Lock()
+        self.version = version  # Data version the names were loaded at (None = known aliases only)
+        for acronym, full_name in KNOWN_ALIASES.items():
+            self.add_alias(acronym, full_name)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def knows(self, entity_id: Optional[int]) -> bool:
+        """Whether an ID belongs to an entity registered in this dictionary."""
+        return entity_id in self._keys
+
+    def _register_key(self, key: str) -> int:
+        entity_id = self._id_of_key.get(key)
+        if entity_id is None:
+            entity_id = entity_id_of(key)
+            self._keys[entity_id] = key
+            self._tokens[entity_id] = frozenset(key.split())
+            self._id_of_key[key] = entity_id
+        return entity_id
+
+    def add_alias(self, alias: str, name: str) -> int:
+        """Make an alias (usually an acronym) resolve to the same ID as a full name."""
+        with self._lock:
+            entity_id = self._register_key(canonical_key(name))
+            alias_key = canonical_key(alias)
+            current = self._id_of_key.get(alias_key)
+            if current is not None and current != entity_id and self._keys[current] == alias_key:
+                # Already an entity of its own (a name, not an alias): keep it apart
+                return entity_id
+            if current != entity_id:
+                self._id_of_key[alias_key] = entity_id
+                # Names already resolved through the alias must be looked up again
+                self._id_of_name.clear()
+                self._pair_scores.clear()
+            return entity_id
+
+    def _acronym_of(self, name: str) -> Optional[Tuple[str, str]]:
+        """(acronym, full name) when a name carries an acronym spelled from its own words."""
+        acronym_match = _ACRONYM_RE.search(name)
+        if not acronym_match:
+            return None
+        acronym = acronym_match.group(1) or acronym_match.group(2)
+        full_name = _ACRONYM_RE.sub(" ", name)
+        if not acronym_matches(acronym, full_name):
+            return None
+        return acronym, full_name
+
+    def _alias_id(self, acronym: str) -> Optional[int]:
+        """ID an acronym is an alias of (None when unknown or registered as a name of its own)."""
+        acronym_key = canonical_key(acronym)
+        entity_id = self._id_of_key.get(acronym_key)
+        if entity_id is None or self._keys[entity_id] == acronym_key:
+            return None
+        return entity_id
+
+    def _register_name(self, name: str) -> Optional[int]:
+        acronym = self._acronym_of(name)
+        if acronym:
+            entity_id = self._alias_id(acronym[0])
+            # New acronym, or one already registered as a name (kept apart by add_alias)
+            return entity_id if entity_id is not None else self.add_alias(*acronym)
+        key = canonical_key(name)
+        if not key:
+            return None
+        with self._lock:
+            return self._register_key(key)
+
+    def add_names(self, names: Iterable[Optional[str]]) -> None:
+        """
+        Register names while building the dictionary.
+
+        Acronym-bearing names go first so their aliases are learned, and each
+        group is sorted, so the result depends only on the set of names.
+        """
+        names = sorted({name for name in names if name}, key=lambda name: (_ACRONYM_RE.search(name) is None, name))
+        for name in names:
+            self._register_name(name)
+
+    def resolve_key(self, name: Optional[str]) -> str:
+        """Canonical key a name resolves to, through known aliases ("" for empty names); registers nothing."""
+        if not name:
+            return ""
+        acronym = self._acronym_of(name)
+        if acronym:
+            entity_id = self._alias_id(acronym[0])
+            return self._keys[entity_id] if entity_id is not None else canonical_key(acronym[1])
+        key = canonical_key(name)
+        entity_id = self._id_of_key.get(key)
+        return self._keys[entity_id] if entity_id is not None else key
+
+    def lookup(self, name: Optional[str]) -> Optional[int]:
+        """Canonical ID of an entity name; None for empty names and names not registered (see add_names)."""
+        if not name:
+            return None
+        entity_id = self._id_of_name.get(name)
+        if entity_id is not None:
+            return entity_id
+        entity_id = self._id_of_key.get(self.resolve_key(name))
+        if entity_id is not None:
+            with self._lock:
+                if len(self._id_of_name) >= MAX_CACHED_NAMES:
+                    self._id_of_name.clear()
+                self._id_of_name[name] = entity_id
+        return entity_id
+
+    def score(self, tender_entity_id: Optional[int], experience_entity_id: Optional[int]) -> float:
+        """Similarity of two canonical entities (1.0 same, 0.7 contained, 0.4 shared words, else 0.0)."""
+        if tender_entity_id is None or experience_entity_id is None:
+            return 0.0
+        if tender_entity_id == experience_entity_id:
+            return SAME_ENTITY_SCORE
+        if not (self.knows(tender_entity_id) and self.knows(experience_entity_id)):
+            return 0.0
+        pair = (tender_entity_id, experience_entity_id)
+        score = self._pair_scores.get(pair)
+        if score is None:
+            score = _key_similarity(
+                self._keys[tender_entity_id], self._tokens[tender_entity_id],
+                self._keys[experience_entity_id], self._tokens[experience_entity_id],
+            )
+            if len(self._pair_scores) >= MAX_CACHED_PAIRS:
+                self._pair_scores.clear()
+            self._pair_scores[pair] = score
+        return score
+
+    def score_names(self, tender_entity: Optional[str], experience_entity: Optional[str]) -> float:
+        """
+        score() for two names, including names registered after this dictionary was built.
+
+        Unknown names are compared through their resolved keys, giving the
+        score they will have once the dictionary is rebuilt with them.
+        """
+        tender_entity_id, experience_entity_id = self.lookup(tender_entity), self.lookup(experience_entity)
+        if self.knows(tender_entity_id) and self.knows(experience_entity_id):
+            return self.score(tender_entity_id, experience_entity_id)
+        tender_key, experience_key = self.resolve_key(tender_entity), self.resolve_key(experience_entity)
+        if not tender_key or not experience_key:
+            return 0.0
+        return _key_similarity(
+            tender_key, frozenset(tender_key.split()), experience_key, frozenset(experience_key.split())
+        )
+
+
+_dictionary = EntityDictionary()
+_refresh_lock = threading.Lock()
+_refreshing = False  # A background reload is running (guarded by _refresh_lock)
+
+
+def get_entity_dictionary() -> EntityDictionary:
+    """Return the process-wide entity dictionary."""
+    return _dictionary
+
+
+def set_entity_dictionary(dictionary: EntityDictionary) -> None:
+    """Install a dictionary snapshot (loaded ones, and the parent's in matching worker processes)."""
+    global _dictionary
+    _dictionary = dictionary
+
+
+def load_entity_dictionary(db: Session) -> EntityDictionary:
+    """
+    Build the dictionary from every entity name in tenders and company experiences and install it.
+
+    The result depends only on the stored names (see EntityDictionary.add_names),
+    so processes loading the same data version agree on every ID and alias.
+    """
+    version = get_data_version(db)
+    names = [name for (name,) in db.query(Tender.entity_name).distinct()]
+    names += [name for (name,) in db.query(CompanyExperience.contracting_entity).distinct()]
+    dictionary = EntityDictionary(version)
+    dictionary.add_names(names)
+    set_entity_dictionary(dictionary)
+    logger.info(f"Entity dictionary loaded: {len(dictionary)} canonical entities from {len(names)} names (version {version})")
+    return dictionary
+
+
+def _reload_in_background() -> None:
+    global _refreshing
+    db = SessionLocal()
+    try:
+        load_entity_dictionary(db)
+    except Exception as e:
+        logger.error(f"Entity dictionary reload failed: {e}", exc_info=True)
+    finally:
+        db.close()
+        with _refresh_lock:
+            _refreshing = False
+
+
+def start_entity_dictionary_reload() -> None:
+    """Load the dictionary in a background thread (no-op while one runs)."""
+    global _refreshing
+    with _refresh_lock:
+        if _refreshing:
+            return
+        _refreshing = True
+    threading.Thread(target=_reload_in_background, name="entity-dictionary", daemon=True).start()
+
+
+def refresh_entity_dictionary(db: Session) -> EntityDictionary:
+    """
+    Current dictionary for request-time matching.
+
+    When tenders or experiences changed since it was loaded, a reload starts
+    in the background and the current snapshot keeps being served.
+    """
+    version = get_data_version(db, max_age=settings.RESPONSE_CACHE_VERSION_MAX_AGE)
+    if _dictionary.version != version:
+        start_entity_dictionary_reload()
+    return _dictionary
@@ -1,15 +1,24 @@
-"""Excel import service for company experiences."""
-import json
+"""Import service for company experiences (Excel, CSV and Parquet files)."""
+import csv
+import enum
 import pandas as pd
-from typing import List, Tuple, Optional
-from datetime import datetime
+from itertools import chain, islice
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple, Optional
+from openpyxl import load_workbook
+from datetime import date, datetime
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
 from app.core.db import SessionLocal
 from app.models.company_experience import CompanyExperience
-from app.services.experience_matching import extract_keywords
+from app.services.keywords import extract_keywords_batch
+from app.services.data_version import bump_data_version
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Formats tried in order by parse_date/parse_dates before pandas' own parser
+DATE_FORMATS = ['%m/%d/%Y', '%d/%m/%Y', '%Y-%m-%d', '%m-%d-%Y', '%d-%m-%Y']
+
 
 def parse_date(date_str: str) -> Optional[datetime]:
     """Parse date string in various formats."""
@@ -23,7 +32,7 @@ def parse_date(date_str: str) -> Optional[datetime]:
         
         # Try common date formats
         date_str_clean = str(date_str).strip()
-        for fmt in ['%m/%d/%Y', '%d/%m/%Y', '%Y-%m-%d', '%m-%d-%Y', '%d-%m-%Y']:
+        for fmt in DATE_FORMATS:
             try:
                 return datetime.strptime(date_str_clean, fmt).date()
             except ValueError:
@@ -55,12 +64,582 @@ def parse_amount(amount_str: str) -> Optional[float]:
         return None
 
 
-def import_experiences_from_excel(
+# Records per bulk INSERT/UPDATE round (progress is reported after each)
+UPSERT_BATCH_SIZE = 1000
+
+# Sheet rows parsed and written at a time by the streaming import (bounds memory)
+READ_CHUNK_ROWS = 5000
+
+# Leading rows searched for the header row
+HEADER_SCAN_ROWS = 5
+
+# Words that make a row look like the header row when no row maps OBRA
+HEADER_HINTS = ['obra', 'empresa', 'contrato', 'entidad', 'fecha', 'valor']
+
+# Header spellings (lowercase, accents removed) -> canonical column
+COLUMN_MAPPING = {
+    'empresa': 'EMPRESA',
+    'contrato no.': 'CONTRATO No.',
+    'contrato no': 'CONTRATO No.',
+    'contrato': 'CONTRATO No.',
+    'obra': 'OBRA',
+    'obras': 'OBRA',
+    'descripcion': 'OBRA',
+    'descripción': 'OBRA',
+    'proyecto': 'OBRA',
+    'entidad contratante': 'ENTIDAD CONTRATANTE',
+    'entidad': 'ENTIDAD CONTRATANTE',
+    'fecha finalización': 'FECHA FINALIZACIÓN',
+    'fecha finalizacion': 'FECHA FINALIZACIÓN',
+    'fecha': 'FECHA FINALIZACIÓN',
+    'valor actual': 'VALOR ACTUAL',
+    'valor': 'VALOR ACTUAL',
+    'monto': 'VALOR ACTUAL',
+    'categoría': 'CATEGORÍA',
+    'categoria': 'CATEGORÍA',
+    'área de la ingeniería civil': 'ÁREA DE LA INGENIERÍA CIVIL',
+    'area de la ingenieria civil': 'ÁREA DE LA INGENIERÍA CIVIL',
+    'area': 'ÁREA DE LA INGENIERÍA CIVIL',
+    'área': 'ÁREA DE LA INGENIERÍA CIVIL',
+}
+
+# Optional text columns -> CompanyExperience attribute
+TEXT_COLUMNS = {
+    'CONTRATO No.': 'contract_number',
+    'ENTIDAD CONTRATANTE': 'contracting_entity',
+    'CATEGORÍA': 'category',
+    'ÁREA DE LA INGENIERÍA CIVIL': 'engineering_area',
+}
+
+# Attributes written on insert and overwritten on re-import of a contract
+EXPERIENCE_FIELDS = (
+    'company_name',
+    'contract_number',
+    'project_description',
+    'contracting_entity',
+    'completion_date',
+    'amount',
+    'category',
+    'engineering_area',
+    'keywords',
+)
+
+
+def _empty_like(values: pd.Series) -> pd.Series:
+    return pd.Series([None] * len(values), index=values.index, dtype=object)
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """
+    Column version of parse_date: same rules, applied with vectorized pandas parsing.
+    
+    Numbers are Excel serial dates, date/datetime cells are kept, and text is
+    tried against DATE_FORMATS in order; only text none of them parses falls
+    back to parse_date one value at a time.
+    """
+    result = _empty_like(values)
+    present = values.notna() & values.astype(bool)
+    if not present.any():
+        return result
+    values = values[present]
+    
+    is_date = values.map(lambda value: isinstance(value, (datetime, date)))
+    is_number = values.map(lambda value: isinstance(value, (int, float)) and not isinstance(value, bool))
+    
+    if is_date.any():
+        result[is_date[is_date].index] = pd.to_datetime(values[is_date]).dt.date
+    if is_number.any():
+        serials = pd.to_numeric(values[is_number])
+        result[serials.index] = pd.to_datetime(serials, origin='1899-12-30', unit='D').dt.date
+    
+    remaining = values[~(is_date | is_number)].astype(str).str.strip()
+    for fmt in DATE_FORMATS:
+        if remaining.empty:
+            break
+        parsed = pd.to_datetime(remaining, format=fmt, errors='coerce')
+        matched = parsed.notna()
+        result[parsed[matched].index] = parsed[matched].dt.date
+        remaining = remaining[~matched]
+    if not remaining.empty:
+        result[remaining.index] = remaining.map(parse_date)
+    return result
+
+
+def parse_amounts(values: pd.Series) -> pd.Series:
+    """Column version of parse_amount: currency symbols, commas and spaces removed, then numeric."""
+    result = _empty_like(values)
+    present = values.notna() & values.astype(bool)
+    if not present.any():
+        return result
+    cleaned = values[present].astype(str).str.strip().str.replace(r'[$, ]', '', regex=True)
+    amounts = pd.to_numeric(cleaned, errors='coerce')
+    invalid = amounts.isna()
+    if invalid.any():
+        logger.warning(f"Could not parse {int(invalid.sum())} amounts, e.g. '{values[present][invalid].iloc[0]}'")
+    amounts = amounts[~invalid]
+    result[amounts.index] = amounts.astype(float)
+    return result
+
+
+def _text_values(values: pd.Series) -> pd.Series:
+    """Stripped strings, None for empty cells (NaN)."""
+    result = _empty_like(values)
+    present = values.notna()
+    result[present] = values[present].astype(str).str.strip()
+    return result
+
+
+def read_experience_sheet(file_path: str) -> pd.DataFrame:
+    """
+    Read the experiences sheet, finding the header row when the first row is not it.
+    
+    Column names are stripped; blank headers become Column_<n>.
+    """
+    # Try reading with header=0 first (standard case)
+    df = pd.read_excel(file_path, header=0)
+    
+    # Check if we got unnamed columns (means headers might be missing or in wrong row)
+    unnamed_cols = [col for col in df.columns if str(col).startswith('Unnamed')]
+    if len(unnamed_cols) > 0 and len(unnamed_cols) == len(df.columns):
+        # All columns are unnamed, try to find headers in first few rows
+        logger.info("All columns are unnamed, searching for header row")
+        df_raw = pd.read_excel(file_path, header=None)
+        
+        # Look for a row that contains "obra" or similar keywords (likely the header row)
+        header_row_idx = None
+        for idx in range(min(5, len(df_raw))):  # Check first 5 rows
+            row_values = [str(val).lower().strip() for val in df_raw.iloc[idx].values if pd.notna(val)]
+            row_text = ' '.join(row_values)
+            # Check if this row looks like headers (contains expected column names)
+            if any(keyword in row_text for keyword in ['obra', 'empresa', 'contrato', 'entidad', 'fecha', 'valor']):
+                header_row_idx = idx
+                logger.info(f"Found potential header row at index {idx}: {row_values}")
+                break
+        
+        if header_row_idx is not None:
+            # Use the found row as headers
+            df.columns = df_raw.iloc[header_row_idx]
+            df = df_raw.iloc[header_row_idx + 1:].reset_index(drop=True)
+            logger.info(f"Using row {header_row_idx} as headers: {list(df.columns)}")
+        else:
+            # Fallback: use first row as headers
+            logger.info("No header row found, using first row as headers")
+            df.columns = df_raw.iloc[0]
+            df = df_raw.iloc[1:].reset_index(drop=True)
+            logger.info(f"Using first row as headers: {list(df.columns)}")
+    
+    # Normalize column names (remove extra spaces, handle NaN)
+    df.columns = [str(col).strip() if pd.notna(col) and str(col) != 'nan' else f"Column_{i}" for i, col in enumerate(df.columns)]
+    return df
+
+
+class ExperienceFileFormat(str, enum.Enum):
+    """Experience file format (see detect_file_format)."""
+    XLSX = "xlsx"
+    XLS = "xls"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+# Leading bytes of the binary formats; anything else is read as CSV
+FILE_SIGNATURES = (
+    (b'PAR1', ExperienceFileFormat.PARQUET),
+    (b'PK\x03\x04', ExperienceFileFormat.XLSX),
+    (b'\xd0\xcf\x11\xe0', ExperienceFileFormat.XLS),
+)
+
+# Bytes of a CSV file sniffed for its encoding, delimiter and header row
+CSV_SAMPLE_BYTES = 64 * 1024
+
+CSV_DELIMITERS = ',;\t|'
+
+
+class SheetRows(NamedTuple):
+    """Rows of an experiences file below its header row, read lazily in chunks."""
+    columns: List[str]  # Unique, stripped header names (Column_<n> when blank)
+    first_row: int  # Row number (in the file) of the first data row
+    total_rows: Optional[int]  # Data rows, when the file declares its size
+    # DataFrames of at most READ_CHUNK_ROWS rows with the columns above, indexed
+    # by data row offset (0 = first_row); blank rows are left out
+    chunks: Iterator[pd.DataFrame]
+
+
+def detect_file_format(file_path: str) -> ExperienceFileFormat:
+    """Format of an experiences file from its leading bytes (the file name is not trusted)."""
+    with open(file_path, 'rb') as f:
+        head = f.read(8)
+    for signature, file_format in FILE_SIGNATURES:
+        if head.startswith(signature):
+            return file_format
+    return ExperienceFileFormat.CSV
+
+
+def _is_blank(row: tuple) -> bool:
+    return all(value is None or (isinstance(value, str) and not value.strip()) for value in row)
+
+
+def _column_names(header: tuple) -> List[str]:
+    """Header cells as unique column names (duplicates suffixed .1, .2 like pandas; trailing blanks dropped)."""
+    header = list(header)
+    while header and _is_blank(header[-1:]):
+        header.pop()
+    names = []
+    seen = {}
+    for i, value in enumerate(header):
+        name = str(value).strip() if value is not None and str(value).strip() not in ('', 'nan') else f"Column_{i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def find_header_row(rows: List[tuple]) -> int:
+    """
+    Index of the header row among the first rows of a sheet.
+    
+    The first non-blank row whose cells map the OBRA column wins; failing
+    that, the first row mentioning a known header word; failing that, the
+    first non-blank row.
+    """
+    candidates = [i for i, row in enumerate(rows) if not _is_blank(row)]
+    if not candidates:
+        return 0
+    for i in candidates:
+        if 'OBRA' in map_experience_columns(_column_names(rows[i]), log=False):
+            return i
+    for i in candidates:
+        row_text = ' '.join(str(value).lower().strip() for value in rows[i] if value is not None)
+        if any(keyword in row_text for keyword in HEADER_HINTS):
+            return i
+    return candidates[0]
+
+
+def _row_chunks(rows: Iterator[tuple], columns: List[str]) -> Iterator[pd.DataFrame]:
+    """Non-blank rows, padded/truncated to the header width, READ_CHUNK_ROWS per DataFrame."""
+    width = len(columns)
+    offsets = []
+    values = []
+    for offset, row in enumerate(rows):
+        if _is_blank(row):
+            continue
+        row = tuple(row[:width])
+        offsets.append(offset)
+        values.append(row + (None,) * (width - len(row)))
+        if len(values) >= READ_CHUNK_ROWS:
+            yield pd.DataFrame(values, columns=columns, index=offsets)
+            offsets = []
+            values = []
+    if values:
+        yield pd.DataFrame(values, columns=columns, index=offsets)
+
+
+def _frame_chunks(chunks: Iterator[pd.DataFrame], columns: List[str]) -> Iterator[pd.DataFrame]:
+    """pandas/pyarrow chunks renamed to the header names, object-typed and without blank rows."""
+    offset = 0
+    for chunk in chunks:
+        chunk = chunk.astype(object)
+        chunk.columns = columns
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        blank = chunk.isna() | chunk.astype(str).apply(lambda values: values.str.strip() == '')
+        chunk = chunk[~blank.all(axis=1)]
+        if not chunk.empty:
+            yield chunk
+
+
+def read_sheet_rows(file_path: str) -> SheetRows:
+    """
+    Stream the first sheet of an .xlsx workbook in one pass (openpyxl read-only mode).
+    
+    The first HEADER_SCAN_ROWS rows are buffered to find the header row
+    (find_header_row); the rest are read lazily, so memory stays bounded
+    whatever the sheet size. Cells come typed (numbers, datetimes, text).
+    The workbook is closed once the rows are exhausted.
+    """
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        head = list(islice(rows, HEADER_SCAN_ROWS))
+        header_idx = find_header_row(head)
+        columns = _column_names(head[header_idx] if head else ())
+        max_row = sheet.max_row
+    except Exception:
+        workbook.close()
+        raise
+    
+    def chunks() -> Iterator[pd.DataFrame]:
+        try:
+            yield from _row_chunks(chain(head[header_idx + 1:], rows), columns)
+        finally:
+            workbook.close()
+    
+    first_row = header_idx + 2
+    total_rows = max(max_row - first_row + 1, 0) if max_row else None
+    return SheetRows(columns, first_row, total_rows, chunks())
+
+
+def _sniff_encoding(sample: bytes) -> str:
+    """Encoding of a CSV file from its first bytes: UTF-8 when it decodes, else Latin-1."""
+    try:
+        sample.decode('utf-8-sig')
+        return 'utf-8-sig'
+    except UnicodeDecodeError as e:
+        # The sample may end in the middle of a multi-byte character
+        return 'latin-1' if e.start < len(sample) - 3 else 'utf-8-sig'
+
+
+def _detect_delimiter(lines: List[str]) -> str:
+    """
+    Delimiter of a CSV file from its first lines.
+    
+    Each candidate splits the first HEADER_SCAN_ROWS lines and is judged on
+    the header row it yields (find_header_row): one mapping OBRA beats one
+    that does not, then the candidate splitting the header into the most
+    cells wins (ties go to the earlier CSV_DELIMITERS entry). A header cut
+    with the wrong delimiter is a single cell like 'OBRA;EMPRESA;'.
+    """
+    best = None
+    for delimiter in CSV_DELIMITERS:
+        head = [tuple(row) for row in islice(csv.reader(lines, delimiter=delimiter), HEADER_SCAN_ROWS)]
+        header = _column_names(head[find_header_row(head)]) if head else []
+        score = ('OBRA' in map_experience_columns(header, log=False), len(header))
+        if best is None or score > best[0]:
+            best = (score, delimiter)
+    return best[1]
+
+
+def read_csv_rows(file_path: str) -> SheetRows:
+    """
+    Read a CSV export in READ_CHUNK_ROWS chunks (pandas C parser).
+    
+    Encoding (UTF-8 or Latin-1), delimiter (_detect_delimiter) and header
+    row are sniffed from the first CSV_SAMPLE_BYTES. Cells are read as text, so contract numbers
+    keep their leading zeros and amounts/dates go through the same parsing
+    as spreadsheet text cells.
+    """
+    with open(file_path, 'rb') as f:
+        sample = f.read(CSV_SAMPLE_BYTES)
+    encoding = _sniff_encoding(sample)
+    lines = sample.decode(encoding, errors='replace').splitlines()
+    delimiter = _detect_delimiter(lines)
+    head = [tuple(row) for row in islice(csv.reader(lines, delimiter=delimiter), HEADER_SCAN_ROWS)]
+    header_idx = find_header_row(head)
+    columns = _column_names(head[header_idx] if head else ())
+    
+    reader = pd.read_csv(
+        file_path,
+        sep=delimiter,
+        encoding=encoding,
+        header=None,
+        names=columns,
+        index_col=False,
+        skiprows=header_idx + 1,
+        dtype=str,
+        keep_default_na=False,
+        na_values=[''],
+        skip_blank_lines=False,
+        chunksize=READ_CHUNK_ROWS,
+    )
+    return SheetRows(columns, header_idx + 2, None, _frame_chunks(reader, columns))
+
+
+def read_parquet_rows(file_path: str) -> SheetRows:
+    """
+    Read a Parquet file in READ_CHUNK_ROWS record batches (pyarrow, optional dependency).
+    
+    Column names are the schema's; values keep their Parquet types. Row
+    numbers in errors count records from 1.
+    """
+    try:
+        import pyarrow.parquet as pq  # Only needed for Parquet imports
+    except ImportError:
+        raise ValueError("Parquet import requires pyarrow to be installed")
+    
+    parquet_file = pq.ParquetFile(file_path)
+    columns = _column_names(tuple(parquet_file.schema_arrow.names))
+    batches = (batch.to_pandas() for batch in parquet_file.iter_batches(batch_size=READ_CHUNK_ROWS))
+    return SheetRows(columns, 1, parquet_file.metadata.num_rows, _frame_chunks(batches, columns))
+
+
+def _frame_rows(df: pd.DataFrame) -> SheetRows:
+    frames = (df.iloc[start:start + READ_CHUNK_ROWS] for start in range(0, len(df), READ_CHUNK_ROWS))
+    return SheetRows(list(df.columns), 2, len(df), _frame_chunks(frames, list(df.columns)))
+
+
+def open_experience_rows(file_path: str) -> SheetRows:
+    """
+    Rows of an experiences file in any supported format (detect_file_format).
+    
+    .xlsx is streamed, CSV and Parquet are read in chunks; legacy .xls goes
+    through pandas whole.
+    """
+    file_format = detect_file_format(file_path)
+    logger.info(f"Reading {file_format.value} file: {file_path}")
+    if file_format == ExperienceFileFormat.XLSX:
+        return read_sheet_rows(file_path)
+    if file_format == ExperienceFileFormat.PARQUET:
+        return read_parquet_rows(file_path)
+    if file_format == ExperienceFileFormat.XLS:
+        return _frame_rows(read_experience_sheet(file_path))
+    return read_csv_rows(file_path)
+
+
+def map_experience_columns(columns: List[str], log: bool = True) -> Dict[str, str]:
+    """Canonical column (OBRA, EMPRESA, ...) -> column name in the file (case-insensitive, accents ignored)."""
+    actual_columns = {}
+    for col in columns:
+        # Normalize: lowercase, strip, remove accents for matching
+        col_normalized = col.lower().strip()
+        # Remove common accents
+        col_normalized = col_normalized.replace('á', 'a').replace('é', 'e').replace('í', 'i').replace('ó', 'o').replace('ú', 'u')
+        col_normalized = col_normalized.replace('ñ', 'n')
+        
+        # Try exact match first
+        if col_normalized in COLUMN_MAPPING:
+            actual_columns[COLUMN_MAPPING[col_normalized]] = col
+        else:
+            # Try partial match for OBRA (most important)
+            if 'obra' in col_normalized and 'OBRA' not in actual_columns:
+                actual_columns['OBRA'] = col
+                if log:
+                    logger.info(f"Matched '{col}' to OBRA by partial match")
+    return actual_columns
+
+
+def prepare_experience_records(
+    df: pd.DataFrame,
+    actual_columns: Dict[str, str],
+    company_name: str,
+    first_row: int = 2,
+) -> Tuple[List[Dict], List[str]]:
+    """
+    CompanyExperience values of every valid row, parsed column by column.
+    
+    Args:
+        df: Sheet rows, indexed by data row offset (a default RangeIndex counts from the first row)
+        actual_columns: map_experience_columns result (must include OBRA)
+        company_name: Company of rows without an EMPRESA value
+        first_row: Spreadsheet row number of offset 0, for error messages
+    
+    Returns:
+        Tuple of (records with EXPERIENCE_FIELDS keys, per-row errors)
+    """
+    errors = []
+    columns = {}
+    
+    descriptions = df[actual_columns['OBRA']].astype(str).str.strip()
+    empty = (descriptions == '') | descriptions.str.lower().isin(['nan', 'none'])
+    columns['project_description'] = descriptions
+    
+    companies = pd.Series(company_name, index=df.index, dtype=object)
+    if 'EMPRESA' in actual_columns:
+        row_companies = _text_values(df[actual_columns['EMPRESA']])
+        companies = row_companies.where(row_companies.notna(), companies)
+    columns['company_name'] = companies
+    
+    for canonical, field in TEXT_COLUMNS.items():
+        if canonical in actual_columns:
+            columns[field] = _text_values(df[actual_columns[canonical]])
+    if 'FECHA FINALIZACIÓN' in actual_columns:
+        columns['completion_date'] = parse_dates(df[actual_columns['FECHA FINALIZACIÓN']])
+    if 'VALOR ACTUAL' in actual_columns:
+        columns['amount'] = parse_amounts(df[actual_columns['VALOR ACTUAL']])
+    
+    parsed = pd.DataFrame(columns, index=df.index).astype(object)
+    parsed = parsed.where(parsed.notna(), None)
+    
+    # Keywords of every non-empty description in one batch
+    keywords = iter(extract_keywords_batch(descriptions[~empty].tolist()))
+    
+    records = []
+    for offset, row, row_empty in zip(df.index.tolist(), parsed.to_dict('records'), empty.tolist()):
+        if row_empty:
+            errors.append(f"Row {offset + first_row}: Empty OBRA")
+            continue
+        record = dict.fromkeys(EXPERIENCE_FIELDS)
+        record.update(row)
+        record['keywords'] = next(keywords) or None
+        records.append(record)
+    return records, errors
+
+
+def upsert_experiences(
+    db: Session,
+    records: List[Dict],
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Insert new experiences and update re-imported contracts in bulk (caller commits).
+    
+    A record updates the experience with the same company and contract number
+    (looked up for all records in one query); records without a contract
+    number are always inserted.
+    
+    Args:
+        db: Database session
+        records: prepare_experience_records output
+        on_progress: Called with the number of records written after each batch
+    
+    Returns:
+        Number of inserted experiences
+    """
+    companies = {record['company_name'] for record in records if record['contract_number']}
+    existing = {}
+    if companies:
+        rows = db.query(
+            CompanyExperience.id, CompanyExperience.company_name, CompanyExperience.contract_number,
+        ).filter(
+            CompanyExperience.company_name.in_(companies),
+            CompanyExperience.contract_number.isnot(None),
+        ).all()
+        for experience_id, row_company, contract_number in rows:
+            existing.setdefault((row_company, contract_number), experience_id)
+    
+    now = datetime.utcnow()
+    inserted = 0
+    updated = 0
+    for start in range(0, len(records), UPSERT_BATCH_SIZE):
+        new_records = []
+        updates = []
+        for record in records[start:start + UPSERT_BATCH_SIZE]:
+            experience_id = existing.get((record['company_name'], record['contract_number'])) if record['contract_number'] else None
+            if experience_id is None:
+                new_records.append(record)
+            else:
+                updates.append({**record, 'id': experience_id, 'updated_at': now})
+        
+        if new_records:
+            db.execute(insert(CompanyExperience), new_records)
+        if updates:
+            db.execute(update(CompanyExperience), updates)
+        inserted += len(new_records)
+        updated += len(updates)
+        if on_progress is not None:
+            on_progress(start + len(new_records) + len(updates))
+    
+    if updated:
+        logger.info(f"Updated {updated} existing experiences")
+    return inserted
+
+
+class ImportResult(NamedTuple):
+    """Outcome of an experience import."""
+    imported: int
+    errors: List[str]
+    committed: bool  # False when nothing was written (unreadable file, missing columns, rolled back)
+
+
+def import_experiences_from_file(
     file_path: str,
-    company_name: str = "BEC"
-) -> Tuple[int, List[str]]:
+    company_name: str = "BEC",
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> ImportResult:
     """
-    Import company experiences from Excel file.
+    Import company experiences from an Excel (.xlsx/.xls), CSV or Parquet file.
     
     Expected columns:
     - EMPRESA
@@ -72,105 +651,32 @@ def import_experiences_from_excel(
     - CATEGORÍA
     - ÁREA DE LA INGENIERÍA CIVIL
     
+    The format is detected from the file's content and rows are read in
+    READ_CHUNK_ROWS chunks (open_experience_rows): columns are mapped once,
+    each chunk is parsed column-wise (prepare_experience_records) and written
+    with one lookup query and bulk INSERT/UPDATE statements, all in one
+    transaction.
+    
     Args:
-        file_path: Path to Excel file
+        file_path: Path to the file
         company_name: Company name (defaults to first row if not provided)
+        on_progress: Called with (rows processed, rows in the file or None when
+            the file does not declare its size) once the header is read,
+            after each written batch and after each chunk
         
     Returns:
-        Tuple of (imported_count, list_of_errors)
+        ImportResult (imported count, errors, whether the rows were committed)
     """
     db = SessionLocal()
     errors = []
-    imported = 0
     
     try:
-        # Read Excel file
-        logger.info(f"Reading Excel file: {file_path}")
-        
-        # Try reading with header=0 first (standard case)
-        df = pd.read_excel(file_path, header=0)
-        
-        # Check if we got unnamed columns (means headers might be missing or in wrong row)
-        unnamed_cols = [col for col in df.columns if str(col).startswith('Unnamed')]
-        if len(unnamed_cols) > 0 and len(unnamed_cols) == len(df.columns):
-            # All columns are unnamed, try to find headers in first few rows
-            logger.info("All columns are unnamed, searching for header row")
-            df_raw = pd.read_excel(file_path, header=None)
-            
-            # Look for a row that contains "obra" or similar keywords (likely the header row)
-            header_row_idx = None
-            for idx in range(min(5, len(df_raw))):  # Check first 5 rows
-                row_values = [str(val).lower().strip() for val in df_raw.iloc[idx].values if pd.notna(val)]
-                row_text = ' '.join(row_values)
-                # Check if this row looks like headers (contains expected column names)
-                if any(keyword in row_text for keyword in ['obra', 'empresa', 'contrato', 'entidad', 'fecha', 'valor']):
-                    header_row_idx = idx
-                    logger.info(f"Found potential header row at index {idx}: {row_values}")
-                    break
-            
-            if header_row_idx is not None:
-                # Use the found row as headers
-                df.columns = df_raw.iloc[header_row_idx]
-                df = df_raw.iloc[header_row_idx + 1:].reset_index(drop=True)
-                logger.info(f"Using row {header_row_idx} as headers: {list(df.columns)}")
-            else:
-                # Fallback: use first row as headers
-                logger.info("No header row found, using first row as headers")
-                df.columns = df_raw.iloc[0]
-                df = df_raw.iloc[1:].reset_index(drop=True)
-                logger.info(f"Using first row as headers: {list(df.columns)}")
-        
-        # Normalize column names (remove extra spaces, handle NaN)
-        df.columns = [str(col).strip() if pd.notna(col) and str(col) != 'nan' else f"Column_{i}" for i, col in enumerate(df.columns)]
+        sheet = open_experience_rows(file_path)
         
         # Log all columns found in the file
-        logger.info(f"All columns in Excel file: {list(df.columns)}")
-        
-        # Map expected column names (case-insensitive, with multiple variations)
-        column_mapping = {
-            'empresa': 'EMPRESA',
-            'contrato no.': 'CONTRATO No.',
-            'contrato no': 'CONTRATO No.',
-            'contrato': 'CONTRATO No.',
-            'obra': 'OBRA',
-            'obras': 'OBRA',
-            'descripcion': 'OBRA',
-            'descripción': 'OBRA',
-            'proyecto': 'OBRA',
-            'entidad contratante': 'ENTIDAD CONTRATANTE',
-            'entidad': 'ENTIDAD CONTRATANTE',
-            'fecha finalización': 'FECHA FINALIZACIÓN',
-            'fecha finalizacion': 'FECHA FINALIZACIÓN',
-            'fecha': 'FECHA FINALIZACIÓN',
-            'valor actual': 'VALOR ACTUAL',
-            'valor': 'VALOR ACTUAL',
-            'monto': 'VALOR ACTUAL',
-            'categoría': 'CATEGORÍA',
-            'categoria': 'CATEGORÍA',
-            'área de la ingeniería civil': 'ÁREA DE LA INGENIERÍA CIVIL',
-            'area de la ingenieria civil': 'ÁREA DE LA INGENIERÍA CIVIL',
-            'area': 'ÁREA DE LA INGENIERÍA CIVIL',
-            'área': 'ÁREA DE LA INGENIERÍA CIVIL',
-        }
-        
-        # Find actual column names (case-insensitive, handle accents)
-        actual_columns = {}
-        for col in df.columns:
-            # Normalize: lowercase, strip, remove accents for matching
-            col_normalized = col.lower().strip()
-            # Remove common accents
-            col_normalized = col_normalized.replace('á', 'a').replace('é', 'e').replace('í', 'i').replace('ó', 'o').replace('ú', 'u')
-            col_normalized = col_normalized.replace('ñ', 'n')
-            
-            # Try exact match first
-            if col_normalized in column_mapping:
-                actual_columns[column_mapping[col_normalized]] = col
-            else:
-                # Try partial match for OBRA (most important)
-                if 'obra' in col_normalized and 'OBRA' not in actual_columns:
-                    actual_columns['OBRA'] = col
-                    logger.info(f"Matched '{col}' to OBRA by partial match")
+        logger.info(f"All columns in file: {sheet.columns}")
         
+        actual_columns = map_experience_columns(sheet.columns)
         logger.info(f"Mapped columns: {actual_columns}")
         logger.info(f"Found expected columns: {list(actual_columns.keys())}")
         
@@ -179,138 +685,46 @@ def import_experiences_from_excel(
         missing = [req for req in required if req not in actual_columns]
         if missing:
             # Provide helpful error message with available columns
-            available_cols = ', '.join(df.columns.tolist())
+            available_cols = ', '.join(sheet.columns)
             errors.append(
                 f"Missing required columns: {', '.join(missing)}. "
                 f"Available columns in file: {available_cols}"
             )
             logger.error(f"Missing required columns. Available: {available_cols}")
-            return 0, errors
+            return ImportResult(0, errors, False)
         
-        # Process each row
-        for idx, row in df.iterrows():
-            try:
-                # Get company name (from row or parameter)
-                row_company = company_name
-                if 'EMPRESA' in actual_columns:
-                    emp_col = actual_columns['EMPRESA']
-                    if emp_col in df.columns and not pd.isna(row[emp_col]):
-                        row_company = str(row[emp_col]).strip()
-                
-                # Get project description (required)
-                obra_col = actual_columns.get('OBRA')
-                if not obra_col or obra_col not in df.columns:
-                    errors.append(f"Row {idx + 2}: Missing OBRA column")
-                    continue
-                
-                project_desc = str(row[obra_col]).strip()
-                if not project_desc or project_desc.lower() in ['nan', 'none', '']:
-                    errors.append(f"Row {idx + 2}: Empty OBRA")
-                    continue
-                
-                # Extract other fields
-                contract_num = None
-                if 'CONTRATO No.' in actual_columns:
-                    contract_col = actual_columns['CONTRATO No.']
-                    if contract_col in df.columns:
-                        contract_val = row[contract_col]
-                        if not pd.isna(contract_val):
-                            contract_num = str(contract_val).strip()
-                
-                contracting_entity = None
-                if 'ENTIDAD CONTRATANTE' in actual_columns:
-                    entity_col = actual_columns['ENTIDAD CONTRATANTE']
-                    if entity_col in df.columns:
-                        entity_val = row[entity_col]
-                        if not pd.isna(entity_val):
-                            contracting_entity = str(entity_val).strip()
-                
-                completion_date = None
-                if 'FECHA FINALIZACIÓN' in actual_columns:
-                    date_col = actual_columns['FECHA FINALIZACIÓN']
-                    if date_col in df.columns:
-                        completion_date = parse_date(row[date_col])
-                
-                amount = None
-                if 'VALOR ACTUAL' in actual_columns:
-                    amount_col = actual_columns['VALOR ACTUAL']
-                    if amount_col in df.columns:
-                        amount = parse_amount(row[amount_col])
-                
-                category = None
-                if 'CATEGORÍA' in actual_columns:
-                    cat_col = actual_columns['CATEGORÍA']
-                    if cat_col in df.columns:
-                        cat_val = row[cat_col]
-                        if not pd.isna(cat_val):
-                            category = str(cat_val).strip()
-                
-                engineering_area = None
-                if 'ÁREA DE LA INGENIERÍA CIVIL' in actual_columns:
-                    area_col = actual_columns['ÁREA DE LA INGENIERÍA CIVIL']
-                    if area_col in df.columns:
-                        area_val = row[area_col]
-                        if not pd.isna(area_val):
-                            engineering_area = str(area_val).strip()
-                
-                # Extract keywords from project description
-                keywords = extract_keywords(project_desc)
-                keywords_json = json.dumps(keywords) if keywords else None
-                
-                # Check if experience already exists (by contract number or description)
-                existing = None
-                if contract_num:
-                    existing = db.query(CompanyExperience).filter(
-                        CompanyExperience.contract_number == contract_num,
-                        CompanyExperience.company_name == row_company
-                    ).first()
-                
-                if not existing:
-                    # Create new experience
-                    experience = CompanyExperience(
-                        company_name=row_company,
-                        contract_number=contract_num,
-                        project_description=project_desc,
-                        contracting_entity=contracting_entity,
-                        completion_date=completion_date,
-                        amount=amount,
-                        category=category,
-                        engineering_area=engineering_area,
-                        keywords=keywords_json,
-                    )
-                    db.add(experience)
-                    imported += 1
-                else:
-                    # Update existing (don't count as imported)
-                    existing.project_description = project_desc
-                    existing.contracting_entity = contracting_entity
-                    existing.completion_date = completion_date
-                    existing.amount = amount
-                    existing.category = category
-                    existing.engineering_area = engineering_area
-                    existing.keywords = keywords_json
-                    existing.updated_at = datetime.utcnow()
-                    logger.info(f"Updated existing experience: {contract_num}")
-            
-            except Exception as e:
-                error_msg = f"Row {idx + 2}: {str(e)}"
-                errors.append(error_msg)
-                logger.error(f"Error processing row {idx + 2}: {e}", exc_info=True)
-                continue
+        if on_progress is not None:
+            on_progress(0, sheet.total_rows)
+        
+        # Parse and write READ_CHUNK_ROWS rows at a time; only one chunk is in memory
+        imported = 0
+        processed = 0
+        for df in sheet.chunks:
+            records, chunk_errors = prepare_experience_records(df, actual_columns, company_name, first_row=sheet.first_row)
+            errors.extend(chunk_errors)
+            # Rows rejected while preparing (and blank rows before the chunk) count as processed
+            skipped = int(df.index[-1]) + 1 - len(records)
+            imported += upsert_experiences(
+                db, records,
+                on_progress=(lambda written: on_progress(skipped + written, sheet.total_rows)) if on_progress else None,
+            )
+            processed = int(df.index[-1]) + 1
+            if on_progress is not None:
+                on_progress(processed, sheet.total_rows)
         
         # Commit all changes
+        bump_data_version(db, experiences=True)
         db.commit()
         logger.info(f"Successfully imported {imported} experiences")
         
-        return imported, errors
+        return ImportResult(imported, errors, True)
     
     except Exception as e:
         db.rollback()
-        error_msg = f"Error reading Excel file: {str(e)}"
+        error_msg = f"Error reading file: {str(e)}"
         errors.append(error_msg)
         logger.error(error_msg, exc_info=True)
-        return 0, errors
+        return ImportResult(0, errors, False)
     
     finally:
         db.close()
-
@@ -0,0 +1,70 @@
+"""Per-company cache of compiled experience profiles, invalidated by writes to company_experiences."""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.models.company_experience import CompanyExperience
+from app.services.data_version import get_experience_version
+from app.services.entity_dictionary import refresh_entity_dictionary
+from app.services.experience_matching import ExperienceProfile, compile_experience_profiles
+from app.services.match_scores import company_key
+from app.services.tokenization import contains_pattern
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class CompanyExperienceSet:
+    """Compiled profiles of the experiences matching a company filter, at an experience version."""
+    key: str  # company_key of the filter ("" = all companies)
+    version: int  # Experience version the profiles were loaded at
+    entities_version: Optional[int]  # Entity dictionary snapshot their entity IDs were resolved with
+    profiles: Tuple[ExperienceProfile, ...]
+
+
+# company_key -> experience set, least recently used first
+_sets: "OrderedDict[str, CompanyExperienceSet]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _load(db: Session, key: str, version: int, entities_version: Optional[int]) -> CompanyExperienceSet:
+    query = db.query(CompanyExperience)
+    if key:
+        query = query.filter(CompanyExperience.company_name_norm.like(contains_pattern(key)))
+    profiles = tuple(compile_experience_profiles(query.all()))
+    logger.debug(f"Compiled {len(profiles)} experience profiles for '{key}' (version {version})")
+    return CompanyExperienceSet(key, version, entities_version, profiles)
+
+
+def get_company_profiles(db: Session, company_name: Optional[str]) -> CompanyExperienceSet:
+    """
+    Compiled experience profiles of a company filter (None = all companies).
+    
+    Served from memory while the experience version is unchanged; only
+    writes to company_experiences move it (bump_data_version(db,
+    experiences=True)), so tender ingestion does not evict anything. The
+    version is reused for RESPONSE_CACHE_VERSION_MAX_AGE seconds, like the
+    data version, so a warm lookup costs no query. Profiles are compiled
+    again when a new entity dictionary snapshot is installed.
+    """
+    key = company_key(company_name)
+    version = get_experience_version(db, max_age=settings.RESPONSE_CACHE_VERSION_MAX_AGE)
+    entities_version = refresh_entity_dictionary(db).version
+    with _lock:
+        entry = _sets.get(key)
+        if entry is not None and entry.version == version and entry.entities_version == entities_version:
+            _sets.move_to_end(key)
+            return entry
+    
+    entry = _load(db, key, version, entities_version)
+    with _lock:
+        _sets[key] = entry
+        _sets.move_to_end(key)
+        while len(_sets) > settings.EXPERIENCE_CACHE_MAX_ENTRIES:
+            _sets.popitem(last=False)
+    return entry
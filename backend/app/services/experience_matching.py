@@ -1,9 +1,10 @@
 """Experience matching service - matches tenders against company experiences."""
-import json
-import re
-from typing import List, Dict, Optional, Tuple
+from dataclasses import dataclass
+from typing import AbstractSet, FrozenSet, List, Dict, Optional, Sequence, Tuple, Union
 from app.models.tender import Tender
 from app.models.company_experience import CompanyExperience
+from app.services.tokenization import hash_tokens, keyword_hash, keyword_variant_hashes, tender_token_set
+from app.services.entity_dictionary import get_entity_dictionary
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -19,65 +20,112 @@ WEIGHTS = {
 # Minimum match threshold
 MIN_MATCH_THRESHOLD = 0.60
 
+# Highest total score reachable without any keyword match: tenders sharing no
+# keyword with an experience can never score above this.
+MAX_SCORE_WITHOUT_KEYWORDS = WEIGHTS["amount"] + WEIGHTS["entity"] + WEIGHTS["category"]
 
-def extract_keywords(text: str) -> List[str]:
+# Tender token sets used by the category score (accent-folded, hashed)
+ROAD_TERMS = frozenset(hash_tokens(["vial", "viales", "vias", "carretera", "carreteras", "malla"]))
+CONSTRUCTION_TERMS = frozenset(hash_tokens(["obra", "obras", "construccion", "construcciones"]))
+SUPERVISION_TERMS = frozenset(hash_tokens(["interventoria", "interventorias", "supervision"]))
+
+
+@dataclass(frozen=True)
+class ExperienceProfile:
     """
-    Extract relevant keywords from text for matching.
+    Experience compiled for matching: keywords hashed once.
     
-    Focuses on interventoría-related terms and technical keywords.
+    Plain picklable data (no ORM state), so it can be shipped to worker
+    processes or cached between requests.
     """
-    if not text:
-        return []
-    
-    text_lower = text.lower()
-    
-    # Common interventoría-related keywords
-    interventoria_keywords = [
-        "interventoría", "interventoria", "supervisión", "supervision",
-        "vial", "vías", "vias", "carretera", "malla vial",
-        "obra", "obras", "construcción", "construccion",
-        "mantenimiento", "mejoramiento", "rehabilitación", "rehabilitacion",
-        "diseño", "diseno", "estudio", "estudios",
-        "técnica", "tecnica", "administrativa", "ambiental",
-        "puente", "puentes", "infraestructura",
-    ]
-    
-    # Extract words that match our keywords
-    words = re.findall(r'\b\w+\b', text_lower)
-    keywords = [word for word in words if word in interventoria_keywords]
-    
-    # Also extract significant words (length > 5, not common stop words)
-    stop_words = {"para", "del", "los", "las", "con", "por", "que", "una", "uno"}
-    significant_words = [
-        word for word in words 
-        if len(word) > 5 and word not in stop_words and word not in keywords
-    ]
-    
-    # Combine and deduplicate
-    all_keywords = list(set(keywords + significant_words[:10]))  # Limit significant words
-    
-    return all_keywords
+    id: str
+    project_description: str
+    contracting_entity: Optional[str]
+    amount: Optional[float]
+    category: Optional[str]
+    engineering_area: Optional[str]
+    keyword_hashes: Tuple[int, ...]
+    keyword_variants: Tuple[FrozenSet[int], ...]  # Per keyword: hashes of it and its plurals (keyword_variant_hashes)
+    entity_id: Optional[int]  # Canonical ID of contracting_entity (see entity_dictionary)
+    
+    @classmethod
+    def from_experience(cls, experience: CompanyExperience) -> "ExperienceProfile":
+        return cls(
+            id=str(experience.id),
+            project_description=experience.project_description,
+            contracting_entity=experience.contracting_entity,
+            amount=float(experience.amount) if experience.amount else None,
+            category=experience.category,
+            engineering_area=experience.engineering_area,
+            keyword_hashes=tuple(keyword_hash(keyword) for keyword in experience.keywords or ()),
+            keyword_variants=tuple(keyword_variant_hashes(keyword) for keyword in experience.keywords or ()),
+            entity_id=get_entity_dictionary().lookup(experience.contracting_entity),
+        )
+
+
+@dataclass(frozen=True)
+class TenderRecord:
+    """Tender fields needed for matching, detached from the ORM session."""
+    id: str
+    object_text: str
+    object_tokens: Optional[Tuple[int, ...]]
+    amount: Optional[float]
+    entity_name: str
+    entity_id: Optional[int] = None  # Canonical ID of entity_name (see entity_dictionary)
+    
+    @classmethod
+    def from_tender(cls, tender: Tender) -> "TenderRecord":
+        tokens = getattr(tender, "object_tokens", None)
+        return cls(
+            id=str(tender.id),
+            # Text is only needed to tokenize rows without stored tokens
+            object_text="" if tokens is not None else (tender.object_text or ""),
+            object_tokens=tuple(tokens) if tokens is not None else None,
+            amount=float(tender.amount) if tender.amount else None,
+            entity_name=tender.entity_name or "",
+            entity_id=get_entity_dictionary().lookup(tender.entity_name),
+        )
 
 
-def calculate_keyword_score(tender_text: str, experience_keywords: List[str]) -> float:
+def compile_experience_profiles(experiences: Sequence[CompanyExperience]) -> List[ExperienceProfile]:
+    """Compile experiences into matching profiles (hash keywords once)."""
+    return [ExperienceProfile.from_experience(experience) for experience in experiences]
+
+
+def get_tender_tokens(tender: Union[Tender, TenderRecord]) -> AbstractSet[int]:
+    """Token hash set of a tender, reusing the tokens stored at ingestion."""
+    return tender_token_set(tender.object_text, getattr(tender, "object_tokens", None))
+
+
+def calculate_keyword_score(tender_tokens: AbstractSet[int], experience_keywords: List[str]) -> float:
     """
     Calculate keyword matching score between tender and experience.
     
+    A keyword matches when the tender contains it or one of its plurals
+    (puente/puentes), as the former substring test on the text did.
+    
+    Args:
+        tender_tokens: Normalized token hash set of the tender (see get_tender_tokens)
+        experience_keywords: Keywords extracted from the experience description
+    
     Returns score between 0.0 and 1.0.
     """
-    if not experience_keywords:
+    return keyword_overlap_score(tender_tokens, [keyword_variant_hashes(keyword) for keyword in experience_keywords])
+
+
+def keyword_overlap_score(tender_tokens: AbstractSet[int], keyword_variants: Sequence[AbstractSet[int]]) -> float:
+    """Keyword score from already hashed keyword variants (see calculate_keyword_score)."""
+    if not keyword_variants:
         return 0.0
     
-    tender_lower = tender_text.lower()
-    
     # Count matches
-    matches = sum(1 for keyword in experience_keywords if keyword in tender_lower)
+    matches = sum(1 for variants in keyword_variants if not variants.isdisjoint(tender_tokens))
     
     if matches == 0:
         return 0.0
     
     # Score based on percentage of keywords matched
-    match_ratio = matches / len(experience_keywords)
+    match_ratio = matches / len(keyword_variants)
     
     # Boost score if multiple matches (exponential)
     if matches >= 3:
@@ -118,59 +166,48 @@ def calculate_entity_score(tender_entity: str, experience_entity: Optional[str])
     """
     Calculate entity name similarity score.
     
+    Names are resolved to canonical IDs through the entity dictionary, so
+    "INVIAS" and "Instituto Nacional de Vías" count as the same entity.
+    
     Returns score between 0.0 and 1.0.
     """
     if not experience_entity:
         return 0.5  # Neutral if no experience entity
     
-    tender_lower = tender_entity.lower()
-    experience_lower = experience_entity.lower()
-    
-    # Exact match
-    if tender_lower == experience_lower:
-        return 1.0
-    
-    # Partial match (entity name contains or is contained)
-    if tender_lower in experience_lower or experience_lower in tender_lower:
-        return 0.7
-    
-    # Word overlap
-    tender_words = set(tender_lower.split())
-    experience_words = set(experience_lower.split())
-    common_words = tender_words.intersection(experience_words)
-    
-    if len(common_words) > 0:
-        return 0.4
-    
-    return 0.0
+    return get_entity_dictionary().score_names(tender_entity, experience_entity)
 
 
-def calculate_category_score(tender: Tender, experience: CompanyExperience) -> float:
+def calculate_category_score(
+    tender: Union[Tender, TenderRecord],
+    experience: Union[CompanyExperience, ExperienceProfile],
+    tender_tokens: Optional[AbstractSet[int]] = None,
+) -> float:
     """
     Calculate category/engineering area match score.
     
     Returns score between 0.0 and 1.0.
     """
+    if tender_tokens is None:
+        tender_tokens = get_tender_tokens(tender)
+    
     # If experience has engineering_area, check if it matches tender keywords
     if experience.engineering_area:
         area_lower = experience.engineering_area.lower()
-        tender_text = (tender.object_text or "").lower()
         
         # Check for key terms in engineering area
         if "vial" in area_lower or "vias" in area_lower or "carretera" in area_lower:
-            if any(term in tender_text for term in ["vial", "vias", "carretera", "malla"]):
+            if not ROAD_TERMS.isdisjoint(tender_tokens):
                 return 1.0
         
         if "construccion" in area_lower or "obra" in area_lower:
-            if any(term in tender_text for term in ["obra", "construccion", "construcción"]):
+            if not CONSTRUCTION_TERMS.isdisjoint(tender_tokens):
                 return 0.8
     
     # Category match - check if experience category matches tender keywords
     # No longer depends on is_relevant_interventoria_vial - matching is based on actual experience
     if experience.category and "interventoría" in experience.category.lower():
         # Check if tender text contains interventoría-related keywords
-        tender_text = (tender.object_text or "").lower()
-        if any(term in tender_text for term in ["interventoría", "interventoria", "supervisión", "supervision"]):
+        if not SUPERVISION_TERMS.isdisjoint(tender_tokens):
             return 1.0
     
     return 0.5  # Neutral if no specific match
@@ -179,7 +216,8 @@ def calculate_category_score(tender: Tender, experience: CompanyExperience) -> f
 def match_tender_against_experiences(
     tender: Tender,
     experiences: List[CompanyExperience],
-    min_score: float = MIN_MATCH_THRESHOLD
+    min_score: float = MIN_MATCH_THRESHOLD,
+    keyword_scores: Optional[Dict[str, float]] = None,
 ) -> Tuple[float, List[Dict]]:
     """
     Match a tender against company experiences.
@@ -188,6 +226,8 @@ def match_tender_against_experiences(
         tender: The tender to match
         experiences: List of company experiences
         min_score: Minimum score to consider a match
+        keyword_scores: Optional precomputed keyword scores by experience ID
+            (BM25/TF-IDF modes, see corpus_scoring); replaces the classic keyword score
         
     Returns:
         Tuple of (best_match_score, list_of_matching_experiences)
@@ -195,26 +235,52 @@ def match_tender_against_experiences(
     if not experiences:
         return 0.0, []
     
-    matches = []
+    return match_tender_against_profiles(
+        tender, compile_experience_profiles(experiences), min_score, keyword_scores
+    )
+
+
+def match_tender_against_profiles(
+    tender: Union[Tender, TenderRecord],
+    profiles: Sequence[ExperienceProfile],
+    min_score: float = MIN_MATCH_THRESHOLD,
+    keyword_scores: Optional[Dict[str, float]] = None,
+) -> Tuple[float, List[Dict]]:
+    """
+    Match a tender against compiled experience profiles.
+    
+    Same scoring as match_tender_against_experiences; use this in loops so the
+    profiles are compiled once instead of once per tender.
+    """
+    if not profiles:
+        return 0.0, []
     
-    for experience in experiences:
+    matches = []
+    tender_tokens = get_tender_tokens(tender)
+    tender_amount = float(tender.amount) if tender.amount else None
+    entities = get_entity_dictionary()
+    tender_entity_id = getattr(tender, "entity_id", None)
+    if tender_entity_id is None:
+        tender_entity_id = entities.lookup(tender.entity_name)
+    
+    for experience in profiles:
         # Calculate individual scores
-        keyword_score = calculate_keyword_score(
-            tender.object_text or "",
-            json.loads(experience.keywords) if experience.keywords else []
-        )
+        if keyword_scores is not None:
+            keyword_score = keyword_scores.get(experience.id, 0.0)
+        else:
+            keyword_score = keyword_overlap_score(tender_tokens, experience.keyword_variants)
         
-        amount_score = calculate_amount_score(
-            float(tender.amount) if tender.amount else None,
-            float(experience.amount) if experience.amount else None
-        )
+        amount_score = calculate_amount_score(tender_amount, experience.amount)
         
-        entity_score = calculate_entity_score(
-            tender.entity_name or "",
-            experience.contracting_entity
-        )
+        if not experience.contracting_entity:
+            entity_score = 0.5  # Neutral if no experience entity
+        elif entities.knows(tender_entity_id) and entities.knows(experience.entity_id):
+            entity_score = entities.score(tender_entity_id, experience.entity_id)
+        else:
+            # A name missing from the dictionary snapshot: compared by key
+            entity_score = entities.score_names(tender.entity_name, experience.contracting_entity)
         
-        category_score = calculate_category_score(tender, experience)
+        category_score = calculate_category_score(tender, experience, tender_tokens)
         
         # Calculate weighted total score
         total_score = (
@@ -227,10 +293,10 @@ def match_tender_against_experiences(
         # Only include if above threshold
         if total_score >= min_score:
             matches.append({
-                "experience_id": str(experience.id),
+                "experience_id": experience.id,
                 "project_description": experience.project_description[:100] + "..." if len(experience.project_description) > 100 else experience.project_description,
                 "contracting_entity": experience.contracting_entity,
-                "amount": float(experience.amount) if experience.amount else None,
+                "amount": experience.amount,
                 "score": round(total_score, 3),
                 "scores": {
                     "keyword": round(keyword_score, 3),
@@ -253,18 +319,35 @@ def match_tender_against_experiences(
 def match_all_tenders_against_experiences(
     tenders: List[Tender],
     experiences: List[CompanyExperience],
-    min_score: float = MIN_MATCH_THRESHOLD
+    min_score: float = MIN_MATCH_THRESHOLD,
+    workers: int = 1,
 ) -> Dict[str, Tuple[float, List[Dict]]]:
     """
     Match multiple tenders against experiences.
     
+    Args:
+        tenders: Tenders to match
+        experiences: Company experiences
+        min_score: Minimum score to consider a match
+        workers: Worker processes to shard tenders across (1 = in-process,
+            0 = settings.MATCHING_WORKERS); see parallel_matching
+    
     Returns a dictionary mapping tender_id to (score, matches).
     """
+    if workers != 1:
+        from app.services.parallel_matching import parallel_match_tenders
+        return parallel_match_tenders(
+            [TenderRecord.from_tender(tender) for tender in tenders],
+            compile_experience_profiles(experiences),
+            min_score=min_score,
+            workers=workers or None,
+        )
+    
+    profiles = compile_experience_profiles(experiences)
     results = {}
     
     for tender in tenders:
-        score, matches = match_tender_against_experiences(tender, experiences, min_score)
+        score, matches = match_tender_against_profiles(tender, profiles, min_score)
         results[str(tender.id)] = (score, matches)
     
     return results
-
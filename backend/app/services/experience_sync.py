@@ -0,0 +1,183 @@
+"""Diff-based sync of a company's complete experience list (bulk create/replace)."""
+import hashlib
+import uuid
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence
+
+import orjson
+from fastapi import HTTPException
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.models.company_experience import CompanyExperience
+from app.services.data_version import bump_data_version
+from app.services.keywords import extract_keywords_batch
+from app.services.match_scores import rescore_experience_changes
+
+logger = get_logger(__name__)
+
+# Fields compared to decide whether a stored experience changed
+CONTENT_FIELDS = (
+    "project_description",
+    "contracting_entity",
+    "completion_date",
+    "amount",
+    "category",
+    "engineering_area",
+)
+
+SYNC_FIELDS = ("contract_number",) + CONTENT_FIELDS
+
+
+class SyncPlan(NamedTuple):
+    """Writes that turn the stored experiences of a company into the submitted list."""
+    inserts: List[Dict[str, Any]]  # SYNC_FIELDS values
+    updates: List[Dict[str, Any]]  # SYNC_FIELDS values plus id
+    deletes: List[Any]  # Experience IDs
+    unchanged: int
+
+
+class SyncResult(NamedTuple):
+    inserted: int
+    updated: int
+    deleted: int
+    unchanged: int
+    refreshed_scores: int  # Stored (company, tender) match scores rewritten
+
+
+def _normalize(field: str, value: Any) -> Any:
+    """Comparable form of a field value: stripped text ('' = None), amounts to the cent."""
+    if value is None:
+        return None
+    if field == "amount":
+        return round(float(value), 2)
+    if field == "completion_date":
+        return value.date() if isinstance(value, datetime) else value
+    value = str(value).strip()
+    return value or None
+
+
+def normalize_experience(values: Dict[str, Any]) -> Dict[str, Any]:
+    """SYNC_FIELDS of an experience (request item or stored row), normalized."""
+    return {field: _normalize(field, values.get(field)) for field in SYNC_FIELDS}
+
+
+def content_hash(values: Dict[str, Any]) -> str:
+    """Hash of the normalized CONTENT_FIELDS (identity of experiences without a contract number)."""
+    content = [values[field].isoformat() if isinstance(values[field], date) else values[field] for field in CONTENT_FIELDS]
+    return hashlib.sha1(orjson.dumps(content)).hexdigest()
+
+
+def plan_experience_sync(stored: Iterable[Dict[str, Any]], items: Sequence[Dict[str, Any]], delete_missing: bool = True) -> SyncPlan:
+    """
+    Diff the stored experiences of a company against the submitted list.
+
+    Items with a contract number are matched to the stored experience with
+    that number (updated when their content differs); items without one are
+    matched by content hash to stored experiences without a number (equal
+    content, so never updated). Unmatched items are inserted; unmatched
+    stored experiences are deleted when delete_missing is set.
+
+    Args:
+        stored: Stored experiences (id plus SYNC_FIELDS), normalized
+        items: Submitted experiences (SYNC_FIELDS), normalized
+        delete_missing: Delete stored experiences missing from items
+    """
+    by_contract: Dict[str, List[Dict]] = {}
+    by_hash: Dict[str, List[Dict]] = {}
+    for row in stored:
+        if row["contract_number"]:
+            by_contract.setdefault(row["contract_number"], []).append(row)
+        else:
+            by_hash.setdefault(content_hash(row), []).append(row)
+
+    seen_contracts = set()
+    inserts, updates = [], []
+    unchanged = 0
+    for item in items:
+        contract_number = item["contract_number"]
+        if contract_number:
+            if contract_number in seen_contracts:
+                raise HTTPException(status_code=400, detail=f"Duplicate contract_number: {contract_number}")
+            seen_contracts.add(contract_number)
+            candidates = by_contract.get(contract_number)
+        else:
+            candidates = by_hash.get(content_hash(item))
+
+        if not candidates:
+            inserts.append(item)
+            continue
+        row = candidates.pop(0)
+        if all(row[field] == item[field] for field in CONTENT_FIELDS):
+            unchanged += 1
+        else:
+            updates.append({**item, "id": row["id"]})
+
+    deletes = []
+    if delete_missing:
+        deletes = [row["id"] for rows in (*by_contract.values(), *by_hash.values()) for row in rows]
+    return SyncPlan(inserts, updates, deletes, unchanged)
+
+
+def _stored_experiences(db: Session, company_name: str) -> List[Dict[str, Any]]:
+    columns = [CompanyExperience.id] + [getattr(CompanyExperience, field) for field in SYNC_FIELDS]
+    rows = db.query(*columns).filter(CompanyExperience.company_name == company_name).all()
+    return [{"id": row[0], **normalize_experience(dict(zip(SYNC_FIELDS, row[1:])))} for row in rows]
+
+
+def _with_keywords(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    keywords = extract_keywords_batch(record["project_description"] for record in records)
+    return [{**record, "keywords": record_keywords or None} for record, record_keywords in zip(records, keywords)]
+
+
+def sync_company_experiences(
+    db: Session,
+    company_name: str,
+    items: Sequence[Dict[str, Any]],
+    delete_missing: bool = True,
+) -> SyncResult:
+    """
+    Replace the experiences of a company with a complete list, in one transaction.
+
+    Only the differences are written (plan_experience_sync); keywords are
+    extracted for written rows only, and only the stored match scores the
+    written rows can affect are refreshed (rescore_experience_changes),
+    before the single commit.
+    """
+    company_name = company_name.strip()
+    items = [normalize_experience(item) for item in items]
+    for position, item in enumerate(items):
+        if not item["project_description"]:
+            raise HTTPException(status_code=400, detail=f"Experience {position}: empty project_description")
+    plan = plan_experience_sync(_stored_experiences(db, company_name), items, delete_missing)
+    if not (plan.inserts or plan.updates or plan.deletes):
+        return SyncResult(0, 0, 0, plan.unchanged, 0)
+
+    now = datetime.utcnow()
+    inserts = [
+        {**record, "id": uuid.uuid4(), "company_name": company_name, "created_at": now, "updated_at": now}
+        for record in _with_keywords(plan.inserts)
+    ]
+    updates = [{**record, "updated_at": now} for record in _with_keywords(plan.updates)]
+    if inserts:
+        db.execute(insert(CompanyExperience), inserts)
+    if updates:
+        db.execute(update(CompanyExperience), updates)
+    if plan.deletes:
+        db.query(CompanyExperience).filter(CompanyExperience.id.in_(plan.deletes)).delete(synchronize_session=False)
+    bump_data_version(db, experiences=True)
+    db.flush()
+
+    rescored = rescore_experience_changes(
+        db,
+        company_name,
+        changed_ids=[record["id"] for record in inserts + updates],
+        removed_ids=plan.deletes,
+    )
+    db.commit()
+    logger.info(
+        f"Synced experiences of '{company_name}': {len(inserts)} inserted, {len(updates)} updated, "
+        f"{len(plan.deletes)} deleted, {plan.unchanged} unchanged, {rescored} scores refreshed"
+    )
+    return SyncResult(len(inserts), len(updates), len(plan.deletes), plan.unchanged, rescored)
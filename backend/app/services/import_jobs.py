@@ -0,0 +1,229 @@
+"""Background experience import jobs: uploads spooled to disk, imports run on a worker pool."""
+import os
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.db import Database, SessionLocal
+from app.core.logging import get_logger
+from app.models.import_job import ImportJob, ImportJobStatus
+from app.services.excel_import import import_experiences_from_file
+from app.services.match_scores import rescore_all_companies
+
+logger = get_logger(__name__)
+
+# Bytes read from the upload and written to disk at a time
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Progress is written to the job row at most every this many rows
+PROGRESS_STEP = 500
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=max(1, settings.IMPORT_WORKERS), thread_name_prefix="import")
+    return _executor
+
+
+def shutdown_import_workers() -> None:
+    """
+    Stop accepting imports and drop queued ones; running ones finish in the
+    background unless the process exits first. Jobs left unfinished either
+    way are failed at the next startup (fail_interrupted_import_jobs).
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def fail_interrupted_import_jobs() -> int:
+    """
+    Mark jobs left unfinished by a previous process as failed (call at startup).
+
+    Import workers live in the API process, so a pending or running job found
+    at startup will never finish. Spooled files are not tracked on the job,
+    so the import cannot be resumed; the user uploads the file again. Rows of
+    a job interrupted while rescoring are already committed and stay, and its
+    stored scores are refreshed by the next ingestion run.
+
+    Returns:
+        Number of jobs marked failed
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        jobs = db.query(ImportJob)
+        importing = [ImportJobStatus.PENDING.value, ImportJobStatus.RUNNING.value]
+        interrupted = jobs.filter(ImportJob.status.in_(importing)).update(
+            {
+                "status": ImportJobStatus.FAILED.value,
+                "processed_rows": 0,
+                "imported": 0,
+                "message": "Import interrupted by a server restart",
+                "finished_at": now,
+            },
+            synchronize_session=False,
+        )
+        interrupted += jobs.filter(ImportJob.status == ImportJobStatus.RESCORING.value).update(
+            {
+                "status": ImportJobStatus.FAILED.value,
+                "message": "Rescoring interrupted by a server restart; imported experiences were kept",
+                "finished_at": now,
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+        if interrupted:
+            logger.warning(f"Marked {interrupted} interrupted import jobs as failed")
+        return interrupted
+    except Exception as e:
+        logger.error(f"Could not recover interrupted import jobs: {e}", exc_info=True)
+        db.rollback()
+        return 0
+    finally:
+        db.close()
+
+
+async def save_upload(file: UploadFile, suffix: str) -> str:
+    """
+    Copy an upload to a temporary file chunk by chunk, never holding it whole in memory.
+
+    Returns:
+        Path of the file (the caller, or the import job, deletes it)
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=settings.IMPORT_UPLOAD_DIR)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                await run_in_threadpool(out.write, chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def create_import_job(db: Session, company_name: str, filename: Optional[str]) -> ImportJob:
+    """Record a pending import job."""
+    job = ImportJob(company_name=company_name, filename=filename, status=ImportJobStatus.PENDING.value, errors=[])
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+async def spool_import_job(db: Database, file: UploadFile, suffix: str, company_name: str) -> Tuple[ImportJob, str]:
+    """
+    Spool an upload to disk (save_upload), then record its pending job.
+
+    The job is only created once the whole upload is on disk, so an aborted
+    upload leaves no job behind.
+
+    Returns:
+        (job, path of the spooled file)
+    """
+    path = await save_upload(file, suffix)
+    try:
+        job = await db.run(create_import_job, company_name=company_name, filename=file.filename)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return job, path
+
+
+def _update_job(job_id: UUID, **values) -> None:
+    db = SessionLocal()
+    try:
+        db.query(ImportJob).filter(ImportJob.id == job_id).update(values, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def import_message(imported: int, errors: List[str]) -> str:
+    if errors:
+        return f"Imported {imported} experiences with {len(errors)} errors"
+    return f"Successfully imported {imported} experiences"
+
+
+def run_import_job(job_id: UUID, file_path: str, company_name: str) -> Tuple[int, List[str]]:
+    """
+    Import a spooled file and record the outcome on the job (runs on the worker pool).
+
+    Progress is written to the job as batches are written. Once the rows
+    are committed, stored match scores of subscribed companies whose
+    experiences changed are refreshed (see rescore_all_companies); when the
+    import wrote nothing (unreadable file, missing columns, rolled back) the
+    job fails and nothing is rescored.
+    """
+    reported = {"rows": -PROGRESS_STEP, "last": None}
+
+    def on_progress(processed: int, total: Optional[int]) -> None:
+        reported["last"] = processed
+        if processed == 0 or processed - reported["rows"] >= PROGRESS_STEP:
+            reported["rows"] = processed
+            _update_job(job_id, processed_rows=processed, total_rows=total)
+
+    try:
+        _update_job(job_id, status=ImportJobStatus.RUNNING.value, started_at=datetime.utcnow())
+        imported, errors, committed = import_experiences_from_file(file_path, company_name, on_progress=on_progress)
+
+        # Nothing was written: rows processed before a rollback do not count
+        if not committed:
+            _update_job(
+                job_id,
+                status=ImportJobStatus.FAILED.value,
+                processed_rows=0,
+                imported=0,
+                errors=errors,
+                message=errors[-1][:500] if errors else "Import failed",
+                finished_at=datetime.utcnow(),
+            )
+            return 0, errors
+
+        _update_job(
+            job_id,
+            status=ImportJobStatus.RESCORING.value,
+            processed_rows=reported["last"] or 0,
+            imported=imported,
+            errors=errors,
+            message=import_message(imported, errors),
+        )
+        try:
+            rescore_all_companies(force=False)
+        except Exception as e:
+            logger.error(f"Rescoring after import {job_id} failed: {e}", exc_info=True)
+        _update_job(job_id, status=ImportJobStatus.COMPLETED.value, finished_at=datetime.utcnow())
+        return imported, errors
+
+    except Exception as e:
+        logger.error(f"Import job {job_id} failed: {e}", exc_info=True)
+        _update_job(
+            job_id,
+            status=ImportJobStatus.FAILED.value,
+            message=f"Import failed: {e}"[:500],
+            finished_at=datetime.utcnow(),
+        )
+        raise
+
+    finally:
+        if os.path.exists(file_path):
+            os.unlink(file_path)
+
+
+def submit_import_job(job_id: UUID, file_path: str, company_name: str) -> Future:
+    """Queue an import on the worker pool; the future resolves to (imported, errors)."""
+    return _get_executor().submit(run_import_job, job_id, file_path, company_name)
@@ -0,0 +1,112 @@
+"""Compiled keyword extraction and keyword-phrase matching shared by import, matching and classification."""
+from typing import AbstractSet, Dict, FrozenSet, Iterable, List, Tuple
+
+from app.services.tokenization import STOP_WORDS, fold_accents, hash_tokens, normalize_tokens, tokenize
+
+# Interventoría-related words always kept as experience keywords
+INTERVENTORIA_KEYWORDS = (
+    "interventoría", "supervisión",
+    "vial", "vías", "carretera",
+    "obra", "obras", "construcción",
+    "mantenimiento", "mejoramiento", "rehabilitación",
+    "diseño", "estudio", "estudios",
+    "técnica", "administrativa", "ambiental",
+    "puente", "puentes", "infraestructura",
+)
+
+# Keyword phrases that indicate road supervision (classification fallback)
+ROAD_SUPERVISION_PHRASES = (
+    "interventoría",
+    "vial",
+    "vías",
+    "carretera",
+    "malla vial",
+    "supervisión de vías",
+    "obra vial",
+    "infraestructura vial",
+)
+
+
+class KeywordExtractor:
+    """
+    Domain keywords plus the first significant words of a text.
+
+    Vocabulary and stop words are accent-folded into frozensets once, when
+    the extractor is built; texts are split with the shared tokenizer
+    (tokenization.tokenize), so keywords are accent-folded like tender
+    tokens and hash to the same values.
+    """
+
+    def __init__(
+        self,
+        keywords: Iterable[str],
+        stop_words: Iterable[str] = STOP_WORDS,
+        min_significant_length: int = 6,
+        max_significant: int = 10,
+    ):
+        self.keywords: FrozenSet[str] = frozenset(fold_accents(keyword) for keyword in keywords)
+        self.stop_words: FrozenSet[str] = frozenset(fold_accents(word) for word in stop_words)
+        self.min_significant_length = min_significant_length
+        self.max_significant = max_significant
+
+    def extract(self, text: str) -> List[str]:
+        """Domain keywords of a text, then up to max_significant other long words (each once, in text order)."""
+        keywords = []
+        significant = []
+        seen = set()
+        for word in tokenize(text):
+            if word in seen:
+                continue
+            if word in self.keywords:
+                keywords.append(word)
+                seen.add(word)
+            elif (
+                len(significant) < self.max_significant
+                and len(word) >= self.min_significant_length
+                and word not in self.stop_words
+            ):
+                significant.append(word)
+                seen.add(word)
+        return keywords + significant
+
+    def extract_many(self, texts: Iterable[str]) -> List[List[str]]:
+        """extract() over many texts; repeated texts are only tokenized once."""
+        cache: Dict[str, List[str]] = {}
+        results = []
+        for text in texts:
+            keywords = cache.get(text)
+            if keywords is None:
+                keywords = cache[text] = self.extract(text)
+            results.append(list(keywords))
+        return results
+
+
+def compile_phrases(phrases: Iterable[str]) -> Tuple[FrozenSet[int], ...]:
+    """Keyword phrases as token hash sets; a phrase matches when all of its (non stop word) tokens are present."""
+    return tuple({frozenset(hash_tokens(normalize_tokens(phrase))) for phrase in phrases})
+
+
+def count_phrase_matches(phrases: Tuple[FrozenSet[int], ...], tokens: AbstractSet[int]) -> int:
+    """Number of compiled phrases (compile_phrases) whose tokens are all in a token hash set."""
+    return sum(1 for phrase_tokens in phrases if phrase_tokens <= tokens)
+
+
+experience_keyword_extractor = KeywordExtractor(INTERVENTORIA_KEYWORDS)
+
+ROAD_SUPERVISION_TOKENS = compile_phrases(ROAD_SUPERVISION_PHRASES)
+
+
+def extract_keywords(text: str) -> List[str]:
+    """
+    Extract relevant keywords from text for matching.
+
+    Focuses on interventoría-related terms and technical keywords.
+    """
+    if not text:
+        return []
+    return experience_keyword_extractor.extract(text)
+
+
+def extract_keywords_batch(texts: Iterable[str]) -> List[List[str]]:
+    """extract_keywords over many texts (imports), in order."""
+    return experience_keyword_extractor.extract_many(text or "" for text in texts)
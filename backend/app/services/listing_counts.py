@@ -0,0 +1,107 @@
+"""Total counts for paginated listings: cached per filter set, estimated for broad filters."""
+import json
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query, Session
+
+from app.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# (data version, filter set) -> (total, estimated)
+_counts: "OrderedDict[str, Tuple[int, bool]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def count_key(data_version: int, **filters) -> str:
+    """Key of a filter set (None/empty filters dropped, order-independent) at a data version."""
+    normalized = {name: str(value) for name, value in filters.items() if value not in (None, "", False)}
+    return f"{data_version}:{json.dumps(normalized, sort_keys=True)}"
+
+
+def get_cached_count(key: str) -> Optional[Tuple[int, bool]]:
+    """Cached (total, estimated) of a filter set, if any."""
+    with _lock:
+        entry = _counts.get(key)
+        if entry is not None:
+            _counts.move_to_end(key)
+        return entry
+
+
+def store_count(key: str, total: int, estimated: bool = False) -> None:
+    with _lock:
+        _counts[key] = (total, estimated)
+        _counts.move_to_end(key)
+        while len(_counts) > settings.COUNT_CACHE_MAX_ENTRIES:
+            _counts.popitem(last=False)
+
+
+def total_count_column():
+    """count(*) OVER (): total of the filtered rows, returned on every row of the page query."""
+    return func.count().over().label("total_count")
+
+
+def planner_estimate(db: Session, query: Query) -> int:
+    """Row estimate of a query from the planner (EXPLAIN, no execution)."""
+    # Named parameters, bound again through text() so any driver's paramstyle works
+    compiled = query.statement.compile(
+        dialect=postgresql.dialect(paramstyle="named"),
+        compile_kwargs={"render_postcompile": True},
+    )
+    explain = text(f"EXPLAIN (FORMAT JSON) {compiled}").bindparams(**compiled.params)
+    result = db.execute(explain).scalar()
+    plan = result if isinstance(result, list) else json.loads(result)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def estimate_broad_count(db: Session, query: Query) -> Optional[int]:
+    """
+    Planner estimate when it says the filter matches at least COUNT_ESTIMATE_THRESHOLD rows.
+
+    Exact counts of such sets cost a scan of most of the table, and the
+    listing only needs an approximate number of pages. Returns None for
+    narrower filters, which should be counted exactly.
+    """
+    try:
+        with db.begin_nested():  # A failed EXPLAIN must not abort the request's transaction
+            estimate = planner_estimate(db, query)
+    except Exception as e:
+        logger.warning(f"Could not estimate listing count: {e}")
+        return None
+    return estimate if estimate >= settings.COUNT_ESTIMATE_THRESHOLD else None
+
+
+def page_total(
+    key: str,
+    cached: Optional[Tuple[int, bool]],
+    rows: list,
+    counted: bool,
+    count_query: Query,
+    offset: int,
+) -> Tuple[int, bool]:
+    """
+    Total of a listing page as (total, estimated), caching exact totals.
+
+    Args:
+        key: count_key of the filter set
+        cached: Cached (total, estimated) looked up before the page query
+        rows: Page rows; with counted=True they carry a total_count_column()
+        counted: Whether the page query selected total_count_column()
+        count_query: Filtered query (without keyset filter) to count when the page cannot tell
+        offset: Page offset
+    """
+    if cached is not None:
+        return cached
+    if counted and rows:
+        total = rows[0].total_count
+    elif counted and offset == 0:
+        total = 0
+    else:
+        total = count_query.count()
+    store_count(key, total)
+    return total, False
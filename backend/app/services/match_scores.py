@@ -0,0 +1,340 @@
+"""Stored experience-match scores, so matched tender listings can be answered in SQL."""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import cast, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal
+from app.core.logging import get_logger
+from app.models.tender import Tender
+from app.models.subscription import Subscription
+from app.models.company_experience import CompanyExperience
+from app.models.tender_match import TenderMatchScore, CompanyMatchState
+from app.services.experience_matching import (
+    ExperienceProfile,
+    MAX_SCORE_WITHOUT_KEYWORDS,
+    compile_experience_profiles,
+)
+from app.services.entity_dictionary import load_entity_dictionary
+from app.services.data_version import get_data_version
+from app.services.parallel_matching import parallel_match_tenders, tender_record_query, to_tender_records
+from app.services.tokenization import contains_pattern, fold_accents
+from app.services.tender_events import notify_new_matches
+
+logger = get_logger(__name__)
+
+# Scores are stored from this floor up. Only tenders sharing at least one keyword
+# with an experience can exceed it, so stored rows serve any min_match_score above it.
+STORED_SCORE_FLOOR = MAX_SCORE_WITHOUT_KEYWORDS
+
+# Re-read tenders touched slightly before the last sync: updated_at is set
+# before the ingestion batch commits, so a row may become visible late.
+SYNC_OVERLAP = timedelta(minutes=30)
+
+# Rows per INSERT statement
+INSERT_CHUNK_SIZE = 1000
+
+
+def company_key(company_name: Optional[str]) -> str:
+    """Normalized (accent-folded) company filter used as the stored-score key ("" = all companies)."""
+    return fold_accents((company_name or "").strip())
+
+
+def can_use_stored_scores(min_match_score: float) -> bool:
+    """Stored scores answer a matched listing exactly only above the storage floor."""
+    return min_match_score > STORED_SCORE_FLOOR
+
+
+def _company_experiences_query(db: Session, key: str):
+    query = db.query(CompanyExperience)
+    if key:
+        query = query.filter(CompanyExperience.company_name_norm.like(contains_pattern(key)))
+    return query
+
+
+def _experience_fingerprint(db: Session, key: str) -> Optional[str]:
+    """Cheap aggregate identifying the current experience set (None when there is none)."""
+    count, last_update = _company_experiences_query(db, key).with_entities(
+        func.count(CompanyExperience.id), func.max(CompanyExperience.updated_at)
+    ).one()
+    if not count:
+        return None
+    return f"{count}:{last_update.isoformat() if last_update else ''}"
+
+
+def _keyword_hashes(profiles: List[ExperienceProfile]) -> List[int]:
+    """Tender tokens any keyword of the profiles matches (keywords and their plurals)."""
+    return sorted({token for profile in profiles for variants in profile.keyword_variants for token in variants})
+
+
+def _score_tenders(db: Session, profiles: List[ExperienceProfile], tender_filter=None) -> Dict[str, Tuple[float, List[Dict]]]:
+    """
+    Score the tenders that share at least one keyword with the profiles.
+
+    The keyword-array overlap (GIN index on tenders.object_tokens) prunes every
+    tender that cannot reach STORED_SCORE_FLOOR before any Python scoring.
+    """
+    keyword_hashes = _keyword_hashes(profiles)
+    if not keyword_hashes:
+        return {}
+    query = tender_record_query(db).filter(Tender.object_tokens.overlap(keyword_hashes))
+    if tender_filter is not None:
+        query = query.filter(tender_filter)
+    records = to_tender_records(query.all())
+    results = parallel_match_tenders(records, profiles, min_score=STORED_SCORE_FLOOR)
+    return {tender_id: result for tender_id, result in results.items() if result[0] >= STORED_SCORE_FLOOR}
+
+
+def store_company_scores(
+    db: Session,
+    key: str,
+    results: Dict[str, Tuple[float, List[Dict]]],
+) -> None:
+    """Upsert stored scores of a company (caller commits)."""
+    now = datetime.utcnow()
+    rows = [
+        {
+            "tender_id": tender_id,
+            "company_key": key,
+            "score": score,
+            "matching_experiences": matches,
+            "computed_at": now,
+        }
+        for tender_id, (score, matches) in results.items()
+        if score >= STORED_SCORE_FLOOR
+    ]
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        stmt = insert(TenderMatchScore).values(rows[start:start + INSERT_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TenderMatchScore.tender_id, TenderMatchScore.company_key],
+            set_={
+                "score": stmt.excluded.score,
+                "matching_experiences": stmt.excluded.matching_experiences,
+                "computed_at": stmt.excluded.computed_at,
+            },
+        )
+        db.execute(stmt)
+
+
+def _save_state(db: Session, key: str, fingerprint: str, data_version: int, synced_at: datetime) -> None:
+    stmt = insert(CompanyMatchState).values(
+        company_key=key,
+        experience_fingerprint=fingerprint,
+        data_version=data_version,
+        synced_at=synced_at,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CompanyMatchState.company_key],
+        set_={
+            "experience_fingerprint": stmt.excluded.experience_fingerprint,
+            "data_version": stmt.excluded.data_version,
+            "synced_at": stmt.excluded.synced_at,
+        },
+    )
+    db.execute(stmt)
+
+
+def subscribed_company_keys(db: Session) -> List[str]:
+    """Keys of the companies with an active subscription, the only ones with stored scores."""
+    names = db.query(Subscription.company_name).filter(Subscription.active == True).all()
+    return sorted({company_key(name) for (name,) in names} - {""})
+
+
+def stored_company_key(db: Session, company_name: Optional[str]) -> Optional[str]:
+    """
+    Key to join stored scores on for a company filter, read-only.
+
+    Only subscribed companies have stored scores, computed by the ingestion
+    and import jobs (rescore_all_companies); any other filter, or a company
+    not synced yet, returns None and is scored live by the caller.
+    """
+    key = company_key(company_name)
+    if not key or key not in subscribed_company_keys(db):
+        return None
+    synced = db.query(CompanyMatchState.company_key).filter(CompanyMatchState.company_key == key).first()
+    return key if synced else None
+
+
+def ensure_company_scores(db: Session, company_name: Optional[str], force: bool = False) -> Optional[str]:
+    """
+    Make sure stored scores of a company are current, refreshing them if needed.
+
+    Writes and commits: called from background jobs only, never from requests
+    (those read stored scores through stored_company_key).
+
+    - Experiences changed (count or last update): full recompute for the company.
+    - Only tenders changed (data version moved): rescore the tenders updated
+      since the last sync.
+    - Nothing changed: cheap aggregate lookups only, no scoring.
+
+    Args:
+        db: Database session
+        company_name: Company filter as given to the API (None = all companies)
+        force: Recompute every stored score of the company
+
+    Returns:
+        The company key to join on, or None when the company has no experiences
+    """
+    key = company_key(company_name)
+    fingerprint = _experience_fingerprint(db, key)
+    if fingerprint is None:
+        return None
+
+    data_version = get_data_version(db)
+    state = None if force else db.query(CompanyMatchState).filter(CompanyMatchState.company_key == key).first()
+    if state and state.experience_fingerprint == fingerprint and state.data_version == data_version:
+        return key
+
+    started_at = datetime.utcnow()
+    profiles = compile_experience_profiles(_company_experiences_query(db, key).all())
+
+    if state and state.experience_fingerprint == fingerprint:
+        # Incremental: only tenders touched since the last sync
+        changed = Tender.updated_at >= state.synced_at - SYNC_OVERLAP
+        changed_ids = select(Tender.id).where(changed)
+        db.query(TenderMatchScore).filter(
+            TenderMatchScore.company_key == key,
+            TenderMatchScore.tender_id.in_(changed_ids),
+        ).delete(synchronize_session=False)
+        results = _score_tenders(db, profiles, changed)
+        notify_new_matches(db, key, results)
+        logger.info(f"Rescored {len(results)} changed tenders for '{key}'")
+    else:
+        db.query(TenderMatchScore).filter(TenderMatchScore.company_key == key).delete(synchronize_session=False)
+        results = _score_tenders(db, profiles)
+        logger.info(f"Recomputed {len(results)} stored match scores for '{key}'")
+
+    store_company_scores(db, key, results)
+    _save_state(db, key, fingerprint, data_version, started_at)
+    db.commit()
+    return key
+
+
+def cites_experiences(experience_ids: Iterable[str]):
+    """Condition on stored scores whose matching_experiences cite any of the experiences (JSONB containment)."""
+    matches = cast(TenderMatchScore.matching_experiences, JSONB)
+    return or_(*(matches.contains([{"experience_id": experience_id}]) for experience_id in sorted(experience_ids)))
+
+
+def rescore_experience_changes(
+    db: Session,
+    company_name: str,
+    changed_ids: Iterable,
+    removed_ids: Iterable = (),
+) -> int:
+    """
+    Refresh stored scores after some experiences of a company were written (caller commits).
+
+    Only the tenders those experiences can affect are rescored: tenders whose
+    stored matches cite a changed or removed experience, and tenders sharing
+    a keyword with a changed one. They are scored against every experience of
+    the key, so stored best scores and match lists stay exact. Every stored
+    key whose filter covers the company is refreshed; keys never computed are
+    left to the background rescoring (rescore_all_companies).
+
+    Args:
+        db: Database session, with the experience writes flushed
+        company_name: Company of the written experiences
+        changed_ids: Inserted or updated experiences
+        removed_ids: Deleted experiences
+
+    Returns:
+        Number of (key, tender) scores stored again
+    """
+    changed = {str(experience_id) for experience_id in changed_ids}
+    touched = changed | {str(experience_id) for experience_id in removed_ids}
+    if not touched:
+        return 0
+
+    # Stored keys whose filter is a substring of the company (strpos: no LIKE wildcards in keys)
+    name = company_key(company_name)
+    states = db.query(CompanyMatchState).filter(func.strpos(literal(name), CompanyMatchState.company_key) > 0).all()
+    rescored = 0
+    for state in states:
+        key = state.company_key
+        fingerprint = _experience_fingerprint(db, key)
+        if fingerprint is None:
+            # The key has no experiences left
+            db.query(TenderMatchScore).filter(TenderMatchScore.company_key == key).delete(synchronize_session=False)
+            db.delete(state)
+            continue
+
+        profiles = compile_experience_profiles(_company_experiences_query(db, key).all())
+        changed_hashes = _keyword_hashes([profile for profile in profiles if profile.id in changed])
+        # Read before the stored rows are deleted below
+        cited = [
+            tender_id for (tender_id,) in db.query(TenderMatchScore.tender_id).filter(
+                TenderMatchScore.company_key == key,
+                cites_experiences(touched),
+            )
+        ]
+        conditions = []
+        if cited:
+            conditions.append(Tender.id.in_(cited))
+        if changed_hashes:
+            conditions.append(Tender.object_tokens.overlap(changed_hashes))
+
+        if conditions:
+            affected = or_(*conditions)
+            db.query(TenderMatchScore).filter(
+                TenderMatchScore.company_key == key,
+                TenderMatchScore.tender_id.in_(select(Tender.id).where(affected)),
+            ).delete(synchronize_session=False)
+            results = _score_tenders(db, profiles, affected)
+            store_company_scores(db, key, results)
+            notify_new_matches(db, key, results)
+            rescored += len(results)
+            logger.info(f"Rescored {len(results)} tenders for '{key}' after {len(touched)} experience changes")
+
+        # Scores match the new experience set; tender changes are still picked up by data version
+        state.experience_fingerprint = fingerprint
+    return rescored
+
+
+def filter_matching_experiences(matches: Optional[List[Dict]], min_score: float) -> Optional[List[Dict]]:
+    """Stored matches are kept from the storage floor up; keep those meeting the request threshold."""
+    if not matches:
+        return None
+    return [match for match in matches if match["score"] >= min_score] or None
+
+
+def _drop_unsubscribed_scores(db: Session, keys: List[str]) -> None:
+    """Delete stored scores and states of keys without an active subscription (commits)."""
+    stale = [
+        key for (key,) in db.query(CompanyMatchState.company_key).filter(CompanyMatchState.company_key.notin_(keys))
+    ]
+    if not stale:
+        return
+    db.query(TenderMatchScore).filter(TenderMatchScore.company_key.in_(stale)).delete(synchronize_session=False)
+    db.query(CompanyMatchState).filter(CompanyMatchState.company_key.in_(stale)).delete(synchronize_session=False)
+    db.commit()
+    logger.info(f"Dropped stored match scores of {len(stale)} unsubscribed companies")
+
+
+def rescore_all_companies(force: bool = True) -> None:
+    """
+    Bulk job: refresh stored scores for every company with an active subscription.
+
+    With force=False only companies whose experiences or tenders changed are
+    rescored (incrementally where possible); scoring runs on the process pool.
+    Scores of companies no longer subscribed are dropped.
+    """
+    db = SessionLocal()
+    try:
+        keys = subscribed_company_keys(db)
+        _drop_unsubscribed_scores(db, keys)
+        if not keys:
+            logger.info("No active subscriptions, skipping rescoring")
+            return
+        
+        load_entity_dictionary(db)
+        for key in keys:
+            try:
+                ensure_company_scores(db, key, force=force)
+            except Exception as e:
+                logger.error(f"Error rescoring tenders for {key}: {e}", exc_info=True)
+                db.rollback()
+    finally:
+        db.close()
@@ -0,0 +1,126 @@
+"""Process-pool matching for bulk rescoring of tenders against company experiences."""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.models.tender import Tender
+from app.services.entity_dictionary import EntityDictionary, get_entity_dictionary, set_entity_dictionary
+from app.services.experience_matching import (
+    ExperienceProfile,
+    TenderRecord,
+    MIN_MATCH_THRESHOLD,
+    match_tender_against_profiles,
+)
+
+logger = get_logger(__name__)
+
+# Below this many tenders the pool start-up costs more than it saves
+MIN_PARALLEL_TENDERS = 500
+
+# Profiles and threshold installed once per worker process by _init_worker
+_worker_profiles: List[ExperienceProfile] = []
+_worker_min_score: float = MIN_MATCH_THRESHOLD
+
+
+def _init_worker(profiles: List[ExperienceProfile], min_score: float, entities: EntityDictionary) -> None:
+    """
+    Receive the compiled profiles once per worker instead of once per task.
+    
+    The parent's entity dictionary is installed too, so the canonical entity
+    IDs carried by profiles and tender records mean the same in every worker.
+    """
+    global _worker_profiles, _worker_min_score
+    _worker_profiles = profiles
+    _worker_min_score = min_score
+    set_entity_dictionary(entities)
+
+
+def _match_shard(shard: List[TenderRecord]) -> List[Tuple[str, float, List[Dict]]]:
+    """Match one shard of tenders against the worker's profiles."""
+    results = []
+    for tender in shard:
+        score, matches = match_tender_against_profiles(tender, _worker_profiles, _worker_min_score)
+        results.append((tender.id, score, matches))
+    return results
+
+
+def parallel_match_tenders(
+    tenders: Sequence[TenderRecord],
+    profiles: List[ExperienceProfile],
+    min_score: float = MIN_MATCH_THRESHOLD,
+    workers: Optional[int] = None,
+    shard_size: Optional[int] = None,
+) -> Dict[str, Tuple[float, List[Dict]]]:
+    """
+    Match tenders against compiled profiles, sharding tenders across a process pool.
+
+    Results are merged in input order, so the output is identical to the
+    serial matcher regardless of worker count or completion order.
+
+    Args:
+        tenders: Detached tender records
+        profiles: Compiled experience profiles (see compile_experience_profiles)
+        min_score: Minimum score to consider a match
+        workers: Worker processes (defaults to settings.MATCHING_WORKERS, 0 = CPU count)
+        shard_size: Tenders per task (defaults to settings.MATCHING_SHARD_SIZE)
+
+    Returns:
+        Dictionary mapping tender_id to (score, matches)
+    """
+    workers = workers or settings.MATCHING_WORKERS or os.cpu_count() or 1
+    shard_size = shard_size or settings.MATCHING_SHARD_SIZE
+
+    if workers <= 1 or len(tenders) < MIN_PARALLEL_TENDERS or not profiles:
+        return {
+            tender.id: match_tender_against_profiles(tender, profiles, min_score)
+            for tender in tenders
+        }
+
+    shards = [list(tenders[i:i + shard_size]) for i in range(0, len(tenders), shard_size)]
+    workers = min(workers, len(shards))
+
+    # "spawn" keeps workers free of the parent's scheduler threads and DB connections
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(profiles, min_score, get_entity_dictionary()),
+    ) as executor:
+        results = {}
+        for shard_results in executor.map(_match_shard, shards):
+            for tender_id, score, matches in shard_results:
+                results[tender_id] = (score, matches)
+
+    logger.info(f"Matched {len(tenders)} tenders x {len(profiles)} experiences on {workers} workers")
+    return results
+
+
+def tender_record_query(db):
+    """Query of the columns needed to build TenderRecord objects, ordered by ID for deterministic sharding."""
+    return db.query(
+        Tender.id, Tender.object_text, Tender.object_tokens, Tender.amount, Tender.entity_name
+    ).order_by(Tender.id)
+
+
+def to_tender_records(rows) -> List[TenderRecord]:
+    """Convert tender_record_query rows into detached records."""
+    entities = get_entity_dictionary()
+    return [
+        TenderRecord(
+            id=str(tender_id),
+            object_text="" if tokens is not None else (object_text or ""),
+            object_tokens=tuple(tokens) if tokens is not None else None,
+            amount=float(amount) if amount else None,
+            entity_name=entity_name or "",
+            entity_id=entities.lookup(entity_name),
+        )
+        for tender_id, object_text, tokens, amount, entity_name in rows
+    ]
+
+
+def load_tender_records(db) -> List[TenderRecord]:
+    """Load every tender as a detached record."""
+    return to_tender_records(tender_record_query(db).all())
@@ -0,0 +1,266 @@
+"""Offline text similarity index: hashed character n-grams + MinHash LSH over tenders."""
+import threading
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal
+from app.models.tender import Tender
+from app.models.corpus_stats import CorpusStatistics
+from app.services.tokenization import STOP_WORDS, tokenize
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Character n-gram sizes taken inside each (padded) word
+NGRAM_SIZES = (3, 4)
+
+# MinHash / LSH layout: NUM_PERM = NUM_BANDS * ROWS_PER_BAND.
+# Two rows per band keeps recall high for the low Jaccard similarities typical
+# of a short experience description against a long tender object text.
+NUM_PERM = 128
+NUM_BANDS = 64
+ROWS_PER_BAND = NUM_PERM // NUM_BANDS
+
+# Universal hashing (a * x + b) mod p with p the smallest prime above 2**32;
+# a, b < 2**32 and x < 2**32 keep every intermediate value inside uint64.
+_PRIME = np.uint64(4294967311)
+_rng = np.random.RandomState(20240521)
+_PERM_A = _rng.randint(1, 2 ** 32 - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 2 ** 32 - 1, size=NUM_PERM, dtype=np.uint64)
+
+# Rows fetched per round trip when building the index
+INDEX_FETCH_SIZE = 5000
+
+# Re-read tenders touched slightly before the last sync: updated_at is set
+# before the ingestion batch commits, so a row may become visible late.
+SYNC_OVERLAP = timedelta(minutes=30)
+
+
+def char_ngram_features(text: str) -> np.ndarray:
+    """
+    Hashed character n-gram features of a text.
+
+    Words are accent-folded, stop words dropped, and each word is padded as
+    "<word>" so prefixes/suffixes are distinguishable ("pavimentación" and
+    "pavimentar" share "<pav", "pavi", "avim", ...).
+    """
+    features: Set[int] = set()
+    for word in tokenize(text):
+        if word in STOP_WORDS:
+            continue
+        padded = f"<{word}>"
+        for n in NGRAM_SIZES:
+            if len(padded) <= n:
+                features.add(zlib.crc32(padded.encode("utf-8")))
+                break
+            for start in range(len(padded) - n + 1):
+                features.add(zlib.crc32(padded[start:start + n].encode("utf-8")))
+    return np.fromiter(features, dtype=np.uint64, count=len(features))
+
+
+def minhash_signature(features: np.ndarray) -> np.ndarray:
+    """MinHash signature (NUM_PERM values) of a feature set; empty sets get an all-max signature."""
+    if len(features) == 0:
+        return np.full(NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint32)
+    hashed = (_PERM_A[:, None] * features[None, :] + _PERM_B[:, None]) % _PRIME
+    return (hashed.min(axis=1) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+
+def _band_keys(signature: np.ndarray) -> List[int]:
+    """One bucket key per band, packing the band's rows into an integer."""
+    bands = signature.reshape(NUM_BANDS, ROWS_PER_BAND).tolist()
+    keys = []
+    for band in bands:
+        key = 0
+        for value in band:
+            key = (key << 32) | value
+        keys.append(key)
+    return keys
+
+
+class SimilarityIndex:
+    """
+    MinHash LSH index of tender object texts.
+
+    Candidate retrieval only touches the buckets shared with the query, and
+    candidates are ranked by estimated Jaccard similarity (fraction of equal
+    signature values), so queries do not scan the whole table. Re-indexed
+    tenders are updated in place and removed tenders free their row, so the
+    index holds one row per live tender however often tenders are touched.
+    """
+
+    def __init__(self):
+        self._tender_ids: List[Optional[str]] = []  # None = free row
+        self._row_of: Dict[str, int] = {}
+        self._signatures = np.zeros((0, NUM_PERM), dtype=np.uint32)  # Grown by doubling
+        self._free: List[int] = []
+        self._buckets: List[Dict[int, Set[int]]] = [defaultdict(set) for _ in range(NUM_BANDS)]
+        self._lock = threading.Lock()
+        self.synced_at: Optional[datetime] = None
+        self.version: Optional[int] = None  # Corpus statistics version at the last sync
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def _new_row(self) -> int:
+        if self._free:
+            return self._free.pop()
+        row = len(self._tender_ids)
+        self._tender_ids.append(None)
+        if row >= len(self._signatures):
+            grown = np.zeros((max(1024, 2 * len(self._signatures)), NUM_PERM), dtype=np.uint32)
+            grown[:len(self._signatures)] = self._signatures
+            self._signatures = grown
+        return row
+
+    def _unlink(self, row: int) -> None:
+        """Drop a row from the buckets of its current signature."""
+        for band, key in enumerate(_band_keys(self._signatures[row])):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(row)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def add(self, tender_id: str, text: str) -> None:
+        """Index a tender text, replacing its previous signature (no-op when unchanged)."""
+        signature = minhash_signature(char_ngram_features(text))
+        with self._lock:
+            row = self._row_of.get(tender_id)
+            if row is not None:
+                if np.array_equal(self._signatures[row], signature):
+                    return
+                self._unlink(row)
+            else:
+                row = self._new_row()
+                self._tender_ids[row] = tender_id
+                self._row_of[tender_id] = row
+            self._signatures[row] = signature
+            for band, key in enumerate(_band_keys(signature)):
+                self._buckets[band][key].add(row)
+
+    def add_many(self, documents: Iterable[Tuple[str, str]]) -> None:
+        """Index (tender_id, text) pairs."""
+        for tender_id, text in documents:
+            self.add(tender_id, text)
+
+    def remove(self, tender_id: str) -> None:
+        """Drop a tender from the index (its row is reused by the next addition)."""
+        with self._lock:
+            row = self._row_of.pop(tender_id, None)
+            if row is None:
+                return
+            self._unlink(row)
+            self._tender_ids[row] = None
+            self._free.append(row)
+
+    def tender_ids(self) -> Set[str]:
+        """IDs of the indexed tenders."""
+        with self._lock:
+            return set(self._row_of)
+
+    def nearest(self, text: str, limit: int = 50, min_similarity: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        Top-N tenders nearest to a text.
+
+        Returns:
+            List of (tender_id, estimated_jaccard) sorted by similarity descending
+        """
+        signature = minhash_signature(char_ngram_features(text))
+        with self._lock:
+            candidates: Set[int] = set()
+            for band, key in enumerate(_band_keys(signature)):
+                candidates.update(self._buckets[band].get(key, ()))
+            if not candidates:
+                return []
+            rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            similarity = (self._signatures[rows] == signature).mean(axis=1)
+            tender_ids = [self._tender_ids[row] for row in rows]
+
+        order = np.argsort(-similarity, kind="stable")[:limit]
+        return [
+            (tender_ids[i], float(similarity[i]))
+            for i in order if similarity[i] >= min_similarity
+        ]
+
+    def sync(self, db: Session) -> None:
+        """
+        Index tenders created or updated since the last sync and drop deleted ones.
+
+        No-op while ingestion is idle. Deletions are looked for only when the
+        table's row count differs from the index size.
+        """
+        version = db.query(CorpusStatistics.version).filter(CorpusStatistics.id == 1).scalar() or 0
+        if version == self.version:
+            return
+        started_at = datetime.utcnow()
+        query = db.query(Tender.id, Tender.object_text)
+        if self.synced_at is not None:
+            query = query.filter(Tender.updated_at >= self.synced_at - SYNC_OVERLAP)
+        count = 0
+        for tender_id, object_text in query.execution_options(stream_results=True).yield_per(INDEX_FETCH_SIZE):
+            self.add(str(tender_id), object_text or "")
+            count += 1
+
+        removed = 0
+        if db.query(func.count(Tender.id)).scalar() != len(self):
+            live = {
+                str(tender_id) for (tender_id,)
+                in db.query(Tender.id).execution_options(stream_results=True).yield_per(INDEX_FETCH_SIZE)
+            }
+            for tender_id in self.tender_ids() - live:
+                self.remove(tender_id)
+                removed += 1
+
+        self.synced_at = started_at
+        self.version = version
+        if count or removed:
+            logger.info(f"Similarity index synced {count} tenders, removed {removed} ({len(self)} indexed)")
+
+
+_index = SimilarityIndex()
+_sync_lock = threading.Lock()
+_syncing = False  # A background sync is running (guarded by _sync_lock)
+
+
+def _sync_in_background() -> None:
+    global _syncing
+    db = SessionLocal()
+    try:
+        _index.sync(db)
+    except Exception as e:
+        logger.error(f"Similarity index sync failed: {e}", exc_info=True)
+    finally:
+        db.close()
+        with _sync_lock:
+            _syncing = False
+
+
+def start_similarity_sync() -> None:
+    """Build or sync the process-wide index in a background thread (no-op while one runs)."""
+    global _syncing
+    with _sync_lock:
+        if _syncing:
+            return
+        _syncing = True
+    threading.Thread(target=_sync_in_background, name="similarity-index", daemon=True).start()
+
+
+def get_similarity_index(db: Session) -> Optional[SimilarityIndex]:
+    """
+    Return the process-wide similarity index, or None until its first build finished.
+
+    The index is built at startup (start_similarity_sync); when tenders
+    changed since the last sync, a background sync is started and the
+    current index is served meanwhile.
+    """
+    version = db.query(CorpusStatistics.version).filter(CorpusStatistics.id == 1).scalar() or 0
+    if version != _index.version:
+        start_similarity_sync()
+    return _index if _index.synced_at is not None else None
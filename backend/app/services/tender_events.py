@@ -0,0 +1,188 @@
+"""Live tender events: Postgres NOTIFY from writers, fanned out to SSE clients by every API worker."""
+import asyncio
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import orjson
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.db import SessionLocal
+from app.core.logging import get_logger
+from app.models.tender import Tender
+from app.services.tender_rows import tender_item, tender_row_columns
+
+logger = get_logger(__name__)
+
+CHANNEL = "tender_events"
+
+# IDs per notification: NOTIFY payloads are limited to 8000 bytes
+NOTIFY_CHUNK_SIZE = 100
+
+# Wait before reconnecting a lost LISTEN connection
+LISTEN_RETRY_SECONDS = 5.0
+
+
+def _notify(db: Session, event: Dict) -> None:
+    db.execute(select(func.pg_notify(CHANNEL, orjson.dumps(event).decode("utf-8"))))
+
+
+def _chunks(values: List) -> Iterable[List]:
+    for start in range(0, len(values), NOTIFY_CHUNK_SIZE):
+        yield values[start:start + NOTIFY_CHUNK_SIZE]
+
+
+def notify_tenders_changed(db: Session, inserted: Iterable, updated: Iterable = ()) -> None:
+    """
+    Announce inserted/updated tender IDs inside the caller's transaction.
+
+    Postgres delivers notifications only when the transaction commits, so
+    listeners never hear about rows they cannot read yet (or rolled back).
+    """
+    for action, ids in (("inserted", inserted), ("updated", updated)):
+        for chunk in _chunks([str(tender_id) for tender_id in ids]):
+            _notify(db, {"type": "tenders", "action": action, "ids": chunk})
+
+
+def notify_new_matches(db: Session, key: str, results: Dict[str, Tuple[float, List[Dict]]]) -> None:
+    """Announce newly stored match scores of a company (tender ID + score) inside the caller's transaction."""
+    matches = [
+        {"tender_id": str(tender_id), "score": round(score, 4)}
+        for tender_id, (score, _) in sorted(results.items())
+    ]
+    for chunk in _chunks(matches):
+        _notify(db, {"type": "matches", "company_key": key, "matches": chunk})
+
+
+def load_tender_items(ids: List[str]) -> List[Dict]:
+    """Listing items of the announced tenders (one primary-key query)."""
+    db = SessionLocal()
+    try:
+        rows = db.query(*tender_row_columns()).filter(Tender.id.in_(ids)).all()
+        return [tender_item(row) for row in rows]
+    finally:
+        db.close()
+
+
+def _listen_dsn() -> str:
+    return make_url(settings.DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class TenderEventBroker:
+    """
+    One LISTEN connection per API worker, fanning notifications out to subscriber queues.
+
+    Every worker listens on the same channel, so clients get all events
+    whichever worker they are connected to. Tender events are enriched with
+    the tender rows once per worker, not once per client. Queues are bounded:
+    a client too slow to drain its queue misses events instead of growing
+    the worker's memory.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(_listen_dsn())
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(CHANNEL, self._on_notification)
+                logger.info(f"Listening for tender events on '{CHANNEL}'")
+                await lost.wait()
+                logger.warning("Tender event connection lost, reconnecting")
+            except asyncio.CancelledError:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+                raise
+            except Exception as e:
+                logger.error(f"Tender event listener failed: {e}")
+            await asyncio.sleep(LISTEN_RETRY_SECONDS)
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        if not self._subscribers:
+            return
+        try:
+            event = orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            logger.warning(f"Ignoring malformed tender event: {payload[:200]}")
+            return
+        if event.get("type") == "tenders":
+            asyncio.get_running_loop().create_task(self._publish_tenders(event))
+        else:
+            self.publish(event)
+
+    async def _publish_tenders(self, event: Dict) -> None:
+        try:
+            event["items"] = await run_in_threadpool(load_tender_items, event["ids"])
+        except Exception as e:
+            logger.error(f"Could not load announced tenders: {e}")
+        self.publish(event)
+
+    def publish(self, event: Dict) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning("Tender event queue full, dropping event for a slow client")
+
+
+tender_event_broker = TenderEventBroker()
+
+
+def format_sse(event: Dict) -> bytes:
+    """Server-Sent Events frame: event type and JSON data."""
+    return b"event: " + event["type"].encode("ascii") + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+
+
+async def event_stream(request: Request, company_key: Optional[str] = None, broker: TenderEventBroker = tender_event_broker):
+    """
+    SSE frames for one client until it disconnects.
+
+    Tender events go to every client; match events only to clients following
+    that company. A comment line is sent when idle so proxies keep the
+    connection open and disconnects are noticed.
+    """
+    queue = broker.subscribe()
+    try:
+        yield b"retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield b": keep-alive\n\n"
+                continue
+            if event["type"] == "matches" and event["company_key"] != company_key:
+                continue
+            yield format_sse(event)
+    finally:
+        broker.unsubscribe(queue)
@@ -0,0 +1,156 @@
+"""Streaming tender exports (NDJSON / CSV) read through a server-side cursor."""
+import csv
+import enum
+import io
+from datetime import date, datetime
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, Tuple
+
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Query, Session
+
+from app.core.db import SessionLocal
+from app.core.logging import get_logger
+from app.services.experience_matching import ExperienceProfile, match_tender_against_profiles
+from app.services.match_scores import filter_matching_experiences
+from app.services.tender_rows import RESPONSE_FIELDS, tender_item
+
+logger = get_logger(__name__)
+
+# Rows fetched per round trip from the server-side cursor, and written per chunk
+EXPORT_BATCH_SIZE = 2000
+
+# Stored-score columns appended to export rows when a company is given
+SCORE_FIELDS = ("experience_match_score", "matching_experiences")
+
+
+class ExportFormat(str, enum.Enum):
+    """Export file format."""
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
+def export_fields(fields: Optional[Sequence[str]], with_scores: bool) -> Tuple[str, ...]:
+    """Exported fields: the requested ones, or every listing field (scores only with a company)."""
+    if fields is not None:
+        return tuple(fields)
+    return tuple(
+        name for name in RESPONSE_FIELDS
+        if name != "search_rank" and (with_scores or name not in SCORE_FIELDS)
+    )
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return orjson.dumps(value).decode("utf-8")
+    return value
+
+
+def ndjson_chunks(items: Iterable[dict], fields: Sequence[str]) -> Iterator[bytes]:
+    """One JSON object per line, EXPORT_BATCH_SIZE lines per chunk."""
+    lines = []
+    for item in items:
+        lines.append(orjson.dumps({name: item[name] for name in fields}))
+        if len(lines) >= EXPORT_BATCH_SIZE:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+def csv_chunks(items: Iterable[dict], fields: Sequence[str]) -> Iterator[bytes]:
+    """Header line, then EXPORT_BATCH_SIZE rows per chunk (nested values as JSON)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    rows = 0
+    for item in items:
+        writer.writerow([_csv_value(item[name]) for name in fields])
+        rows += 1
+        if rows >= EXPORT_BATCH_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    yield buffer.getvalue().encode("utf-8")
+
+
+def stream_export(
+    build_query: Callable[[Session], Query],
+    names: Sequence[str],
+    fields: Sequence[str],
+    export_format: ExportFormat,
+    min_match_score: float,
+    profiles: Sequence[ExperienceProfile] = (),
+    matched_only: bool = False,
+) -> Iterator[bytes]:
+    """
+    Encoded export chunks of the rows of build_query(session).
+
+    Runs on its own session, open for as long as the response streams (the
+    request's session is closed once the endpoint returns). yield_per streams
+    results from a server-side cursor, so only one batch is held in memory.
+
+    Args:
+        build_query: Builds the filtered, ordered query on the export session
+        names: Names of the selected columns, in order (tender_item)
+        fields: Exported fields
+        export_format: NDJSON or CSV
+        min_match_score: Stored matching experiences below it are dropped
+        profiles: Score rows live against these (rows selected with the matcher's columns)
+        matched_only: With profiles, only export rows scoring at least min_match_score
+    """
+    db = SessionLocal()
+    try:
+        rows = build_query(db).yield_per(EXPORT_BATCH_SIZE)
+        if profiles:
+            items = _scored_items(rows, names, profiles, min_match_score, matched_only)
+        else:
+            items = (tender_item(row, names) for row in rows)
+        if "matching_experiences" in fields:
+            items = (
+                {**item, "matching_experiences": filter_matching_experiences(item["matching_experiences"], min_match_score)}
+                for item in items
+            )
+        chunks = ndjson_chunks if export_format == ExportFormat.NDJSON else csv_chunks
+        yield from chunks(items, fields)
+    except Exception as e:
+        # Headers are already sent: the client sees a truncated file
+        logger.error(f"Tender export failed: {e}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+def _scored_items(rows, names, profiles, min_match_score, matched_only) -> Iterator[dict]:
+    for row in rows:
+        score, matches = match_tender_against_profiles(row, profiles, min_score=min_match_score)
+        if matched_only and score < min_match_score:
+            continue
+        yield tender_item(
+            row,
+            names,
+            experience_match_score=score if score > 0 else None,
+            matching_experiences=matches or None,
+        )
+
+
+def export_response(chunks: Iterator[bytes], export_format: ExportFormat) -> StreamingResponse:
+    """Streaming download of export chunks (starlette iterates them in the thread pool)."""
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="tenders.{export_format.value}"'},
+    )
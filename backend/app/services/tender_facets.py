@@ -0,0 +1,56 @@
+"""Tender facet counts (department, municipality, contract type, ...) from the tender_facets materialized view."""
+from typing import Dict, List
+
+from sqlalchemy import column, table, text
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Facets in response order; month is the publication month (YYYY-MM)
+FACETS = ("department", "municipality", "contract_type", "contract_modality", "state", "month")
+
+# Materialized view created by migration 9c1e5a7f3b26 (not part of the ORM metadata)
+tender_facets = table(
+    "tender_facets",
+    column("facet"),
+    column("value"),
+    column("tender_count"),
+)
+
+
+def refresh_tender_facets(db: Session) -> None:
+    """
+    Recompute the facet view inside the caller's transaction (caller commits).
+
+    CONCURRENTLY keeps the view readable by the facets endpoint while it is
+    rebuilt; it needs the unique (facet, value) index.
+    """
+    db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY tender_facets"))
+
+
+def get_tender_facets(db: Session, limit: int) -> Dict[str, List[Dict]]:
+    """
+    Counts per value of every facet, most frequent first.
+
+    Args:
+        db: Database session
+        limit: Values kept per facet
+
+    Returns:
+        Facet name -> [{"value": ..., "count": ...}] (value None = not set)
+    """
+    rows = db.execute(
+        tender_facets.select().order_by(
+            tender_facets.c.facet,
+            tender_facets.c.tender_count.desc(),
+            tender_facets.c.value,
+        )
+    ).all()
+    facets: Dict[str, List[Dict]] = {name: [] for name in FACETS}
+    for facet, value, count in rows:
+        values = facets.get(facet)
+        if values is not None and len(values) < limit:
+            values.append({"value": value or None, "count": count})
+    return facets
@@ -5,6 +5,12 @@ from app.core.logging import get_logger
 from app.models.tender import Tender, TenderSource
 from app.models.subscription import Subscription
 from app.services.secop_client import fetch_recent_tenders
+from app.services.tokenization import compute_token_hashes
+from app.services.corpus_scoring import update_corpus_statistics
+from app.services.data_version import bump_data_version
+from app.services.match_scores import rescore_all_companies
+from app.services.tender_facets import refresh_tender_facets
+from app.services.tender_events import notify_tenders_changed
 # Classification removed - experience matching is the main approach
 from app.services.notifications import send_email_alert, send_whatsapp_alert
 
@@ -53,6 +59,13 @@ def fetch_and_store_new_tenders() -> None:
             )
             existing_ids = {id[0] for id in existing_ids}  # Convert from list of tuples to set
             
+            # Token sets entering/leaving the corpus, for incremental BM25/TF-IDF statistics
+            added_tokens = []
+            removed_tokens = []
+            # Tenders of this batch announced to live clients once it commits
+            batch_inserted = []
+            batch_updated = []
+            
             for secop_tender in batch:
                 try:
                     # Check if tender already exists
@@ -65,6 +78,10 @@ def fetch_and_store_new_tenders() -> None:
                         if existing:
                             existing.entity_name = secop_tender.entity_name
                             existing.object_text = secop_tender.object_text
+                            if existing.object_tokens is not None:
+                                removed_tokens.append(existing.object_tokens)
+                            existing.object_tokens = compute_token_hashes(secop_tender.object_text)
+                            added_tokens.append(existing.object_tokens)
                             existing.department = secop_tender.department
                             existing.municipality = secop_tender.municipality
                             existing.amount = secop_tender.amount
@@ -75,6 +92,7 @@ def fetch_and_store_new_tenders() -> None:
                             existing.process_url = secop_tender.process_url
                             existing.updated_at = datetime.utcnow()
                             updated_count += 1
+                            batch_updated.append(existing)
                         continue
                     
                     # Create new tender
@@ -83,6 +101,7 @@ def fetch_and_store_new_tenders() -> None:
                         source=TenderSource(secop_tender.source),
                         entity_name=secop_tender.entity_name,
                         object_text=secop_tender.object_text,
+                        object_tokens=compute_token_hashes(secop_tender.object_text),
                         department=secop_tender.department,
                         municipality=secop_tender.municipality,
                         amount=secop_tender.amount,
@@ -98,6 +117,8 @@ def fetch_and_store_new_tenders() -> None:
                     
                     db.add(new_tender)
                     new_tenders.append(new_tender)
+                    batch_inserted.append(new_tender)
+                    added_tokens.append(new_tender.object_tokens)
                 
                 except Exception as e:
                     logger.error(f"Error processing tender {secop_tender.external_id}: {e}")
@@ -105,12 +126,19 @@ def fetch_and_store_new_tenders() -> None:
             
             # Commit this batch
             try:
+                update_corpus_statistics(db, added_tokens, removed_tokens)
+                if added_tokens:
+                    bump_data_version(db)
+                    db.flush()  # Assigns IDs to the new tenders
+                    notify_tenders_changed(db, [t.id for t in batch_inserted], [t.id for t in batch_updated])
                 db.commit()
                 logger.debug(f"Committed batch {i//batch_size + 1} ({len(batch)} tenders)")
             except Exception as e:
                 logger.error(f"Error committing batch: {e}")
                 db.rollback()
                 # Try to commit individual items to identify the problematic one
+                added_tokens = []
+                batch_inserted = []
                 for secop_tender in batch:
                     try:
                         existing = db.query(Tender).filter(
@@ -122,6 +150,7 @@ def fetch_and_store_new_tenders() -> None:
                                 source=TenderSource(secop_tender.source),
                                 entity_name=secop_tender.entity_name,
                                 object_text=secop_tender.object_text,
+                                object_tokens=compute_token_hashes(secop_tender.object_text),
                                 department=secop_tender.department,
                                 municipality=secop_tender.municipality,
                                 amount=secop_tender.amount,
@@ -134,11 +163,18 @@ def fetch_and_store_new_tenders() -> None:
                                 contract_modality=secop_tender.contract_modality,
                                 is_relevant_interventoria_vial=False,
                             )
-                            db.merge(new_tender)  # Use merge to handle conflicts
+                            merged = db.merge(new_tender)  # Use merge to handle conflicts
+                            added_tokens.append(new_tender.object_tokens)
+                            batch_inserted.append(merged)
                     except Exception as inner_e:
                         logger.warning(f"Skipping duplicate tender {secop_tender.external_id}: {inner_e}")
                         continue
                 try:
+                    update_corpus_statistics(db, added_tokens)
+                    if added_tokens:
+                        bump_data_version(db)
+                        db.flush()
+                        notify_tenders_changed(db, [t.id for t in batch_inserted])
                     db.commit()
                 except Exception as final_e:
                     logger.error(f"Final commit error: {final_e}")
@@ -153,8 +189,22 @@ def fetch_and_store_new_tenders() -> None:
         # Commit all changes
         db.commit()
         
+        # Rebuild facet counts; the version bump drops responses cached before the refresh
+        if new_tenders or updated_count:
+            try:
+                refresh_tender_facets(db)
+                bump_data_version(db)
+                db.commit()
+            except Exception as e:
+                logger.error(f"Error refreshing tender facets: {e}")
+                db.rollback()
+        
         logger.info(f"Tender ingestion completed. Experience matching is the main approach for filtering.")
         
+        # Refresh stored experience-match scores of subscribed companies (changed tenders only)
+        if new_tenders or updated_count:
+            rescore_all_companies(force=False)
+        
         # Send notifications (optional - only if subscriptions are configured)
         # Note: Notifications can still use experience matching if needed
         relevant_tenders = new_tenders  # For now, use all new tenders for notifications
@@ -0,0 +1,104 @@
+"""Tender listing rows: plain column tuples serialized in bulk, without per-row validation."""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import Float, cast
+
+from app.models.tender import Tender
+from app.schemas.tender import TenderResponse
+
+# TenderResponse fields in schema order, and those read straight from tenders columns
+RESPONSE_FIELDS = tuple(TenderResponse.model_fields)
+ROW_FIELDS = tuple(name for name in RESPONSE_FIELDS if name in Tender.__table__.columns)
+
+# Columns read even when not requested: sort/cursor values, and what the matcher scores
+SORT_FIELDS = ("id", "publication_date")
+MATCH_FIELDS = ("id", "entity_name", "object_text", "amount")
+
+# Item template: every schema field present, computed ones (match scores, rank) None
+_EMPTY_ITEM = dict.fromkeys(RESPONSE_FIELDS)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Response fields requested with `fields=` (comma-separated), in schema order.
+    
+    Returns None (all fields) when no fields are given.
+    
+    Raises:
+        HTTPException: 400 if a name is not a TenderResponse field
+    """
+    if not fields or not fields.strip():
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(RESPONSE_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(RESPONSE_FIELDS)}",
+        )
+    return tuple(name for name in RESPONSE_FIELDS if name in requested)
+
+
+def row_fields(fields: Optional[Sequence[str]], matching: bool = False) -> Tuple[str, ...]:
+    """
+    Tender columns to select for a listing projected to `fields` (None = all).
+    
+    Args:
+        fields: Requested response fields (parse_fields)
+        matching: Rows are scored against experiences, so the matcher's columns are needed
+    """
+    if fields is None:
+        return ROW_FIELDS
+    wanted = set(fields).union(SORT_FIELDS, MATCH_FIELDS if matching else ())
+    return tuple(name for name in ROW_FIELDS if name in wanted)
+
+
+def tender_row_columns(names: Sequence[str] = ROW_FIELDS, with_tokens: bool = False) -> List[Any]:
+    """
+    Columns to select for listing items, `names` first and in order.
+    
+    Selecting columns instead of Tender entities skips ORM identity-map work,
+    and casting amount to float gives JSON-ready values.
+    
+    Args:
+        names: Tender columns to read (row_fields)
+        with_tokens: Also select object_tokens, for rows passed to the matcher
+    """
+    columns = [
+        cast(Tender.amount, Float).label("amount") if name == "amount" else getattr(Tender, name)
+        for name in names
+    ]
+    if with_tokens:
+        columns.append(Tender.object_tokens)
+    return columns
+
+
+def tender_item(row, names: Sequence[str] = ROW_FIELDS, **extra) -> Dict[str, Any]:
+    """TenderResponse-shaped dict from a tender_row_columns(names) row plus computed fields."""
+    item = _EMPTY_ITEM.copy()
+    item.update(zip(names, row))
+    item.update(extra)
+    return item
+
+
+def tender_page_response(
+    items: List[Dict[str, Any]],
+    fields: Optional[Sequence[str]] = None,
+    **page,
+) -> ORJSONResponse:
+    """
+    TenderListResponse-shaped JSON response encoded in a single orjson call.
+    
+    Values come from typed database columns, so the page is not validated
+    again against response_model (FastAPI skips it for Response objects).
+    
+    Args:
+        items: tender_item dicts
+        fields: Keep only these item fields (parse_fields), None for all
+        page: total, limit, offset, ... of the page
+    """
+    if fields is not None:
+        items = [{name: item[name] for name in fields} for item in items]
+    return ORJSONResponse({"items": items, **page})
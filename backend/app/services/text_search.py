@@ -0,0 +1,31 @@
+"""Spanish full-text search over tenders (stored tsvector with a GIN index)."""
+from sqlalchemy import Float, cast, func, literal_column
+
+from app.models.tender import Tender
+
+# Text search configuration used for tenders.search_vector; queries must use the same one
+SEARCH_CONFIG = literal_column("'spanish'::regconfig")
+
+
+def search_query(q: str):
+    """
+    tsquery for user input, accent-folded like the stored vector.
+    
+    Uses web-search syntax: words are ANDed, "quoted phrases", OR and -exclusion.
+    """
+    return func.websearch_to_tsquery(SEARCH_CONFIG, func.f_unaccent(q))
+
+
+def search_filter(q: str):
+    """Filter on tenders matching the query (served by the GIN index on search_vector)."""
+    return Tender.search_vector.op("@@")(search_query(q))
+
+
+def search_rank(q: str):
+    """
+    ts_rank of a tender for the query (object text weighted above entity name).
+    
+    ts_rank returns float4; it is cast to double precision so the value a page
+    cursor carries compares equal to the one the keyset filter recomputes.
+    """
+    return cast(func.ts_rank(Tender.search_vector, search_query(q)), Float(precision=53))
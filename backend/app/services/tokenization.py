@@ -0,0 +1,118 @@
+"""Text normalization and token hashing shared by matching, search and classification."""
+import re
+import unicodedata
+import zlib
+from functools import lru_cache
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+
+# Spanish stop words that carry no matching signal
+STOP_WORDS = frozenset({
+    "a", "al", "ante", "con", "de", "del", "el", "en", "entre", "es", "la", "las",
+    "lo", "los", "o", "para", "por", "que", "se", "sin", "su", "sus", "un", "una",
+    "uno", "y",
+})
+
+# Minimum token length kept in the normalized token set
+MIN_TOKEN_LENGTH = 2
+
+# Plural endings a keyword also matches ("puente" matches "puentes", "vial" matches "viales")
+PLURAL_SUFFIXES = ("s", "es")
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def fold_accents(text: str) -> str:
+    """Lowercase text and strip diacritics ("Vías" -> "vias", "Diseño" -> "diseno")."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def contains_pattern(text: str) -> str:
+    """LIKE pattern matching accent-folded (*_norm) columns that contain the given text."""
+    return f"%{fold_accents(text.strip())}%"
+
+
+@lru_cache(maxsize=65536)
+def _fold_word(word: str) -> Tuple[str, ...]:
+    """Accent-folded token(s) of one lowercased word; plain ASCII words are returned as they are."""
+    if word.isascii():
+        return (word,)
+    return tuple(_TOKEN_RE.findall(fold_accents(word)))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into accent-folded words, keeping order and duplicates.
+
+    Words are split first and folded one at a time through a cache: tender
+    and experience texts share a small vocabulary, so almost every word is a
+    cache hit instead of a per-character Unicode decomposition.
+    """
+    if not text:
+        return []
+    tokens = []
+    for word in _TOKEN_RE.findall(unicodedata.normalize("NFC", text).lower()):
+        tokens.extend(_fold_word(word))
+    return tokens
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Return the sorted set of accent-folded, stop-word filtered tokens of a text."""
+    return sorted({
+        token for token in tokenize(text)
+        if len(token) >= MIN_TOKEN_LENGTH and token not in STOP_WORDS
+    })
+
+
+def token_hash(token: str) -> int:
+    """
+    Stable 32-bit signed hash of a normalized token.
+
+    Python's built-in hash() is salted per process, so CRC32 is used instead;
+    the result fits a PostgreSQL INTEGER column.
+    """
+    value = zlib.crc32(token.encode("utf-8"))
+    return value - (1 << 32) if value >= (1 << 31) else value
+
+
+def hash_tokens(tokens: Iterable[str]) -> List[int]:
+    """Hash tokens into a sorted, de-duplicated list suitable for an INTEGER[] column."""
+    return sorted({token_hash(token) for token in tokens})
+
+
+def compute_token_hashes(text: str) -> List[int]:
+    """Normalize and hash a text in one step (used at ingestion time)."""
+    return hash_tokens(normalize_tokens(text))
+
+
+def tender_token_set(object_text: str, stored_tokens: Optional[Iterable[int]] = None) -> FrozenSet[int]:
+    """
+    Token hash set for a tender.
+
+    Uses the tokens persisted at ingestion time when available and only falls
+    back to tokenizing the text for rows that have not been backfilled yet.
+    """
+    if stored_tokens is not None:
+        return frozenset(stored_tokens)
+    return frozenset(compute_token_hashes(object_text or ""))
+
+
+@lru_cache(maxsize=65536)
+def keyword_hash(keyword: str) -> int:
+    """Hash an extracted keyword the same way tender tokens are hashed."""
+    return token_hash(fold_accents(keyword.strip()))
+
+
+@lru_cache(maxsize=65536)
+def keyword_variant_hashes(keyword: str) -> FrozenSet[int]:
+    """
+    Hashes of a keyword and of its plural forms.
+
+    A keyword matches a tender containing any of them, which keeps the
+    plurals the former substring test matched ("puente" in "puentes") now
+    that tenders are compared as whole tokens.
+    """
+    folded = fold_accents(keyword.strip())
+    return frozenset(token_hash(folded + suffix) for suffix in ("",) + PLURAL_SUFFIXES)
@@ -0,0 +1,87 @@
+"""Tests for BM25/TF-IDF corpus scoring."""
+import threading
+from collections import Counter
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services import corpus_scoring
+from app.services.corpus_scoring import CorpusIndex, ScoringMode, get_corpus_index
+from app.services.tokenization import compute_token_hashes
+
+TENDERS = {
+    "t1": "Interventoría técnica para el mejoramiento de la malla vial urbana",
+    "t2": "Suministro de equipos de cómputo para oficinas",
+    "t3": "Interventoría a la construcción del puente vehicular sobre el río",
+}
+
+
+def _build_index() -> CorpusIndex:
+    token_lists = {tender_id: compute_token_hashes(text) for tender_id, text in TENDERS.items()}
+    doc_freqs = Counter(token for tokens in token_lists.values() for token in tokens)
+    vocabulary = np.array(sorted(doc_freqs), dtype=np.int64)
+    return CorpusIndex.from_documents(
+        token_lists.items(),
+        vocabulary,
+        np.array([doc_freqs[token] for token in vocabulary], dtype=np.float64),
+        document_count=len(token_lists),
+        avgdl=sum(len(tokens) for tokens in token_lists.values()) / len(token_lists),
+    )
+
+
+def test_rank_tenders_orders_by_similarity():
+    """Both modes rank the road supervision tender first and skip unrelated ones."""
+    index = _build_index()
+    experience = SimpleNamespace(
+        id="e1",
+        project_description="Interventoría al mejoramiento de la malla vial",
+        keywords=["interventoría", "malla"],
+    )
+    for mode in (ScoringMode.BM25, ScoringMode.TFIDF):
+        ranking = index.rank_tenders([experience], mode, limit=3)
+        assert [tender_id for tender_id, _ in ranking][:2] == ["t1", "t3"]
+        assert "t2" not in dict(ranking)
+        assert all(0.0 < score <= 1.0 for _, score in ranking)
+
+    scores = index.keyword_scores([experience], ScoringMode.TFIDF)
+    assert scores.for_tender("t2") == {}
+    assert scores.for_tender("unknown") is None
+
+
+def test_stale_index_is_served_while_rebuilt_in_background(monkeypatch):
+    """A statistics version bump never rebuilds the index inside the request."""
+    versions = [1]
+    release = threading.Event()
+
+    class FakeSession:
+        def query(self, *args):
+            return self
+
+        def filter(self, *args):
+            return self
+
+        def scalar(self):
+            return versions[-1]
+
+        def close(self):
+            pass
+
+    def background_build(db):
+        release.wait(5)
+        return SimpleNamespace(version=versions[-1])
+
+    current = SimpleNamespace(version=1)
+    monkeypatch.setattr(corpus_scoring, "_index", current)
+    monkeypatch.setattr(corpus_scoring.CorpusIndex, "build", background_build)
+    monkeypatch.setattr(corpus_scoring, "SessionLocal", FakeSession)
+
+    versions.append(2)
+    assert get_corpus_index(FakeSession()) is current
+    assert get_corpus_index(FakeSession()) is current
+    release.set()
+    for _ in range(100):
+        if corpus_scoring._index is not current:
+            break
+        threading.Event().wait(0.05)
+    assert corpus_scoring._index.version == 2
+    assert get_corpus_index(FakeSession()).version == 2
@@ -0,0 +1,21 @@
+"""Tests for the request database handle."""
+import asyncio
+import threading
+
+from app.core.db import Database
+
+
+def test_run_calls_function_with_session_off_the_event_loop():
+    session = object()
+
+    def work(db, value, scale=1):
+        return db, value * scale, threading.get_ident()
+
+    async def main():
+        return await Database(session).run(work, 2, scale=3), threading.get_ident()
+
+    (db, result, worker_thread), loop_thread = asyncio.run(main())
+
+    assert db is session
+    assert result == 6
+    assert worker_thread != loop_thread
@@ -0,0 +1,77 @@
+"""Tests for entity-name canonicalization."""
+import pickle
+
+from app.services.entity_dictionary import EntityDictionary
+
+
+def test_aliases_and_accent_variants_share_an_id():
+    """Known acronyms, accents and case variants resolve to one canonical entity."""
+    entities = EntityDictionary()
+    invias = entities.lookup("Instituto Nacional de Vías")
+    assert entities.lookup("INVIAS") == invias
+    assert entities.lookup("INSTITUTO NACIONAL DE VIAS") == invias
+    assert entities.score(entities.lookup("invias"), invias) == 1.0
+
+
+def test_acronyms_are_learned_from_names():
+    """An acronym written next to a full name becomes an alias of that name."""
+    entities = EntityDictionary()
+    entities.add_names(["CORMACARENA", "Corporación para el Desarrollo Sostenible de La Macarena (CORMACARENA)"])
+    assert entities.lookup("CORMACARENA") == entities.lookup("Corporación para el Desarrollo Sostenible de La Macarena")
+
+
+def test_parenthesized_places_are_not_aliases():
+    """A department in parentheses is not an acronym: municipalities stay apart and the bare name is not theirs."""
+    entities = EntityDictionary()
+    entities.add_names(["Alcaldía de Rionegro (Antioquia)", "Alcaldía de Envigado (Antioquia)", "ANTIOQUIA"])
+    rionegro = entities.lookup("Alcaldía de Rionegro (Antioquia)")
+    envigado = entities.lookup("Alcaldía de Envigado (Antioquia)")
+    assert rionegro != envigado
+    assert entities.score(rionegro, envigado) < 1.0
+    assert entities.lookup("ANTIOQUIA") not in (rionegro, envigado)
+
+
+def test_acronyms_must_spell_the_name():
+    """Acronyms that do not match the name's initials are not learned."""
+    entities = EntityDictionary()
+    entities.add_names(["MEDELLIN", "Empresa Departamental de Lotería (MEDELLIN)"])
+    assert entities.lookup("Empresa Departamental de Lotería (MEDELLIN)") != entities.lookup("MEDELLIN")
+
+
+def test_dictionary_depends_only_on_the_set_of_names():
+    """Any registration order gives the same IDs and aliases, and lookups never register names."""
+    names = ["INVIAS", "RUTA", "Red Urbana de Transporte Alternativo (RUTA)", "Alcaldía de Chía"]
+    first, second = EntityDictionary(), EntityDictionary()
+    first.add_names(names)
+    second.add_names(reversed(names))
+    for name in names:
+        assert first.lookup(name) == second.lookup(name)
+    assert first.lookup("RUTA") == first.lookup("Red Urbana de Transporte Alternativo")
+
+    size = len(first)
+    assert first.lookup("Gobernación del Meta") is None
+    assert len(first) == size
+
+
+def test_unknown_names_are_scored_by_key():
+    """Names missing from the snapshot score as they will once loaded."""
+    entities = EntityDictionary()
+    assert entities.score_names("INVIAS", "Instituto Nacional de Vías - INVIAS") == 1.0
+    assert entities.score_names("Alcaldía de Chía - Secretaría de Obras", "Alcaldía de Chía") == 0.7
+    assert entities.score_names("Alcaldía de Chía", None) == 0.0
+
+
+def test_partial_scores_survive_pickling():
+    """Containment and word overlap keep their original weights, including in worker snapshots."""
+    entities = EntityDictionary()
+    entities.add_names([
+        "Alcaldía de Chía",
+        "Alcaldía de Chía - Secretaría de Obras",
+        "Gobernación de Cundinamarca",
+        "Alcaldía de Cajicá",
+    ])
+    entities = pickle.loads(pickle.dumps(entities))
+    alcaldia = entities.lookup("Alcaldía de Chía")
+    assert entities.score(entities.lookup("Alcaldía de Chía - Secretaría de Obras"), alcaldia) == 0.7
+    assert entities.score(entities.lookup("Gobernación de Cundinamarca"), alcaldia) == 0.0
+    assert entities.score(entities.lookup("Alcaldía de Cajicá"), alcaldia) == 0.4
@@ -0,0 +1,147 @@
+"""Tests for the columnar Excel experience import."""
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from app.services.excel_import import (
+    map_experience_columns,
+    parse_amount,
+    parse_amounts,
+    parse_date,
+    parse_dates,
+    ExperienceFileFormat,
+    detect_file_format,
+    import_experiences_from_file,
+    open_experience_rows,
+    prepare_experience_records,
+    read_sheet_rows,
+)
+
+
+def test_parse_dates_matches_parse_date():
+    values = pd.Series(
+        [None, np.nan, 0, 44000, "12/31/2020", "31/12/2020", " 2020-05-01 ", "2021/07/08",
+         "not a date", datetime(2020, 1, 2, 3, 4), date(2019, 3, 4), ""],
+        dtype=object,
+    )
+
+    assert list(parse_dates(values)) == [parse_date(value) for value in values]
+
+
+def test_parse_amounts_matches_parse_amount():
+    values = pd.Series([None, np.nan, 0, "0", "$ 1,234.50", 1500000, "abc", "", 12.5], dtype=object)
+
+    assert list(parse_amounts(values)) == [parse_amount(value) for value in values]
+
+
+def test_prepare_experience_records_reports_rows_and_maps_columns():
+    df = pd.DataFrame({
+        "Empresa": ["ACME", None, "ACME"],
+        "Contrato": ["C-1", np.nan, "C-3"],
+        "Descripción de la obra": ["Interventoría de la malla vial", "Construcción de puentes", "  "],
+        "Valor": ["$ 1,000", None, "5"],
+    })
+    columns = map_experience_columns(list(df.columns))
+
+    records, errors = prepare_experience_records(df, columns, "BEC")
+
+    assert errors == ["Row 4: Empty OBRA"]
+    assert [(r["company_name"], r["contract_number"], r["amount"]) for r in records] == [
+        ("ACME", "C-1", 1000.0),
+        ("BEC", None, None),
+    ]
+    assert records[0]["completion_date"] is None
+    assert records[0]["keywords"]
+
+
+def test_read_sheet_rows_finds_header_below_title_rows(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["EXPERIENCIA BEC"])
+    sheet.append([])
+    sheet.append(["No.", "OBRA", "VALOR", None, "VALOR"])
+    sheet.append([1, "Interventoría vial", 1500.5])
+    sheet.append([])
+    sheet.append([2, "Puente", 20, None, None, "extra"])
+    sheet.append([])
+    path = tmp_path / "experiencias.xlsx"
+    workbook.save(path)
+
+    rows = read_sheet_rows(str(path))
+    chunk = next(rows.chunks)
+
+    assert rows.columns == ["No.", "OBRA", "VALOR", "Column_3", "VALOR.1"]
+    assert rows.first_row == 4
+    # Blank rows are left out, offsets keep the row numbers
+    assert chunk.index.tolist() == [0, 2]
+    assert chunk.values.tolist() == [
+        [1, "Interventoría vial", 1500.5, None, None],
+        [2, "Puente", 20, None, None],
+    ]
+
+
+def test_csv_rows_sniff_encoding_delimiter_and_header(tmp_path):
+    path = tmp_path / "experiencias.csv"
+    path.write_bytes(
+        "Listado de experiencia;;\n"
+        "CONTRATO No.;OBRA;VALOR ACTUAL\n"
+        "007;Interventoría vial;$1,500.50\n"
+        " ; ;\n"
+        "008;Puente;20\n".encode("latin-1")
+    )
+
+    rows = open_experience_rows(str(path))
+    chunk = next(rows.chunks)
+    records, errors = prepare_experience_records(
+        chunk, map_experience_columns(rows.columns), "BEC", first_row=rows.first_row,
+    )
+
+    assert detect_file_format(str(path)) == ExperienceFileFormat.CSV
+    assert rows.columns == ["CONTRATO No.", "OBRA", "VALOR ACTUAL"]
+    assert chunk.index.tolist() == [0, 2]
+    assert [(r["contract_number"], r["project_description"], r["amount"]) for r in records] == [
+        ("007", "Interventoría vial", 1500.5),
+        ("008", "Puente", 20.0),
+    ]
+    assert errors == []
+
+
+def test_csv_delimiter_comes_from_the_header_row(tmp_path):
+    """Trailing delimiters and commas in data cells do not hide a semicolon header."""
+    path = tmp_path / "experiencias.csv"
+    path.write_text("OBRA;EMPRESA;\nfoo, bar;BEC;\n", encoding="utf-8")
+
+    rows = open_experience_rows(str(path))
+
+    assert rows.columns == ["OBRA", "EMPRESA"]
+    assert next(rows.chunks)["OBRA"].tolist() == ["foo, bar"]
+
+
+def test_csv_import_without_obra_column_fails(tmp_path):
+    path = tmp_path / "experiencias.csv"
+    path.write_text("CONTRATO|VALOR\n007|20\n", encoding="utf-8")
+
+    result = import_experiences_from_file(str(path), "BEC")
+
+    assert result.committed is False
+    assert result.imported == 0
+    assert "Missing required columns: OBRA" in result.errors[0]
+
+
+def test_parquet_rows(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "experiencias.parquet"
+    pd.DataFrame({"OBRA": ["Interventoría vial", None], "VALOR ACTUAL": [1500.5, 20.0]}).to_parquet(path)
+
+    rows = open_experience_rows(str(path))
+    records, errors = prepare_experience_records(
+        next(rows.chunks), map_experience_columns(rows.columns), "BEC", first_row=rows.first_row,
+    )
+
+    assert detect_file_format(str(path)) == ExperienceFileFormat.PARQUET
+    assert rows.total_rows == 2
+    assert [(r["project_description"], r["amount"]) for r in records] == [("Interventoría vial", 1500.5)]
+    assert errors == ["Row 2: Empty OBRA"]
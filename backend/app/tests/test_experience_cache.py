@@ -0,0 +1,58 @@
+"""Tests for the per-company experience profile cache."""
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from app.services import experience_cache
+from app.services.corpus_scoring import experience_query_tokens
+from app.services.experience_matching import compile_experience_profiles
+
+
+def _setup(monkeypatch, max_entries=256):
+    versions = [1]
+    loads = []
+
+    def fake_load(db, key, version, entities_version):
+        loads.append((key, version))
+        return experience_cache.CompanyExperienceSet(key, version, entities_version, ())
+
+    monkeypatch.setattr(experience_cache, "_sets", OrderedDict())
+    monkeypatch.setattr(experience_cache, "_load", fake_load)
+    monkeypatch.setattr(experience_cache, "get_experience_version", lambda db, max_age: versions[-1])
+    monkeypatch.setattr(experience_cache, "refresh_entity_dictionary", lambda db: SimpleNamespace(version=None))
+    monkeypatch.setattr(experience_cache.settings, "EXPERIENCE_CACHE_MAX_ENTRIES", max_entries)
+    return versions, loads
+
+
+def test_profiles_are_reused_until_experiences_change(monkeypatch):
+    versions, loads = _setup(monkeypatch)
+
+    first = experience_cache.get_company_profiles(None, "Bogotá ")
+    assert experience_cache.get_company_profiles(None, "bogota") is first
+    versions.append(2)
+    experience_cache.get_company_profiles(None, "BOGOTA")
+
+    assert loads == [("bogota", 1), ("bogota", 2)]
+
+
+def test_least_recently_used_company_is_evicted(monkeypatch):
+    _, loads = _setup(monkeypatch, max_entries=2)
+
+    for name in ("a", "b", "a", "c", "a", "b"):
+        experience_cache.get_company_profiles(None, name)
+
+    assert [key for key, _ in loads] == ["a", "b", "c", "b"]
+
+
+def test_profile_query_tokens_match_experience():
+    experience = SimpleNamespace(
+        id="e1",
+        project_description="Interventoría de la malla vial",
+        contracting_entity=None,
+        amount=None,
+        category=None,
+        engineering_area=None,
+        keywords=["interventoría", "puente"],
+    )
+    profile = compile_experience_profiles([experience])[0]
+
+    assert experience_query_tokens(profile) == experience_query_tokens(experience)
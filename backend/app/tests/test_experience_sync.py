@@ -0,0 +1,53 @@
+"""Tests for diff-based experience sync."""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.experience_sync import normalize_experience, plan_experience_sync
+from sqlalchemy.dialects import postgresql
+
+from app.services.match_scores import cites_experiences
+
+
+def _stored(experience_id, **values):
+    return {"id": experience_id, **normalize_experience(values)}
+
+
+def test_plan_diffs_by_contract_number_and_content():
+    stored = [
+        _stored("e1", contract_number="001", project_description="Interventoría vial", amount=Decimal("1500.00")),
+        _stored("e2", contract_number="002", project_description="Puente"),
+        _stored("e3", project_description="Estudios", completion_date=date(2020, 1, 31)),
+        _stored("e4", project_description="Diseño"),
+    ]
+    items = [normalize_experience(item) for item in [
+        {"contract_number": " 001 ", "project_description": "Interventoría vial ", "amount": 1500.0},
+        {"contract_number": "002", "project_description": "Puente vehicular"},
+        {"project_description": "Estudios", "completion_date": date(2020, 1, 31)},
+        {"contract_number": "003", "project_description": "Mantenimiento"},
+    ]]
+
+    plan = plan_experience_sync(stored, items)
+
+    assert plan.unchanged == 2
+    assert [(update["id"], update["project_description"]) for update in plan.updates] == [("e2", "Puente vehicular")]
+    assert [insert["contract_number"] for insert in plan.inserts] == ["003"]
+    assert plan.deletes == ["e4"]
+    assert plan_experience_sync(stored, items, delete_missing=False).deletes == []
+
+
+def test_plan_rejects_duplicate_contract_numbers():
+    items = [normalize_experience({"contract_number": "001", "project_description": text}) for text in ("A", "B")]
+
+    with pytest.raises(HTTPException) as exc:
+        plan_experience_sync([], items)
+    assert exc.value.status_code == 400
+
+
+def test_cited_tenders_are_found_by_jsonb_containment():
+    compiled = cites_experiences(["e3", "e4"]).compile(dialect=postgresql.dialect())
+
+    assert str(compiled).count("CAST(tender_match_scores.matching_experiences AS JSONB) @>") == 2
+    assert sorted(compiled.params.values(), key=str) == [[{"experience_id": "e3"}], [{"experience_id": "e4"}]]
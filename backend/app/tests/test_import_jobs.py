@@ -0,0 +1,131 @@
+"""Tests for background experience import jobs."""
+import asyncio
+import io
+import os
+import uuid
+
+from fastapi import UploadFile
+from app.services import import_jobs
+from app.services.excel_import import ImportResult
+from app.services.import_jobs import fail_interrupted_import_jobs, run_import_job, save_upload
+
+
+def test_save_upload_copies_in_chunks(monkeypatch, tmp_path):
+    monkeypatch.setattr(import_jobs, "UPLOAD_CHUNK_SIZE", 4)
+    monkeypatch.setattr(import_jobs.settings, "IMPORT_UPLOAD_DIR", str(tmp_path))
+    upload = UploadFile(file=io.BytesIO(b"0123456789"), filename="exp.xlsx")
+
+    path = asyncio.run(save_upload(upload, ".xlsx"))
+
+    assert path.startswith(str(tmp_path)) and path.endswith(".xlsx")
+    with open(path, "rb") as f:
+        assert f.read() == b"0123456789"
+
+
+def test_run_import_job_records_progress_and_rescores(monkeypatch, tmp_path):
+    updates = []
+    rescored = []
+    path = tmp_path / "upload.xlsx"
+    path.write_bytes(b"x")
+
+    def fake_import(file_path, company_name, on_progress):
+        on_progress(0, 3)
+        on_progress(3, 3)
+        return ImportResult(2, ["Row 3: Empty OBRA"], True)
+
+    monkeypatch.setattr(import_jobs, "_update_job", lambda job_id, **values: updates.append(values))
+    monkeypatch.setattr(import_jobs, "import_experiences_from_file", fake_import)
+    monkeypatch.setattr(import_jobs, "rescore_all_companies", lambda force: rescored.append(force))
+
+    result = run_import_job(uuid.uuid4(), str(path), "BEC")
+
+    assert result == (2, ["Row 3: Empty OBRA"])
+    assert [u.get("status") for u in updates if "status" in u] == ["running", "rescoring", "completed"]
+    assert {"processed_rows": 0, "total_rows": 3} in updates
+    assert rescored == [False]
+    assert not os.path.exists(path)
+
+
+def test_run_import_job_fails_when_file_cannot_be_read(monkeypatch, tmp_path):
+    updates = []
+    path = tmp_path / "upload.xlsx"
+    path.write_bytes(b"x")
+    monkeypatch.setattr(import_jobs, "_update_job", lambda job_id, **values: updates.append(values))
+    monkeypatch.setattr(
+        import_jobs, "import_experiences_from_file",
+        lambda file_path, company_name, on_progress: ImportResult(0, ["Error reading file: bad zip"], False),
+    )
+
+    run_import_job(uuid.uuid4(), str(path), "BEC")
+
+    assert updates[-1]["status"] == "failed"
+    assert updates[-1]["message"] == "Error reading file: bad zip"
+
+
+def test_run_import_job_fails_when_import_rolls_back(monkeypatch, tmp_path):
+    """Rows processed before a rollback are not reported as imported, and nothing is rescored."""
+    updates = []
+    rescored = []
+    path = tmp_path / "upload.xlsx"
+    path.write_bytes(b"x")
+
+    def failing_import(file_path, company_name, on_progress):
+        on_progress(0, 3)
+        on_progress(2, 3)
+        return ImportResult(0, ["Row 2: Empty OBRA", "Error reading file: insert failed"], False)
+
+    monkeypatch.setattr(import_jobs, "_update_job", lambda job_id, **values: updates.append(values))
+    monkeypatch.setattr(import_jobs, "import_experiences_from_file", failing_import)
+    monkeypatch.setattr(import_jobs, "rescore_all_companies", lambda force: rescored.append(force))
+
+    result = run_import_job(uuid.uuid4(), str(path), "BEC")
+
+    assert result == (0, ["Row 2: Empty OBRA", "Error reading file: insert failed"])
+    assert [u.get("status") for u in updates if "status" in u] == ["running", "failed"]
+    assert updates[-1]["processed_rows"] == 0
+    assert updates[-1]["message"] == "Error reading file: insert failed"
+    assert rescored == []
+
+
+class _FakeJobQuery:
+    def __init__(self, updates, criterion=None):
+        self.updates = updates
+        self.criterion = criterion
+
+    def filter(self, criterion):
+        return _FakeJobQuery(self.updates, criterion)
+
+    def update(self, values, synchronize_session):
+        self.updates.append((str(self.criterion.compile(compile_kwargs={"literal_binds": True})), values))
+        return 2
+
+
+class _FakeSession:
+    def __init__(self, updates):
+        self.updates = updates
+        self.committed = False
+
+    def query(self, model):
+        return _FakeJobQuery(self.updates)
+
+    def commit(self):
+        self.committed = True
+
+    def close(self):
+        pass
+
+
+def test_unfinished_jobs_are_failed_at_startup(monkeypatch):
+    """Importing jobs fail with nothing imported; rescoring ones keep their committed rows."""
+    updates = []
+    session = _FakeSession(updates)
+    monkeypatch.setattr(import_jobs, "SessionLocal", lambda: session)
+
+    assert fail_interrupted_import_jobs() == 4
+
+    (importing, importing_values), (rescoring, rescoring_values) = updates
+    assert importing == "import_jobs.status IN ('pending', 'running')"
+    assert importing_values["status"] == "failed" and importing_values["imported"] == 0
+    assert rescoring == "import_jobs.status = 'rescoring'"
+    assert rescoring_values["status"] == "failed" and "imported" not in rescoring_values
+    assert session.committed
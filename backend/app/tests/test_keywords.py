@@ -0,0 +1,45 @@
+"""Tests for compiled keyword extraction and phrase matching."""
+from app.services.keywords import (
+    ROAD_SUPERVISION_TOKENS,
+    KeywordExtractor,
+    compile_phrases,
+    count_phrase_matches,
+    extract_keywords,
+    extract_keywords_batch,
+)
+from app.services.tokenization import compute_token_hashes, tokenize
+
+
+def test_extract_keywords_folds_accents_and_keeps_text_order():
+    text = "Interventoría técnica para el MEJORAMIENTO de vías terciarias y vias urbanas del municipio"
+
+    assert extract_keywords(text) == [
+        "interventoria", "tecnica", "mejoramiento", "vias", "terciarias", "urbanas", "municipio",
+    ]
+    assert extract_keywords("") == []
+
+
+def test_significant_words_are_capped():
+    extractor = KeywordExtractor(["puente"], max_significant=2)
+
+    assert extractor.extract("puente peatonal colgante metalico puente") == ["puente", "peatonal", "colgante"]
+
+
+def test_batch_matches_single_extraction():
+    texts = ["Construcción de puentes", None, "Construcción de puentes", "Estudios y diseños"]
+
+    assert extract_keywords_batch(texts) == [extract_keywords(text) for text in texts]
+
+
+def test_tokenize_folds_word_by_word_like_whole_text():
+    text = "Diseño ﬁnal: VÍA m² ½ km_12 Ñuñoa (Bogotá,D.C.)"
+
+    assert tokenize(text) == ["diseno", "final", "via", "m2", "1", "2", "km_12", "nunoa", "bogota", "d", "c"]
+
+
+def test_phrase_matches_need_every_phrase_token():
+    phrases = compile_phrases(["malla vial", "supervisión de vías"])
+
+    assert count_phrase_matches(phrases, set(compute_token_hashes("Mantenimiento de la malla vial"))) == 1
+    assert count_phrase_matches(phrases, set(compute_token_hashes("Malla eslabonada"))) == 0
+    assert count_phrase_matches(ROAD_SUPERVISION_TOKENS, set(compute_token_hashes("Interventoría vial"))) == 2
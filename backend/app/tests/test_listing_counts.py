@@ -0,0 +1,65 @@
+"""Tests for cached listing totals."""
+from datetime import date
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+
+from app.models.tender import Tender
+from app.services.listing_counts import count_key, get_cached_count, page_total, planner_estimate
+
+
+class _CountQuery:
+    def __init__(self, total):
+        self.total = total
+        self.calls = 0
+
+    def count(self):
+        self.calls += 1
+        return self.total
+
+
+def test_count_key_ignores_blank_filters_and_order():
+    assert count_key(1, department="Meta", q=None) == count_key(1, q="", department="Meta")
+    assert count_key(1, department="Meta") != count_key(2, department="Meta")
+
+
+def test_page_total_uses_window_count_and_caches_it():
+    query = _CountQuery(99)
+    key = count_key(7, department="Boyacá")
+
+    total = page_total(key, None, [SimpleNamespace(total_count=42)], True, query, 0)
+
+    assert total == (42, False)
+    assert get_cached_count(key) == (42, False)
+    assert page_total(key, get_cached_count(key), [], False, query, 0) == (42, False)
+    assert query.calls == 0
+
+
+def test_page_total_counts_separately_when_page_cannot_tell():
+    query = _CountQuery(17)
+
+    assert page_total(count_key(7, q="puente"), None, [], True, query, 100) == (17, False)
+    assert page_total(count_key(7, q="vía"), None, [SimpleNamespace()], False, query, 0) == (17, False)
+    assert page_total(count_key(7, q="túnel"), None, [], True, query, 0) == (0, False)
+    assert query.calls == 2
+
+
+def test_planner_estimate_binds_filters_through_the_driver_paramstyle():
+    executed = []
+
+    def execute(statement):
+        executed.append(statement)
+        return SimpleNamespace(scalar=lambda: [{"Plan": {"Plan Rows": 1234}}])
+
+    query = Query(Tender.id).filter(
+        Tender.department.like("%meta%"),
+        Tender.publication_date >= date(2024, 1, 1),
+        Tender.contract_type.in_(["Obra", "Consultoría"]),
+    )
+
+    assert planner_estimate(SimpleNamespace(execute=execute), query) == 1234
+    compiled = executed[0].compile(dialect=postgresql.psycopg2.dialect())
+    assert str(compiled).startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "%(" in str(compiled)
+    assert sorted(compiled.params.values(), key=str) == ["%meta%", date(2024, 1, 1), "Consultoría", "Obra"]
@@ -0,0 +1,44 @@
+"""Tests for stored experience-match scores."""
+from types import SimpleNamespace
+
+from app.services.experience_matching import TenderRecord, compile_experience_profiles, match_tender_against_profiles
+from app.services.match_scores import STORED_SCORE_FLOOR, can_use_stored_scores, company_key, filter_matching_experiences
+from app.services.tokenization import compute_token_hashes
+
+
+def test_tender_without_keyword_overlap_never_exceeds_floor():
+    """A perfect amount/entity/category match without shared keywords stays at the floor."""
+    profiles = compile_experience_profiles([
+        SimpleNamespace(
+            id="e1",
+            project_description="Interventoría malla vial",
+            contracting_entity="INVIAS",
+            amount=200_000_000,
+            category="Interventoría",
+            engineering_area="Vías",
+            keywords=["pavimentación"],
+        )
+    ])
+    tender = TenderRecord(
+        id="t1",
+        object_text="",
+        object_tokens=tuple(compute_token_hashes("Interventoría de obra vial")),
+        amount=200_000_000.0,
+        entity_name="INVIAS",
+    )
+
+    score, _ = match_tender_against_profiles(tender, profiles, min_score=0.0)
+
+    assert score <= STORED_SCORE_FLOOR
+    assert not can_use_stored_scores(STORED_SCORE_FLOOR)
+    assert can_use_stored_scores(0.6)
+
+
+def test_filter_matching_experiences_and_company_key():
+    matches = [{"experience_id": "a", "score": 0.9}, {"experience_id": "b", "score": 0.55}]
+
+    assert filter_matching_experiences(matches, 0.6) == [matches[0]]
+    assert filter_matching_experiences(matches, 0.95) is None
+    assert filter_matching_experiences(None, 0.6) is None
+    assert company_key("  Acme S.A.S ") == "acme s.a.s"
+    assert company_key(None) == ""
@@ -0,0 +1,37 @@
+"""Tests for keyset pagination cursors."""
+from datetime import datetime
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor, next_cursor, parse_cursor
+
+
+def test_cursor_round_trip():
+    tender_id = uuid4()
+    published = datetime(2024, 5, 21, 10, 30)
+
+    cursor = encode_cursor(published, 0.8125, tender_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, datetime.fromisoformat, float, UUID) == [published, 0.8125, tender_id]
+    assert decode_cursor(encode_cursor(None, tender_id), datetime.fromisoformat, UUID) == [None, tender_id]
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor", datetime.fromisoformat, UUID)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(None, uuid4()), datetime.fromisoformat, float, UUID)
+    with pytest.raises(HTTPException) as exc:
+        parse_cursor(encode_cursor("yesterday", str(uuid4())), datetime.fromisoformat, UUID)
+    assert exc.value.status_code == 400
+    assert parse_cursor(None, UUID) is None
+
+
+def test_next_cursor_only_on_full_pages():
+    rows = [(1, "a"), (2, "b")]
+
+    assert next_cursor(rows, 3, lambda row: row) is None
+    assert decode_cursor(next_cursor(rows, 2, lambda row: row), int, str) == [2, "b"]
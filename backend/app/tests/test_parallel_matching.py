@@ -0,0 +1,48 @@
+"""Tests for process-pool bulk matching."""
+from types import SimpleNamespace
+
+from app.services.experience_matching import TenderRecord, compile_experience_profiles
+from app.services.parallel_matching import MIN_PARALLEL_TENDERS, parallel_match_tenders
+from app.services.tokenization import compute_token_hashes
+
+OBJECTS = [
+    "Interventoría técnica al mejoramiento de la malla vial urbana",
+    "Construcción de puente vehicular",
+    "Suministro de papelería",
+]
+
+
+def _records(count):
+    return [
+        TenderRecord(
+            id=f"t{i:05d}",
+            object_text="",
+            object_tokens=tuple(compute_token_hashes(OBJECTS[i % len(OBJECTS)])),
+            amount=float(100_000_000 * (1 + i % 7)),
+            entity_name="INVIAS" if i % 2 else "Alcaldía de Chía",
+        )
+        for i in range(count)
+    ]
+
+
+def test_parallel_results_match_serial_results():
+    """Sharding across workers gives the same scores, in the same order, as the serial path."""
+    profiles = compile_experience_profiles([
+        SimpleNamespace(
+            id="e1",
+            project_description="Interventoría malla vial",
+            contracting_entity="INVIAS",
+            amount=200_000_000,
+            category="Interventoría",
+            engineering_area="Vías",
+            keywords=["interventoría", "malla", "vial"],
+        )
+    ])
+    tenders = _records(MIN_PARALLEL_TENDERS + 100)
+
+    serial = parallel_match_tenders(tenders, profiles, min_score=0.0, workers=1)
+    parallel = parallel_match_tenders(tenders, profiles, min_score=0.0, workers=2, shard_size=150)
+
+    assert list(parallel) == [tender.id for tender in tenders]
+    assert parallel == serial
+    assert serial["t00000"][0] > serial["t00002"][0]
@@ -0,0 +1,78 @@
+"""Tests for the ETag response cache."""
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.core import response_cache
+from app.core.response_cache import MemoryResponseCache, cached_response, etag_matches
+
+
+class Item(BaseModel):
+    value: str
+
+
+def _client(monkeypatch, versions):
+    calls = []
+    monkeypatch.setattr(response_cache, "cached_data_version", lambda max_age: versions[-1])
+    monkeypatch.setattr(response_cache, "response_cache", MemoryResponseCache(10))
+    app = FastAPI()
+
+    @app.get("/items", response_model=Item)
+    @cached_response
+    async def read_item(request: Request, value: str = "a", db=Depends(lambda: None)):
+        calls.append(value)
+        return Item(value=value)
+
+    return TestClient(app), calls
+
+
+def test_repeat_requests_are_served_from_cache_and_revalidated(monkeypatch):
+    versions = [1]
+    client, calls = _client(monkeypatch, versions)
+
+    first = client.get("/items?value=x")
+    second = client.get("/items?value=x&unused=")
+    not_modified = client.get("/items?value=x", headers={"If-None-Match": first.headers["etag"]})
+
+    assert first.json() == second.json() == {"value": "x"}
+    assert first.headers["etag"] == second.headers["etag"]
+    assert not_modified.status_code == 304
+    assert calls == ["x"]
+
+    versions.append(2)
+    changed = client.get("/items?value=x", headers={"If-None-Match": first.headers["etag"]})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != first.headers["etag"]
+    assert calls == ["x", "x"]
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryResponseCache(2)
+    cache.set("a", "ea", b"1")
+    cache.set("b", "eb", b"2")
+    cache.get("a")
+    cache.set("c", "ec", b"3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == ("ea", b"1")
+
+
+def test_memory_cache_evicts_by_body_bytes():
+    cache = MemoryResponseCache(10, max_bytes=8)
+    cache.set("a", "ea", b"1234")
+    cache.set("b", "eb", b"5678")
+    cache.set("c", "ec", b"90")
+    cache.set("huge", "eh", b"x" * 9)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == ("eb", b"5678")
+    assert cache.get("c") == ("ec", b"90")
+    assert cache.get("huge") is None
+
+
+def test_etag_matches_weak_and_lists():
+    assert etag_matches('"abc"', 'W/"abc"')
+    assert etag_matches('W/"x", W/"abc"', 'W/"abc"')
+    assert etag_matches("*", 'W/"abc"')
+    assert not etag_matches(None, 'W/"abc"')
+    assert not etag_matches('W/"x"', 'W/"abc"')
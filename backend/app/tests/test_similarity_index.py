@@ -0,0 +1,42 @@
+"""Tests for the MinHash LSH similarity index."""
+from app.services.similarity_index import SimilarityIndex
+
+
+def test_nearest_finds_differently_worded_tender():
+    """Shared character n-grams surface tenders with different word forms and accents."""
+    index = SimilarityIndex()
+    index.add("road", "Interventoría técnica a la pavimentación de vías urbanas del municipio")
+    index.add("it", "Suministro de equipos de cómputo y licencias de software")
+    index.add("bridge", "Construcción de puente peatonal en concreto")
+
+    nearest = index.nearest("Pavimentar la via urbana municipal", limit=2)
+    assert nearest[0][0] == "road"
+    assert 0.0 < nearest[0][1] <= 1.0
+
+
+def test_reindexing_replaces_previous_text():
+    """Re-adding a tender drops its stale signature from the results."""
+    index = SimilarityIndex()
+    index.add("t1", "Mantenimiento de alcantarillado sanitario")
+    index.add("t1", "Mejoramiento de la malla vial terciaria")
+
+    assert len(index) == 1
+    assert [tender_id for tender_id, _ in index.nearest("malla vial terciaria")] == ["t1"]
+    assert index.nearest("alcantarillado sanitario", min_similarity=0.5) == []
+
+
+def test_reindexing_and_removal_reuse_rows():
+    """Touching or removing tenders never grows the index beyond its live tenders."""
+    index = SimilarityIndex()
+    index.add("t1", "Mantenimiento de alcantarillado sanitario")
+    index.add("t2", "Mejoramiento de la malla vial terciaria")
+    for _ in range(3):
+        index.add("t1", "Mantenimiento de alcantarillado sanitario")
+        index.add("t2", "Rehabilitación de la malla vial terciaria")
+    index.remove("t1")
+    index.add("t3", "Construcción de puente peatonal en concreto")
+
+    assert len(index) == 2
+    assert len(index._tender_ids) == 2
+    assert index.nearest("alcantarillado sanitario", min_similarity=0.5) == []
+    assert [tender_id for tender_id, _ in index.nearest("puente peatonal")][:1] == ["t3"]
@@ -0,0 +1,78 @@
+"""Tests for live tender events."""
+import asyncio
+import json
+
+from app.config import settings
+from app.services import tender_events
+from app.services.tender_events import TenderEventBroker, event_stream, format_sse, notify_tenders_changed
+
+
+class _Request:
+    async def is_disconnected(self):
+        return False
+
+
+class _Broker(TenderEventBroker):
+    def subscribe(self):
+        # No LISTEN connection in tests
+        queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+
+def test_notify_tenders_changed_chunks_ids(monkeypatch):
+    events = []
+    monkeypatch.setattr(tender_events, "_notify", lambda db, event: events.append(event))
+    monkeypatch.setattr(tender_events, "NOTIFY_CHUNK_SIZE", 2)
+
+    notify_tenders_changed(None, ["a", "b", "c"], ["d"])
+
+    assert [(e["action"], e["ids"]) for e in events] == [
+        ("inserted", ["a", "b"]),
+        ("inserted", ["c"]),
+        ("updated", ["d"]),
+    ]
+
+
+def test_format_sse_frame():
+    frame = format_sse({"type": "matches", "company_key": "bec", "matches": []})
+
+    event_line, data_line, *_ = frame.decode("utf-8").split("\n")
+    assert event_line == "event: matches"
+    assert json.loads(data_line.removeprefix("data: "))["company_key"] == "bec"
+    assert frame.endswith(b"\n\n")
+
+
+def test_event_stream_filters_matches_by_company():
+    async def main():
+        broker = _Broker()
+        stream = event_stream(_Request(), "bec", broker=broker)
+        assert await stream.__anext__() == b"retry: 5000\n\n"
+        next_frame = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        broker.publish({"type": "matches", "company_key": "other", "matches": []})
+        broker.publish({"type": "matches", "company_key": "bec", "matches": [{"tender_id": "t", "score": 0.7}]})
+        frame = await next_frame
+        await stream.aclose()
+        return frame, broker
+
+    frame, broker = asyncio.run(main())
+
+    assert b'"company_key":"bec"' in frame
+    assert not broker._subscribers
+
+
+def test_publish_drops_events_for_full_queues(monkeypatch):
+    monkeypatch.setattr(settings, "EVENTS_QUEUE_SIZE", 1)
+
+    async def main():
+        broker = _Broker()
+        queue = broker.subscribe()
+        broker.publish({"type": "tenders", "ids": ["a"]})
+        broker.publish({"type": "tenders", "ids": ["b"]})
+        return queue
+
+    queue = asyncio.run(main())
+
+    assert queue.qsize() == 1
+    assert queue.get_nowait()["ids"] == ["a"]
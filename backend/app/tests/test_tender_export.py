@@ -0,0 +1,90 @@
+"""Tests for streaming tender exports."""
+import csv
+import io
+import json
+import uuid
+from collections import namedtuple
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.models.tender import TenderSource
+from app.services import tender_export
+from app.services.experience_matching import compile_experience_profiles
+from app.services.tender_export import ExportFormat, csv_chunks, export_fields, ndjson_chunks, stream_export
+from app.services.tokenization import compute_token_hashes
+
+
+def _items(count):
+    return [
+        {
+            "id": uuid.uuid4(),
+            "source": TenderSource.SECOP_II,
+            "publication_date": datetime(2024, 5, i % 28 + 1),
+            "amount": None,
+            "matching_experiences": [{"score": 0.8}],
+        }
+        for i in range(count)
+    ]
+
+
+def test_export_fields_default_to_listing_fields():
+    assert "search_rank" not in export_fields(None, with_scores=True)
+    assert "experience_match_score" in export_fields(None, with_scores=True)
+    assert "experience_match_score" not in export_fields(None, with_scores=False)
+    assert export_fields(("id", "amount"), with_scores=True) == ("id", "amount")
+
+
+def test_ndjson_chunks_are_batched_lines(monkeypatch):
+    monkeypatch.setattr(tender_export, "EXPORT_BATCH_SIZE", 2)
+    items = _items(5)
+
+    chunks = list(ndjson_chunks(items, ("id", "source", "amount")))
+
+    assert len(chunks) == 3
+    lines = b"".join(chunks).decode("utf-8").splitlines()
+    assert [json.loads(line) for line in lines][0] == {"id": str(items[0]["id"]), "source": "SECOP_II", "amount": None}
+    assert len(lines) == 5
+
+
+def test_csv_chunks_write_header_and_flat_values(monkeypatch):
+    monkeypatch.setattr(tender_export, "EXPORT_BATCH_SIZE", 2)
+    fields = ("id", "source", "publication_date", "amount", "matching_experiences")
+
+    rows = list(csv.reader(io.StringIO(b"".join(csv_chunks(_items(3), fields)).decode("utf-8"))))
+
+    assert rows[0] == list(fields)
+    assert len(rows) == 4
+    assert rows[1][1:] == ["SECOP_II", "2024-05-01T00:00:00", "", '[{"score":0.8}]']
+
+
+def test_companies_without_stored_scores_are_scored_as_rows_stream(monkeypatch):
+    """Live profiles fill the score fields, and matched exports keep only rows above the threshold."""
+    Row = namedtuple("Row", "id entity_name object_text amount object_tokens")
+    rows = [
+        Row(str(uuid.uuid4()), entity, text, None, tuple(compute_token_hashes(text)))
+        for entity, text in (("INVIAS", "Pavimentación de la vía al llano"), ("Alcaldía de Chía", "Suministro de papelería"))
+    ]
+    query = SimpleNamespace(yield_per=lambda size: iter(rows))
+    monkeypatch.setattr(tender_export, "SessionLocal", lambda: SimpleNamespace(close=lambda: None))
+    profiles = compile_experience_profiles([
+        SimpleNamespace(
+            id="e1",
+            project_description="Pavimentación vía al llano",
+            contracting_entity="INVIAS",
+            amount=None,
+            category=None,
+            engineering_area=None,
+            keywords=["pavimentación", "vía"],
+        )
+    ])
+    fields = ("id", "experience_match_score", "matching_experiences")
+
+    chunks = stream_export(
+        lambda session: query, ("id", "entity_name", "object_text", "amount"), fields,
+        ExportFormat.NDJSON, 0.3, profiles=profiles, matched_only=True,
+    )
+    lines = [json.loads(line) for line in b"".join(chunks).decode("utf-8").splitlines()]
+
+    assert [line["id"] for line in lines] == [rows[0].id]
+    assert lines[0]["experience_match_score"] >= 0.3
+    assert lines[0]["matching_experiences"][0]["experience_id"] == "e1"
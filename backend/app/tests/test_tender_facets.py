@@ -0,0 +1,35 @@
+"""Tests for tender facet counts."""
+from app.services.tender_facets import FACETS, get_tender_facets
+
+
+class _Result:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class _Session:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, statement):
+        return _Result(self.rows)
+
+
+def test_get_tender_facets_groups_rows_and_limits_values():
+    rows = [
+        ("department", "Meta", 40),
+        ("department", "Boyacá", 12),
+        ("department", "", 3),
+        ("month", "2024-05", 9),
+        ("unknown", "x", 1),
+    ]
+
+    facets = get_tender_facets(_Session(rows), limit=2)
+
+    assert tuple(facets) == FACETS
+    assert facets["department"] == [{"value": "Meta", "count": 40}, {"value": "Boyacá", "count": 12}]
+    assert facets["month"] == [{"value": "2024-05", "count": 9}]
+    assert facets["state"] == []
@@ -0,0 +1,87 @@
+"""Tests for the tender listing fast serialization path."""
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.tender import TenderSource
+from app.schemas.tender import TenderListResponse
+from app.services.tender_rows import (
+    RESPONSE_FIELDS,
+    ROW_FIELDS,
+    parse_fields,
+    row_fields,
+    tender_item,
+    tender_page_response,
+)
+
+
+def _row():
+    values = dict(
+        id=uuid.uuid4(),
+        external_id="CO1.PCCNTR.1",
+        source=TenderSource.SECOP_II,
+        entity_name="INVIAS",
+        object_text="Interventoría vial",
+        object_preview="Interventoría vial",
+        department="Meta",
+        municipality="Villavicencio",
+        amount=1500000.5,
+        publication_date=datetime(2024, 5, 21, 10, 30),
+        closing_date=None,
+        state="Publicado",
+        apertura_estado="Abierto",
+        process_url="https://example.org/1",
+        contract_type="Interventoría",
+        contract_modality="Concurso de méritos",
+        relevance_score=None,
+        is_relevant_interventoria_vial=True,
+        created_at=datetime(2024, 5, 21),
+        updated_at=datetime(2024, 5, 22),
+    )
+    return tuple(values[name] for name in ROW_FIELDS)
+
+
+def test_tender_item_has_every_field_in_schema_order():
+    item = tender_item(_row(), experience_match_score=0.7)
+
+    assert tuple(item) == RESPONSE_FIELDS
+    assert item["experience_match_score"] == 0.7
+    assert item["search_rank"] is None
+
+
+def test_page_response_matches_pydantic_serialization():
+    items = [tender_item(_row(), matching_experiences=[{"score": 0.8}])]
+    fields = dict(total=1, total_estimated=False, limit=10, offset=0, next_cursor=None)
+
+    body = tender_page_response(items, **fields).body
+    expected = TenderListResponse.model_validate({"items": items, **fields}).model_dump_json()
+
+    assert json.loads(body) == json.loads(expected)
+
+
+def test_parse_fields_keeps_schema_order_and_rejects_unknown_names():
+    assert parse_fields(None) is None
+    assert parse_fields(" amount, id ,object_preview") == ("id", "object_preview", "amount")
+    with pytest.raises(HTTPException) as exc:
+        parse_fields("id,body")
+    assert exc.value.status_code == 400
+
+
+def test_row_fields_add_sort_and_matcher_columns():
+    assert row_fields(None) == ROW_FIELDS
+    assert row_fields(("object_preview",)) == ("id", "object_preview", "publication_date")
+    assert "object_text" in row_fields(("object_preview",), matching=True)
+    assert "experience_match_score" not in row_fields(("experience_match_score",))
+
+
+def test_page_response_projects_requested_fields():
+    names = row_fields(("object_preview", "experience_match_score"))
+    row = tuple(dict(zip(ROW_FIELDS, _row()))[name] for name in names)
+    items = [tender_item(row, names, experience_match_score=0.5)]
+
+    body = json.loads(tender_page_response(items, ("object_preview", "experience_match_score"), total=1).body)
+
+    assert body == {"items": [{"object_preview": "Interventoría vial", "experience_match_score": 0.5}], "total": 1}
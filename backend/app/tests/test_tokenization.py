@@ -0,0 +1,39 @@
+"""Tests for text normalization and token hashing."""
+from app.services.tokenization import (
+    compute_token_hashes,
+    contains_pattern,
+    fold_accents,
+    keyword_hash,
+    normalize_tokens,
+    tender_token_set,
+)
+from app.services.experience_matching import calculate_keyword_score
+
+
+def test_normalize_tokens_folds_accents_and_drops_stop_words():
+    """Tokens are lowercased, accent-folded, de-duplicated and stop-word filtered."""
+    assert fold_accents("Interventoría Técnica") == "interventoria tecnica"
+    assert normalize_tokens("Pavimentación de la Vía y de las VÍAS") == ["pavimentacion", "via", "vias"]
+
+
+def test_stored_tokens_match_experience_keywords():
+    """Experience keywords match stored tender tokens regardless of accents."""
+    stored = compute_token_hashes("INTERVENTORÍA de la malla vial urbana")
+    tokens = tender_token_set("", stored)
+    assert keyword_hash("interventoria") in tokens
+    assert keyword_hash("interventoría") in tokens
+    assert calculate_keyword_score(tokens, ["vial", "malla", "puente"]) > 0.6
+    assert calculate_keyword_score(tokens, ["puente"]) == 0.0
+
+
+def test_keywords_match_plural_tender_words():
+    """Keywords match their plurals, as the former substring test did; thresholds are tuned for this."""
+    tokens = tender_token_set("", compute_token_hashes("Mejoramiento de vías terciarias y puentes"))
+    assert round(calculate_keyword_score(tokens, ["vial", "puente", "mejoramiento"]), 3) == 0.8
+    assert calculate_keyword_score(tokens, ["vial"]) == 0.0
+
+
+def test_contains_pattern_matches_normalized_columns():
+    """Filters are folded the same way as lower(f_unaccent(column))."""
+    assert contains_pattern("  Bogotá D.C. ") == "%bogota d.c.%"
+    assert contains_pattern("Licitación Pública") == "%licitacion publica%"
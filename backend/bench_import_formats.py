@@ -0,0 +1,109 @@
+"""
+Benchmark: experience import throughput by file format.
+
+Writes the same generated experience list as .xlsx, CSV and Parquet (when
+pyarrow is installed), then times reading + parsing each one the way the
+importer does (open_experience_rows, then prepare_experience_records per
+chunk). The previous whole-sheet pandas read of the .xlsx is timed as the
+baseline. Database writes are the same for every format and are left out,
+so no database is needed.
+
+Usage (from backend/):
+    python bench_import_formats.py [rows] [repeats]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from app.services.excel_import import (
+    map_experience_columns,
+    open_experience_rows,
+    prepare_experience_records,
+    read_experience_sheet,
+)
+
+COLUMNS = ["EMPRESA", "CONTRATO No.", "OBRA", "ENTIDAD CONTRATANTE", "FECHA FINALIZACIÓN", "VALOR ACTUAL", "CATEGORÍA"]
+
+
+def make_frame(count):
+    start = datetime(2015, 1, 1)
+    return pd.DataFrame(
+        [
+            (
+                "BEC",
+                f"{i:06d}-2019",
+                f"Interventoría técnica, administrativa y financiera para el mejoramiento de la vía {i}",
+                "INSTITUTO NACIONAL DE VÍAS - INVIAS",
+                start + timedelta(days=i % 3000),
+                1000000.0 + i * 37.5,
+                "Interventoría",
+            )
+            for i in range(count)
+        ],
+        columns=COLUMNS,
+    )
+
+
+def write_files(df, directory):
+    paths = {"xlsx": os.path.join(directory, "experiences.xlsx"), "csv": os.path.join(directory, "experiences.csv")}
+    df.to_excel(paths["xlsx"], index=False)
+    df.assign(**{"FECHA FINALIZACIÓN": df["FECHA FINALIZACIÓN"].dt.strftime("%d/%m/%Y")}).to_csv(paths["csv"], index=False)
+    try:
+        import pyarrow  # noqa: F401
+
+        paths["parquet"] = os.path.join(directory, "experiences.parquet")
+        df.to_parquet(paths["parquet"], index=False)
+    except ImportError:
+        print("pyarrow not installed: Parquet skipped")
+    return paths
+
+
+def import_rows(path):
+    sheet = open_experience_rows(path)
+    actual_columns = map_experience_columns(sheet.columns)
+    records = 0
+    for chunk in sheet.chunks:
+        records += len(prepare_experience_records(chunk, actual_columns, "BEC", first_row=sheet.first_row)[0])
+    return records
+
+
+def import_rows_whole_sheet(path):
+    df = read_experience_sheet(path)
+    return len(prepare_experience_records(df, map_experience_columns(list(df.columns)), "BEC")[0])
+
+
+def timed(fn, repeats):
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_files(make_frame(count), directory)
+        runs = [("xlsx (pandas, whole sheet)", lambda: import_rows_whole_sheet(paths["xlsx"]))]
+        runs += [(f"{name} (streamed chunks)", lambda path=path: import_rows(path)) for name, path in paths.items()]
+
+        print(f"{count} rows, best of {repeats} (read + parse, no database writes)")
+        for label, fn in runs:
+            seconds, records = timed(fn, repeats)
+            assert records == count, (label, records)
+            size = os.path.getsize(paths[label.split()[0]]) / 1024 / 1024
+            print(f"  {label:28} {seconds:7.2f} s {count / seconds:10.0f} rows/s  ({size:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: serialization cost of a 1000-row tender list page.
+
+Compares the previous path (validate each ORM row into TenderResponse, then let
+FastAPI validate and encode the whole TenderListResponse against
+response_model) with the fast path (column tuples -> plain dicts -> one orjson
+encode). No database needed.
+
+Usage (from backend/):
+    python bench_serialization.py [rows] [repeats]
+"""
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.tender import OBJECT_PREVIEW_LENGTH, TenderSource
+from app.schemas.tender import TenderListResponse, TenderResponse
+from app.services.tender_rows import ROW_FIELDS, tender_item, tender_page_response
+
+
+def make_rows(count):
+    now = datetime(2024, 5, 21, 10, 30)
+    rows = []
+    for i in range(count):
+        object_text = ("Interventoría técnica, administrativa, financiera y ambiental para el mejoramiento "
+                       "y mantenimiento de la malla vial del corredor " + str(i) * 20)
+        rows.append(dict(
+            id=uuid.uuid4(),
+            external_id=f"CO1.PCCNTR.{1000000 + i}",
+            source=TenderSource.SECOP_II,
+            entity_name="INSTITUTO NACIONAL DE VÍAS - INVIAS",
+            object_text=object_text,
+            object_preview=object_text[:OBJECT_PREVIEW_LENGTH],
+            department="Cundinamarca",
+            municipality="Chía",
+            amount=Decimal("1234567890.12"),
+            publication_date=now - timedelta(hours=i),
+            closing_date=now + timedelta(days=10),
+            state="Publicado",
+            apertura_estado="Abierto",
+            process_url=f"https://community.secop.gov.co/Public/Tendering/OpportunityDetail/Index?noticeUID={i}",
+            contract_type="Interventoría",
+            contract_modality="Concurso de méritos abierto",
+            relevance_score=None,
+            is_relevant_interventoria_vial=False,
+            created_at=now,
+            updated_at=now,
+        ))
+    return rows
+
+
+MATCHES = [{"experience_id": str(uuid.uuid4()), "score": 0.81, "scores": {"keyword": 0.9, "amount": 0.7}}]
+
+
+def before(orm_rows, response_field):
+    items = []
+    for tender in orm_rows:
+        item = TenderResponse.model_validate(tender)
+        item.experience_match_score = 0.81
+        item.matching_experiences = MATCHES
+        items.append(item)
+    result = TenderListResponse(items=items, total=len(items), limit=len(items), offset=0)
+    content = asyncio.run(serialize_response(field=response_field, response_content=result, is_coroutine=True))
+    return JSONResponse(content).body
+
+
+def after(tuple_rows):
+    items = [
+        tender_item(row, experience_match_score=0.81, matching_experiences=MATCHES)
+        for row in tuple_rows
+    ]
+    return tender_page_response(
+        items, total=len(items), total_estimated=False, limit=len(items), offset=0, next_cursor=None,
+    ).body
+
+
+def timed(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    rows = make_rows(count)
+    orm_rows = [SimpleNamespace(**row) for row in rows]
+    tuple_rows = [tuple(float(row[name]) if name == "amount" else row[name] for name in ROW_FIELDS) for row in rows]
+    response_field = create_response_field(name="Response_list_tenders", type_=TenderListResponse)
+
+    assert set(ROW_FIELDS) <= set(rows[0])
+    before_s = timed(lambda: before(orm_rows, response_field), repeats)
+    after_s = timed(lambda: after(tuple_rows), repeats)
+    print(f"{count} rows, best of {repeats}")
+    print(f"  before (validate rows + response_model): {before_s * 1000:8.1f} ms")
+    print(f"  after  (column tuples + one orjson dump):{after_s * 1000:8.1f} ms")
+    print(f"  speed-up: {before_s / after_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()